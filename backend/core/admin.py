@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking
+from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking, RequestProfile
 
 admin.site.register(Tenant)
 admin.site.register(User)
@@ -9,3 +9,9 @@ admin.site.register(Deal)
 admin.site.register(Communication)
 admin.site.register(TravelPackage)
 admin.site.register(Booking)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['id', 'method', 'route', 'tenant', 'status_code', 'duration_ms', 'sample_count', 'trigger', 'created_at']
+    list_filter = ['trigger', 'route']
@@ -0,0 +1,153 @@
+"""
+Customer Booking Aggregates
+Incremental upkeep and bulk reconciliation of Customer booking totals
+"""
+from collections import namedtuple
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from .models import Booking, Customer
+from .versions import bump_versions
+
+# Bookings in these statuses do not count towards a customer's totals
+EXCLUDED_STATUSES = ('cancelled',)
+
+_Contribution = namedtuple('_Contribution', 'customer_id amount created_at')
+_STATE_FIELDS = ('customer_id', 'status', 'total_amount', 'created_at')
+
+
+def counted_bookings():
+    return Booking.objects.exclude(status__in=EXCLUDED_STATUSES)
+
+
+def _contribution(customer_id, status, amount, created_at) -> Optional[_Contribution]:
+    if customer_id is None or status in EXCLUDED_STATUSES:
+        return None
+    return _Contribution(customer_id, Decimal(str(amount or 0)), created_at)
+
+
+def _last_booking_subquery():
+    return Subquery(
+        counted_bookings().filter(customer_id=OuterRef('pk'))
+        .values('customer_id').annotate(last=Max('created_at')).values('last')[:1]
+    )
+
+
+def _apply(customer_id: int, count_delta: int, amount_delta: Decimal,
+           added_at=None, recompute_last: bool = False):
+    """One UPDATE moving count/total/average (and the last booking date) by a delta"""
+    count = F('booking_count') + count_delta
+    total = F('total_spent') + amount_delta
+    updates = {
+        'booking_count': count,
+        'total_spent': total,
+        # SQL evaluates every SET expression against the row's old values;
+        # the float cast avoids integer division on SQLite
+        'avg_booking_value': Case(
+            When(**{'booking_count__gt': -count_delta}, then=Cast(total, FloatField()) / count),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+    if recompute_last:
+        updates['last_booking_date'] = _last_booking_subquery()
+    elif added_at is not None:
+        updates['last_booking_date'] = Greatest(Coalesce('last_booking_date', Value(added_at)), Value(added_at))
+    Customer.objects.filter(pk=customer_id).update(**updates)
+
+
+def apply_booking_change(old: Optional[_Contribution], new: Optional[_Contribution], tenant_id: int):
+    if old == new:
+        return
+    if old and new and old.customer_id == new.customer_id:
+        changed_date = old.created_at != new.created_at
+        _apply(new.customer_id, 0, new.amount - old.amount, recompute_last=changed_date)
+    else:
+        if old:
+            _apply(old.customer_id, -1, -old.amount, recompute_last=True)
+        if new:
+            _apply(new.customer_id, 1, new.amount, added_at=new.created_at)
+
+    # queryset updates send no signals of their own
+    bump_versions([Customer], [tenant_id])
+
+
+def _locked_contribution(booking: Booking, using: Optional[str]) -> Optional[_Contribution]:
+    """
+    What the booking's row contributes right now, read under a row lock in
+    the write's transaction: concurrent writes to one booking then apply
+    their deltas one after the other, each from the row the previous left.
+    None when the row does not exist (any more).
+    """
+    row = (Booking._base_manager.db_manager(using).select_for_update()
+           .filter(pk=booking.pk).values(*_STATE_FIELDS).first())
+    if row is None:
+        return None
+    return _contribution(*(row[f] for f in _STATE_FIELDS))
+
+
+def _current_contribution(booking: Booking) -> Optional[_Contribution]:
+    return _contribution(*(getattr(booking, f) for f in _STATE_FIELDS))
+
+
+def booking_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    if raw or instance.pk is None:
+        instance._aggregate_old = None
+    else:
+        instance._aggregate_old = _locked_contribution(instance, using)
+
+
+def booking_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    apply_booking_change(
+        getattr(instance, '_aggregate_old', None), _current_contribution(instance), instance.tenant_id
+    )
+
+
+def booking_pre_delete(sender, instance, using=None, **kwargs):
+    # a concurrent delete that got there first leaves nothing to subtract
+    instance._aggregate_old = _locked_contribution(instance, using)
+
+
+def booking_deleted(sender, instance, **kwargs):
+    apply_booking_change(getattr(instance, '_aggregate_old', None), None, instance.tenant_id)
+
+
+def reconcile_customers(customer_ids) -> int:
+    """Recompute the aggregates of the given customers from their bookings"""
+    totals: Dict[int, dict] = {
+        row['customer_id']: row for row in
+        counted_bookings().filter(customer_id__in=customer_ids).values('customer_id').annotate(
+            count=Count('id'), total=Sum('total_amount'), last=Max('created_at')
+        )
+    }
+    customers = list(Customer.objects.filter(pk__in=customer_ids).only(
+        'id', 'tenant_id', 'booking_count', 'total_spent', 'avg_booking_value', 'last_booking_date'
+    ))
+    changed = []
+    for customer in customers:
+        row = totals.get(customer.id)
+        count = row['count'] if row else 0
+        total = Decimal(row['total'] or 0).quantize(Decimal('0.01')) if row else Decimal('0.00')
+        average = (total / count).quantize(Decimal('0.01')) if count else Decimal('0.00')
+        last = row['last'] if row else None
+        if (customer.booking_count, customer.total_spent, customer.avg_booking_value, customer.last_booking_date) \
+                != (count, total, average, last):
+            customer.booking_count = count
+            customer.total_spent = total
+            customer.avg_booking_value = average
+            customer.last_booking_date = last
+            changed.append(customer)
+
+    if changed:
+        with transaction.atomic():
+            Customer.objects.bulk_update(
+                changed, ['booking_count', 'total_spent', 'avg_booking_value', 'last_booking_date']
+            )
+            bump_versions([Customer], {c.tenant_id for c in changed})
+    return len(changed)
@@ -1,6 +1,47 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .models import Tenant, User, Booking
+        from .authentication import user_pre_save
+        from .metrics import install_db_timer
+        from .query_budget import install_query_recorder
+        from .aggregates import booking_pre_save, booking_saved, booking_pre_delete, booking_deleted
+        from .rollups import ROLLUPS, rollup_pre_save, rollup_saved, rollup_pre_delete, rollup_deleted
+        from .tenant_cache import check_shared_cache, invalidate_tenant_cache
+        from .versions import VERSIONED_MODELS, bump_on_save, bump_on_delete
+
+        connection_created.connect(install_db_timer, dispatch_uid='metrics_db_timer')
+        if getattr(settings, 'QUERY_INSTRUMENTATION', settings.DEBUG):
+            connection_created.connect(install_query_recorder, dispatch_uid='query_budget_recorder')
+
+        post_save.connect(invalidate_tenant_cache, sender=Tenant, dispatch_uid='tenant_cache_save')
+        post_delete.connect(invalidate_tenant_cache, sender=Tenant, dispatch_uid='tenant_cache_delete')
+        checks.register(check_shared_cache, checks.Tags.caches)
+
+        pre_save.connect(user_pre_save, sender=User, dispatch_uid='user_token_revocation')
+
+        for model_name in VERSIONED_MODELS:
+            model = self.get_model(model_name)
+            post_save.connect(bump_on_save, sender=model, dispatch_uid=f'version_save_{model_name}')
+            post_delete.connect(bump_on_delete, sender=model, dispatch_uid=f'version_delete_{model_name}')
+
+        pre_save.connect(booking_pre_save, sender=Booking, dispatch_uid='customer_aggregates_pre_save')
+        post_save.connect(booking_saved, sender=Booking, dispatch_uid='customer_aggregates_save')
+        pre_delete.connect(booking_pre_delete, sender=Booking, dispatch_uid='customer_aggregates_pre_delete')
+        post_delete.connect(booking_deleted, sender=Booking, dispatch_uid='customer_aggregates_delete')
+
+        for model in ROLLUPS:
+            name = model.__name__
+            pre_save.connect(rollup_pre_save, sender=model, dispatch_uid=f'rollup_pre_save_{name}')
+            post_save.connect(rollup_saved, sender=model, dispatch_uid=f'rollup_save_{name}')
+            pre_delete.connect(rollup_pre_delete, sender=model, dispatch_uid=f'rollup_pre_delete_{name}')
+            post_delete.connect(rollup_deleted, sender=model, dispatch_uid=f'rollup_delete_{name}')
@@ -0,0 +1,190 @@
+"""
+Stateless JWT Authentication
+Builds the request user from token claims instead of loading the User row
+"""
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import Tenant, User
+
+# Claims added to every token next to the user id (plus is_staff, read by TokenUser)
+USER_CLAIMS = ('tenant_id', 'role')
+# Changing any of these revokes the user's earlier tokens
+REVOKING_FIELDS = ('is_active', 'role', 'tenant_id', 'is_staff')
+
+
+def add_user_claims(token, user):
+    token['tenant_id'] = user.tenant_id
+    token['role'] = user.role
+    token['is_staff'] = user.is_staff
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user read from a validated token: id, tenant_id and role need no
+    query. `tenant` is loaded on first access, so prefer tenant_id.
+    """
+
+    @cached_property
+    def tenant_id(self) -> Optional[int]:
+        return self.token.get('tenant_id')
+
+    @cached_property
+    def role(self) -> Optional[str]:
+        return self.token.get('role')
+
+    @cached_property
+    def tenant(self) -> Optional[Tenant]:
+        return Tenant.objects.filter(pk=self.tenant_id).first()
+
+
+class RevocationList:
+    """
+    User id -> time before which that user's tokens are no longer accepted.
+
+    Holds only users revoked within the refresh token lifetime (older tokens
+    have expired anyway), loaded in one query and kept in process for `ttl`
+    seconds; a revocation reaches other app servers within that window. When
+    the list expires one thread reloads it and the others keep using the
+    old one meanwhile.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        # None until loaded and after invalidate(): requests then wait for a fresh list
+        self._entries: Optional[Dict[int, float]] = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def valid_after(self, user_id: int) -> Optional[float]:
+        entries = self._entries
+        if entries is None or time.monotonic() >= self._expires:
+            entries = self._refresh(entries)
+        return entries.get(user_id)
+
+    def invalidate(self):
+        self._generation += 1
+        self._entries = None
+        self._expires = 0.0
+
+    def _refresh(self, current: Optional[Dict[int, float]]) -> Dict[int, float]:
+        # single flight: one thread queries while the others keep answering
+        # from the list they have, unless there is none to answer from
+        if not self._lock.acquire(blocking=current is None):
+            return current
+        try:
+            entries = self._entries
+            while entries is None or time.monotonic() >= self._expires:
+                generation = self._generation
+                entries = self._load()
+                if generation == self._generation:
+                    self._entries, self._expires = entries, time.monotonic() + self.ttl
+                # else a revocation landed during the query; load again
+            return entries
+        finally:
+            self._lock.release()
+
+    def _load(self) -> Dict[int, float]:
+        lifetime = max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+        rows = (User.objects
+                .filter(tokens_valid_after__gt=timezone.now() - lifetime)
+                .values_list('id', 'tokens_valid_after'))
+        return {user_id: valid_after.timestamp() for user_id, valid_after in rows}
+
+
+revocation_list = RevocationList(ttl=getattr(settings, 'AUTH_REVOCATION_CACHE_TTL', 30))
+
+
+def _revocation_time():
+    # token `iat` is truncated to whole seconds, so round up: every token
+    # issued up to the revocation, including within its second, has iat < this.
+    # (A token issued later in that same second is turned away too.)
+    now = timezone.now()
+    if now.microsecond:
+        now = now.replace(microsecond=0) + timedelta(seconds=1)
+    return now
+
+
+def revoke_user_tokens(user_ids: Iterable[int]):
+    """Reject every token issued so far to these users. Call after bulk deactivation"""
+    User.objects.filter(pk__in=list(user_ids)).update(tokens_valid_after=_revocation_time())
+    transaction.on_commit(revocation_list.invalidate)
+
+
+def is_revoked(token, valid_after: Optional[float]) -> bool:
+    return valid_after is not None and token.get('iat', 0) < valid_after
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token's tenant_id and role claims.
+
+    The user is a ClaimsUser built from the token, so authenticating costs no
+    query; deactivated users and users whose role or tenant changed are
+    turned away through the revocation list. Tokens issued before the claims
+    existed fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = int(validated_token[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken('Token contained no recognizable user identification')
+        if is_revoked(validated_token, revocation_list.valid_after(user_id)):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return ClaimsUser(validated_token)
+
+
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    """Reloads the user on refresh so the new access token carries current claims"""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.get(jwt_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active or is_revoked(
+            refresh, user.tokens_valid_after.timestamp() if user.tokens_valid_after else None
+        ):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        data['access'] = str(add_user_claims(refresh.access_token, user))
+        return data
+
+
+def user_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Revoke earlier tokens when a user is deactivated or changes role, tenant or staff status"""
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {'is_active', 'role', 'tenant', 'tenant_id', 'is_staff'} & set(update_fields):
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS).first()
+    if previous is None:
+        return
+    if any(previous[field] != getattr(instance, field) for field in REVOKING_FIELDS):
+        instance.tokens_valid_after = _revocation_time()
+        if update_fields is not None:
+            # a save(update_fields=...) would not write the revocation itself
+            User.objects.filter(pk=instance.pk).update(tokens_valid_after=instance.tokens_valid_after)
+        transaction.on_commit(revocation_list.invalidate)
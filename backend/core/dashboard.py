@@ -0,0 +1,121 @@
+"""
+Dashboard Metrics
+Read-only queries over the daily rollup tables (see core.rollups)
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Tuple
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailyLeadRollup, DailyBookingRollup, DailyDealRollup, DailyCampaignRollup
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+def parse_range(params) -> Tuple[date, date]:
+    """
+    (first, last) day from ?start=&end= (YYYY-MM-DD) or ?days=N ending today.
+    Raises ValueError with a message fit for a 400 response.
+    """
+    today = timezone.localdate()
+    try:
+        last = date.fromisoformat(params['end']) if params.get('end') else today
+        if params.get('start'):
+            first = date.fromisoformat(params['start'])
+        else:
+            first = last - timedelta(days=int(params.get('days', DEFAULT_DAYS)) - 1)
+    except ValueError:
+        raise ValueError('start/end must be YYYY-MM-DD and days an integer')
+    if first > last:
+        raise ValueError('start must not be after end')
+    if (last - first).days + 1 > MAX_DAYS:
+        raise ValueError(f'range is limited to {MAX_DAYS} days')
+    return first, last
+
+
+def _rows(model, tenant_id: int, first: date, last: date):
+    return model.objects.filter(tenant_id=tenant_id, day__gte=first, day__lte=last)
+
+
+def _money(value) -> float:
+    return float(value or 0)
+
+
+def lead_metrics(tenant_id: int, first: date, last: date) -> Dict[str, Any]:
+    rows = _rows(DailyLeadRollup, tenant_id, first, last)
+    daily = rows.values('day').annotate(leads=Sum('leads')).order_by('day')
+    by_source = rows.values('source').annotate(leads=Sum('leads')).order_by('-leads')
+    by_status = rows.values('status').annotate(leads=Sum('leads')).order_by('-leads')
+    return {
+        'total': sum(row['leads'] for row in daily),
+        'by_source': {row['source'] or 'unknown': row['leads'] for row in by_source},
+        'by_status': {row['status']: row['leads'] for row in by_status},
+        'daily': [{'day': row['day'], 'leads': row['leads']} for row in daily],
+    }
+
+
+def booking_metrics(tenant_id: int, first: date, last: date) -> Dict[str, Any]:
+    daily = list(_rows(DailyBookingRollup, tenant_id, first, last)
+                 .values('day', 'bookings', 'pax', 'revenue').order_by('day'))
+    return {
+        'bookings': sum(row['bookings'] for row in daily),
+        'pax': sum(row['pax'] for row in daily),
+        'revenue': _money(sum(row['revenue'] for row in daily)),
+        'daily': [
+            {'day': row['day'], 'bookings': row['bookings'], 'pax': row['pax'], 'revenue': _money(row['revenue'])}
+            for row in daily
+        ],
+    }
+
+
+def deal_metrics(tenant_id: int, first: date, last: date) -> Dict[str, Any]:
+    rows = _rows(DailyDealRollup, tenant_id, first, last)
+    by_stage = rows.values('stage').annotate(deals=Sum('deals'), value=Sum('value')).order_by('stage')
+    daily = rows.values('day').annotate(deals=Sum('deals'), value=Sum('value')).order_by('day')
+    return {
+        'deals': sum(row['deals'] for row in by_stage),
+        'value': _money(sum(row['value'] for row in by_stage)),
+        'by_stage': [
+            {'stage': row['stage'], 'deals': row['deals'], 'value': _money(row['value'])} for row in by_stage
+        ],
+        'daily': [{'day': row['day'], 'deals': row['deals'], 'value': _money(row['value'])} for row in daily],
+    }
+
+
+def campaign_metrics(tenant_id: int, first: date, last: date) -> Dict[str, Any]:
+    daily = list(_rows(DailyCampaignRollup, tenant_id, first, last).values(
+        'day', 'campaigns', 'spend', 'impressions', 'clicks', 'conversions', 'revenue'
+    ).order_by('day'))
+    spend = sum(row['spend'] for row in daily)
+    revenue = sum(row['revenue'] for row in daily)
+    return {
+        'campaigns': sum(row['campaigns'] for row in daily),
+        'spend': _money(spend),
+        'impressions': sum(row['impressions'] for row in daily),
+        'clicks': sum(row['clicks'] for row in daily),
+        'conversions': sum(row['conversions'] for row in daily),
+        'revenue': _money(revenue),
+        'roas': round(float(revenue / spend), 2) if spend else None,
+        'daily': [
+            {
+                'day': row['day'], 'campaigns': row['campaigns'], 'spend': _money(row['spend']),
+                'clicks': row['clicks'], 'conversions': row['conversions'], 'revenue': _money(row['revenue']),
+            }
+            for row in daily
+        ],
+    }
+
+
+def summary(tenant_id: int, first: date, last: date) -> Dict[str, Any]:
+    """Headline totals of every rollup; drops the per-day series"""
+    metrics = {
+        'leads': lead_metrics(tenant_id, first, last),
+        'bookings': booking_metrics(tenant_id, first, last),
+        'deals': deal_metrics(tenant_id, first, last),
+        'campaigns': campaign_metrics(tenant_id, first, last),
+    }
+    for section in metrics.values():
+        section.pop('daily', None)
+    return metrics
@@ -0,0 +1,150 @@
+"""
+Read Replica Routing
+Sends the reads of safe-method requests and read-only code paths to replicas
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+PRIMARY = 'default'
+
+_state: ContextVar[Optional['RoutingState']] = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """
+    Routing for the current request or read-only block.
+
+    `replica` is the alias reads go to (None: primary). `pinned` keeps a
+    read-only block on the primary after a recent write by the same user or
+    tenant, and `wrote` is set by the first write so the rest of the request
+    reads its own writes.
+    """
+    __slots__ = ('replica', 'pinned', 'wrote')
+
+    def __init__(self, replica: Optional[str] = None, pinned: bool = False):
+        self.replica = replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_aliases() -> List[str]:
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def choose_replica() -> Optional[str]:
+    """One replica per request/block, so its reads see a single snapshot"""
+    replicas = replica_aliases()
+    return random.choice(replicas) if replicas else None
+
+
+def current_state() -> Optional[RoutingState]:
+    return _state.get()
+
+
+def enter_state(state: RoutingState):
+    return _state.set(state)
+
+
+def exit_state(token):
+    _state.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Read from a replica inside the block (also usable as a decorator).
+
+    For code that only reads but does not run under a safe-method request,
+    e.g. scoring POSTs or reporting jobs. Stays on the primary when the
+    request is pinned or has already written.
+    """
+    state = _state.get()
+    token = None
+    if state is None:
+        state = RoutingState()
+        token = _state.set(state)
+    previous = state.replica
+    if not state.pinned and not state.wrote:
+        state.replica = previous or choose_replica()
+    try:
+        yield
+    finally:
+        state.replica = previous
+        if token is not None:
+            _state.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, e.g. right before a dependent write"""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous = state.replica
+    state.replica = None
+    try:
+        yield
+    finally:
+        state.replica = previous
+
+
+class ReplicaRouter:
+    """
+    Primary for writes, the current state's replica for reads.
+
+    Without a routing state (management commands, shell, tests) or without
+    DATABASE_REPLICAS everything stays on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+# Read-your-writes stickiness: after a request writes, its user and tenant read
+# from the primary for REPLICA_STICKY_SECONDS. Point REPLICA_PIN_CACHE_ALIAS at a
+# shared cache (Redis) so the pin holds across app servers.
+
+def _pin_cache():
+    return caches[getattr(settings, 'REPLICA_PIN_CACHE_ALIAS', 'default')]
+
+
+def pin_keys(tenant_id: Optional[int], user_id: Optional[int]) -> List[str]:
+    keys = []
+    if tenant_id is not None:
+        keys.append(f'replica-pin:t:{tenant_id}')
+    if user_id is not None:
+        keys.append(f'replica-pin:u:{user_id}')
+    return keys
+
+
+def is_pinned(tenant_id: Optional[int], user_id: Optional[int]) -> bool:
+    keys = pin_keys(tenant_id, user_id)
+    return bool(keys) and bool(_pin_cache().get_many(keys))
+
+
+def pin_to_primary(tenant_id: Optional[int], user_id: Optional[int]):
+    keys = pin_keys(tenant_id, user_id)
+    if keys:
+        timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+        _pin_cache().set_many({key: 1 for key in keys}, timeout=timeout)
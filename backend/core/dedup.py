@@ -0,0 +1,222 @@
+"""
+Lead Deduplication
+Blocking-key candidate generation, batch scoring and merging of duplicate leads
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .lead_keys import normalize_email, name_destination_key
+from .models import Lead, LeadDedupCheckpoint, Customer, WhatsAppConversation
+from .versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ['id', 'email', 'phone_normalized', 'first_name', 'last_name', 'destination', 'updated_at']
+
+# Fields copied onto the surviving lead when it has no value of its own
+_FILL_FIELDS = ['email', 'phone', 'first_name', 'last_name', 'source', 'travel_dates',
+                'destination', 'budget', 'assigned_to_id']
+
+
+def _clean(value: Optional[str]) -> str:
+    return (value or '').strip().lower()
+
+
+def blocking_keys(row: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Keys that put a lead in the same block as its likely duplicates.
+    Only leads sharing at least one key are ever compared. They are the
+    values Lead stores in email_normalized, phone_normalized and
+    name_destination_key, so candidates are found with exact index lookups.
+    """
+    keys = []
+    email = normalize_email(row['email'])
+    if email:
+        keys.append(('email', email))
+    if row['phone_normalized']:
+        keys.append(('phone', row['phone_normalized']))
+    name_destination = name_destination_key(row['first_name'], row['last_name'], row['destination'])
+    if name_destination:
+        keys.append(('name_destination', name_destination))
+    return keys
+
+
+def score_pair(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """Likelihood (0-1) that two lead rows are the same person"""
+    score = 0.0
+    if _clean(a['email']) and _clean(a['email']) == _clean(b['email']):
+        score += 0.6
+    if a['phone_normalized'] and a['phone_normalized'] == b['phone_normalized']:
+        score += 0.5
+    name_a = f"{_clean(a['first_name'])} {_clean(a['last_name'])}".strip()
+    name_b = f"{_clean(b['first_name'])} {_clean(b['last_name'])}".strip()
+    if name_a and name_a == name_b:
+        score += 0.3
+    if _clean(a['destination']) and _clean(a['destination']) == _clean(b['destination']):
+        score += 0.1
+    return min(score, 1.0)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # the oldest lead (lowest id) survives
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class LeadDeduplicator:
+    """
+    Incremental, resumable dedup job for one tenant.
+
+    Each run walks the leads changed since the tenant's checkpoint in
+    (updated_at, id) order, one batch at a time. For a batch it looks up
+    candidates that share a blocking key (normalized email, normalized phone,
+    or name + destination, all stored on Lead) with indexed IN queries, scores every
+    changed/candidate pair in the same block, and merges clusters scoring at
+    or above the threshold into their oldest lead. The checkpoint is saved
+    after every batch, so an interrupted run picks up where it stopped.
+    """
+
+    def __init__(self, tenant_id: int, batch_size: Optional[int] = None,
+                 threshold: Optional[float] = None, dry_run: bool = False):
+        self.tenant_id = tenant_id
+        self.batch_size = batch_size or getattr(settings, 'LEAD_DEDUP_BATCH_SIZE', 1000)
+        self.threshold = threshold if threshold is not None else getattr(settings, 'LEAD_DEDUP_THRESHOLD', 0.6)
+        self.dry_run = dry_run
+        self.scanned = 0
+        self.compared = 0
+        self.merged = 0
+        self.merges: List[Dict[str, Any]] = []
+
+    def run(self, full: bool = False) -> Dict[str, Any]:
+        checkpoint, _ = LeadDedupCheckpoint.objects.get_or_create(tenant_id=self.tenant_id)
+        if full:
+            checkpoint.last_updated_at, checkpoint.last_lead_id = None, 0
+
+        while True:
+            batch = self._next_batch(checkpoint)
+            if not batch:
+                break
+            self.scanned += len(batch)
+            merged_before = self.merged
+            self._process_batch(batch)
+
+            # Merged survivors get a fresh updated_at, so they come round once
+            # more in a later batch; with nothing left to merge that is a no-op.
+            last = batch[-1]
+            checkpoint.last_updated_at, checkpoint.last_lead_id = last['updated_at'], last['id']
+            if not self.dry_run:
+                checkpoint.merged_total += self.merged - merged_before
+                checkpoint.save()
+
+        return {
+            'scanned': self.scanned,
+            'compared': self.compared,
+            'merged': self.merged,
+            'dry_run': self.dry_run,
+            'merges': self.merges,
+        }
+
+    def _next_batch(self, checkpoint: LeadDedupCheckpoint) -> List[Dict[str, Any]]:
+        qs = Lead.objects.filter(tenant_id=self.tenant_id)
+        if checkpoint.last_updated_at is not None:
+            qs = qs.filter(
+                Q(updated_at__gt=checkpoint.last_updated_at) |
+                Q(updated_at=checkpoint.last_updated_at, id__gt=checkpoint.last_lead_id)
+            )
+        return list(qs.order_by('updated_at', 'id').values(*_COLUMNS)[:self.batch_size])
+
+    def _candidates(self, batch: Iterable[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Every lead sharing a blocking key with the batch, one indexed IN query per key type"""
+        values = defaultdict(set)
+        for row in batch:
+            for kind, value in blocking_keys(row):
+                values[kind].add(value)
+
+        # (tenant, <key column>) indexes; each lookup only reads matching leads
+        columns = {'email': 'email_normalized', 'phone': 'phone_normalized', 'name_destination': 'name_destination_key'}
+        base = Lead.objects.filter(tenant_id=self.tenant_id)
+        candidates = {}
+        for kind, column in columns.items():
+            if not values[kind]:
+                continue
+            for row in base.filter(**{f'{column}__in': values[kind]}).values(*_COLUMNS):
+                candidates[row['id']] = row
+        return candidates
+
+    def _process_batch(self, batch: List[Dict[str, Any]]):
+        candidates = self._candidates(batch)
+        blocks = defaultdict(set)
+        for row in candidates.values():
+            for key in blocking_keys(row):
+                blocks[key].add(row['id'])
+
+        clusters = _UnionFind()
+        seen = set()
+        for row in batch:
+            for key in blocking_keys(row):
+                for other_id in blocks.get(key, ()):
+                    pair = (min(row['id'], other_id), max(row['id'], other_id))
+                    if other_id == row['id'] or pair in seen:
+                        continue
+                    seen.add(pair)
+                    self.compared += 1
+                    if score_pair(row, candidates[other_id]) >= self.threshold:
+                        clusters.union(*pair)
+
+        groups = defaultdict(list)
+        for lead_id in list(clusters.parent):
+            groups[clusters.find(lead_id)].append(lead_id)
+        for survivor_id, members in groups.items():
+            duplicates = sorted(m for m in members if m != survivor_id)
+            if duplicates:
+                self._merge(survivor_id, duplicates)
+
+    def _merge(self, survivor_id: int, duplicate_ids: List[int]):
+        self.merges.append({'survivor': survivor_id, 'duplicates': duplicate_ids})
+        if self.dry_run:
+            self.merged += len(duplicate_ids)
+            return
+
+        with transaction.atomic():
+            leads = {lead.id: lead for lead in Lead.objects.select_for_update().filter(
+                tenant_id=self.tenant_id, id__in=[survivor_id] + duplicate_ids)}
+            survivor = leads.get(survivor_id)
+            duplicates = [leads[i] for i in duplicate_ids if i in leads]
+            if survivor is None or not duplicates:
+                return
+
+            for duplicate in duplicates:
+                for field in _FILL_FIELDS:
+                    if getattr(survivor, field) in (None, '') and getattr(duplicate, field) not in (None, ''):
+                        setattr(survivor, field, getattr(duplicate, field))
+                survivor.score = max(survivor.score, duplicate.score)
+                if duplicate.notes and duplicate.notes not in (survivor.notes or ''):
+                    survivor.notes = '\n'.join(filter(None, [survivor.notes, duplicate.notes]))
+
+            ids = [d.id for d in duplicates]
+            # Communication and Deal hang off Customer, so they follow it
+            Customer.objects.filter(tenant_id=self.tenant_id, lead_id__in=ids).update(lead=survivor)
+            WhatsAppConversation.objects.filter(tenant_id=self.tenant_id, lead_id__in=ids).update(lead=survivor)
+            Lead.objects.filter(id__in=ids).delete()
+            survivor.save()
+            bump_versions([Customer, WhatsAppConversation], [self.tenant_id])
+
+        self.merged += len(duplicates)
+        logger.info(f"[LeadDeduplicator] merged leads {ids} into {survivor_id} (tenant {self.tenant_id})")
@@ -0,0 +1,288 @@
+"""
+Bulk Lead Import
+Validate uploaded rows one at a time and upsert them in chunks
+"""
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .lead_keys import normalize_email
+from .models import Lead
+from .phones import normalize_phone
+from .rollups import ROLLUPS
+from .versions import bump_version
+from .serializers import LeadImportSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class RowParseError(NamedTuple):
+    """A line of an upload that could not be parsed; reported as that row's error"""
+    message: str
+
+
+class UploadParseError(ValueError):
+    """The rest of an upload cannot be read; rows before it are still imported"""
+
+
+def iter_upload_rows(upload) -> Iterator[Any]:
+    """
+    Yield row dicts from an uploaded file without loading it all at once.
+
+    .csv files are read with a header row, .ndjson/.jsonl one object per
+    line; anything else is parsed as a JSON array, one element at a time.
+    A bad CSV record or NDJSON line is yielded as a RowParseError and the
+    file carries on; UploadParseError is raised when nothing after the
+    error can be read (undecodable text, a broken JSON array).
+    """
+    name = (getattr(upload, 'name', '') or '').lower()
+    content_type = getattr(upload, 'content_type', '') or ''
+
+    try:
+        if name.endswith('.csv') or 'csv' in content_type:
+            yield from _iter_csv(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        elif name.endswith(('.ndjson', '.jsonl')):
+            yield from _iter_ndjson(upload.file)
+        else:
+            yield from _iter_json_array(io.TextIOWrapper(upload.file, encoding='utf-8-sig'))
+    except UnicodeDecodeError as e:
+        raise UploadParseError(f'not UTF-8 text: {e}') from e
+
+
+def _iter_csv(text) -> Iterator[Any]:
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # e.g. a NUL byte or an oversized field; the reader resumes on the next line
+            yield RowParseError(f'line {reader.line_num}: {e}')
+            continue
+        # blank CSV cells mean "not provided", not an empty value
+        yield {k.strip(): v.strip() for k, v in row.items() if k and isinstance(v, str) and v}
+
+
+def _iter_ndjson(raw) -> Iterator[Any]:
+    for number, line in enumerate(raw, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line.decode('utf-8-sig' if number == 1 else 'utf-8'))
+        except ValueError as e:
+            yield RowParseError(f'line {number}: {e}')
+
+
+def _iter_json_array(text, read_size: int = 64 * 1024) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array while reading it in `read_size` pieces"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    started, count = False, 0
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        piece = text.read(read_size)
+        buffer, pos = buffer[pos:] + piece, 0
+        eof = not piece
+        return not eof
+
+    while True:
+        # skip whitespace and the separators between elements
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or not fill():
+                break
+        if pos >= len(buffer):
+            raise UploadParseError('expected a JSON array' if not started else 'unterminated JSON array')
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise UploadParseError('expected a JSON array')
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            if fill():
+                continue
+            raise UploadParseError(f'invalid JSON after element {count}: {e.msg}') from e
+        if end == len(buffer) and fill():
+            # a number may go on in the next piece
+            continue
+        pos = end
+        count += 1
+        yield value
+
+
+class LeadImporter:
+    """
+    Upsert leads for one tenant.
+
+    Rows are matched to existing leads on normalized email, then normalized
+    phone, using the (tenant, email_normalized)/(tenant, phone_normalized) indexes with one IN
+    query per key and chunk. New leads are written with bulk_create and matches with
+    bulk_update. A row that fails validation, or breaks its chunk at the
+    database, is reported by row number and the rest of the import carries on.
+    """
+
+    def __init__(self, tenant_id: int, batch_size: Optional[int] = None):
+        self.tenant_id = tenant_id
+        self.batch_size = batch_size or getattr(settings, 'LEAD_IMPORT_BATCH_SIZE', 1000)
+        self.created = 0
+        self.updated = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def run(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+
+        parse_error = None
+
+        try:
+            for index, row in enumerate(rows, start=1):
+                data = self._validate(index, row)
+                if data is None:
+                    continue
+                chunk.append((index, data))
+                if len(chunk) >= self.batch_size:
+                    self._flush(chunk)
+                    chunk = []
+        except UploadParseError as e:
+            # the rows read so far are still written below
+            parse_error = f'Could not parse upload: {e}'
+
+        if chunk:
+            self._flush(chunk)
+
+        result = {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+        if parse_error:
+            result['error'] = parse_error
+        return result
+
+    def _validate(self, index: int, row: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(row, RowParseError):
+            self.errors.append({'row': index, 'errors': {'non_field_errors': [row.message]}})
+            return None
+        if not isinstance(row, dict):
+            self.errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object']}})
+            return None
+
+        serializer = LeadImportSerializer(data=row)
+        if not serializer.is_valid():
+            self.errors.append({'row': index, 'errors': serializer.errors})
+            return None
+
+        data = dict(serializer.validated_data)
+        for key in ('email', 'phone'):
+            if not data.get(key):
+                data.pop(key, None)
+        # rows are matched on these before any Lead object exists
+        if 'email' in data:
+            data['email_normalized'] = normalize_email(data['email'])
+        if 'phone' in data:
+            data['phone_normalized'] = normalize_phone(data['phone'])
+        if 'email' not in data and 'phone' not in data:
+            self.errors.append({'row': index, 'errors': {'non_field_errors': ['email or phone is required']}})
+            return None
+        return data
+
+    def _flush(self, chunk: List[Tuple[int, Dict[str, Any]]]):
+        try:
+            with transaction.atomic():
+                created, updated = self._upsert(chunk)
+        except DatabaseError as e:
+            logger.warning(f"Lead import chunk failed, retrying row by row: {e}")
+            for row in chunk:
+                try:
+                    with transaction.atomic():
+                        created, updated = self._upsert([row])
+                except DatabaseError as row_error:
+                    self.errors.append({'row': row[0], 'errors': {'non_field_errors': [str(row_error)]}})
+                    continue
+                self.created += created
+                self.updated += updated
+            return
+        self.created += created
+        self.updated += updated
+
+    def _upsert(self, chunk: List[Tuple[int, Dict[str, Any]]]) -> Tuple[int, int]:
+        emails = {data['email_normalized'] for _, data in chunk if data.get('email_normalized')}
+        phones = {data['phone_normalized'] for _, data in chunk if data.get('phone_normalized')}
+
+        # locked until the chunk commits, so the rollup deltas start from the rows as they are
+        leads = Lead.objects.select_for_update().filter(tenant_id=self.tenant_id)
+        by_email: Dict[str, Lead] = {}
+        by_phone: Dict[str, Lead] = {}
+        if emails:
+            for lead in leads.filter(email_normalized__in=emails):
+                by_email.setdefault(lead.email_normalized, lead)
+        if phones:
+            for lead in leads.filter(phone_normalized__in=phones):
+                by_phone.setdefault(lead.phone_normalized, lead)
+
+        to_create: Dict[int, Lead] = {}
+        to_update: Dict[int, Lead] = {}
+        # rollup state of each updated lead before this chunk touched it
+        rollup = ROLLUPS[Lead]
+        before: Dict[int, Dict[str, Any]] = {}
+        update_fields = set()
+        now = timezone.now()
+
+        for _, data in chunk:
+            lead = by_email.get(data.get('email_normalized')) or by_phone.get(data.get('phone_normalized'))
+            if lead is None:
+                lead = Lead(tenant_id=self.tenant_id, **data)
+                to_create[id(lead)] = lead
+            else:
+                if lead.pk is not None and lead.pk not in before:
+                    before[lead.pk] = rollup.state(lead)
+                for field, value in data.items():
+                    setattr(lead, field, value)
+                if lead.pk is not None:
+                    lead.updated_at = now
+                    to_update[lead.pk] = lead
+                    update_fields.update(data)
+                    for field in data:
+                        update_fields.update(Lead.DERIVED_FIELDS.get(field, ()))
+            # bulk_create/bulk_update bypass Lead.save()
+            lead.set_match_keys()
+            # later rows in the same chunk update the lead this one produced
+            if lead.email_normalized:
+                by_email[lead.email_normalized] = lead
+            if lead.phone_normalized:
+                by_phone[lead.phone_normalized] = lead
+
+        if to_create:
+            Lead.objects.bulk_create(list(to_create.values()), batch_size=self.batch_size)
+        if to_update:
+            Lead.objects.bulk_update(
+                list(to_update.values()),
+                fields=sorted(update_fields | {'updated_at'}),
+                batch_size=self.batch_size,
+            )
+        if to_create or to_update:
+            # bulk writes send no model signals
+            bump_version(Lead, self.tenant_id)
+            rollup.apply_changes(
+                [(None, rollup.state(lead)) for lead in to_create.values()] +
+                [(before[pk], rollup.state(lead)) for pk, lead in to_update.items()]
+            )
+        return len(to_create), len(to_update)
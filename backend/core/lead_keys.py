@@ -0,0 +1,27 @@
+"""
+Lead Matching Keys
+Normalized email and name + destination keys stored on Lead for indexed duplicate blocking
+"""
+from typing import Optional
+
+
+def _clean(value: Optional[str]) -> str:
+    return (value or '').strip().lower()
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """'  Maria@Example.com ' -> 'maria@example.com'; None when empty"""
+    return _clean(email) or None
+
+
+def name_destination_key(first_name: Optional[str], last_name: Optional[str],
+                         destination: Optional[str]) -> Optional[str]:
+    """
+    'maria garcia|bali' for Maria Garcia travelling to Bali. None unless the
+    lead has both a name and a destination.
+    """
+    name = f'{_clean(first_name)} {_clean(last_name)}'.strip()
+    destination = _clean(destination)
+    if not (name and destination):
+        return None
+    return f'{name}|{destination}'
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from core.models import Lead
+
+_FIELDS = ['email_normalized', 'name_destination_key']
+
+
+class Command(BaseCommand):
+    help = 'Fill the dedup blocking keys (email_normalized, name_destination_key) on existing leads in id-ordered chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this id')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = options['start_id']
+        updated = 0
+
+        while True:
+            # keyset walk so each chunk is an index range scan, never an OFFSET
+            leads = list(Lead.objects.filter(id__gt=last_id).order_by('id')
+                         .only('id', 'tenant_id', 'phone', 'email', 'first_name', 'last_name', 'destination',
+                               *_FIELDS)[:chunk_size])
+            if not leads:
+                break
+            last_id = leads[-1].id
+
+            changed = []
+            for lead in leads:
+                before = [getattr(lead, f) for f in _FIELDS]
+                lead.set_match_keys()
+                if [getattr(lead, f) for f in _FIELDS] != before:
+                    changed.append(lead)
+            # the keys are not part of any API response, so cached responses stay valid
+            Lead.objects.bulk_update(changed, _FIELDS, batch_size=chunk_size)
+            updated += len(changed)
+            self.stdout.write(f'Lead: up to id {last_id}, {updated} updated')
+
+        self.stdout.write(self.style.SUCCESS(f'Lead: filled match keys on {updated} leads'))
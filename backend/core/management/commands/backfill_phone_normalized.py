@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Lead, WhatsAppConversation
+from core.phones import normalize_phone
+from core.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = 'Fill phone_normalized on existing leads and WhatsApp conversations in id-ordered chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this id')
+        parser.add_argument('--all', action='store_true', help='Recompute rows that already have a value')
+
+    def handle(self, *args, **options):
+        targets = [(Lead, 'phone'), (WhatsAppConversation, 'phone_number')]
+        for model, source in targets:
+            updated = self._backfill(model, source, options)
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: normalized {updated} phone numbers'))
+
+    def _backfill(self, model, source, options):
+        chunk_size = options['chunk_size']
+        last_id = options['start_id']
+        updated = 0
+
+        base = model.objects.exclude(**{f'{source}__isnull': True}).exclude(**{source: ''})
+        if not options['all']:
+            base = base.filter(phone_normalized__isnull=True)
+
+        while True:
+            # keyset walk so each chunk is an index range scan, never an OFFSET
+            rows = list(base.filter(id__gt=last_id).order_by('id').values_list('id', 'tenant_id', source)[:chunk_size])
+            if not rows:
+                return updated
+            last_id = rows[-1][0]
+
+            changed = []
+            tenant_ids = set()
+            for pk, tenant_id, raw in rows:
+                normalized = normalize_phone(raw)
+                if normalized:
+                    changed.append(model(id=pk, phone_normalized=normalized))
+                    tenant_ids.add(tenant_id)
+            with transaction.atomic():
+                model.objects.bulk_update(changed, ['phone_normalized'], batch_size=chunk_size)
+                bump_versions([model], tenant_ids)
+            updated += len(changed)
+            self.stdout.write(f'{model.__name__}: up to id {last_id}, {updated} updated')
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Lead, Booking, Deal, MetaAdsCampaign
+from core.rollups import backfill
+
+ROLLUP_SOURCES = {'leads': Lead, 'bookings': Booking, 'deals': Deal, 'campaigns': MetaAdsCampaign}
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily dashboard rollups from source rows, a date chunk at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rollup', action='append', choices=sorted(ROLLUP_SOURCES),
+                            help='Rollup to rebuild (repeatable); defaults to all')
+        parser.add_argument('--tenant', type=int, action='append', help='Tenant id (repeatable); defaults to all tenants')
+        parser.add_argument('--start', help='First day, YYYY-MM-DD (default: oldest source row)')
+        parser.add_argument('--end', help='Last day, YYYY-MM-DD (default: today)')
+        parser.add_argument('--chunk-days', type=int, default=31)
+
+    def handle(self, *args, **options):
+        try:
+            first_day = date.fromisoformat(options['start']) if options['start'] else None
+            last_day = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days must be at least 1')
+
+        def progress(model, start, end, written):
+            self.stdout.write(f'{model.__name__}: {start} .. {end}, {written} rollup rows')
+
+        for name in options['rollup'] or sorted(ROLLUP_SOURCES):
+            written = backfill(
+                ROLLUP_SOURCES[name],
+                tenant_ids=options['tenant'],
+                first_day=first_day,
+                last_day=last_day,
+                chunk_days=options['chunk_days'],
+                progress=progress,
+            )
+            self.stdout.write(self.style.SUCCESS(f'{name}: wrote {written} rollup rows'))
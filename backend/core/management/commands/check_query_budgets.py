@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from core.query_budget import seed_budget_fixture, check_query_budgets
+
+
+class Command(BaseCommand):
+    help = 'Request every endpoint in core/query_budget.py against seeded rows and fail if any goes over its query budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5, help='Rows seeded per table; N+1 queries scale with it')
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['*'], RESPONSE_CACHE_ENABLED=False, QUERY_INSTRUMENTATION=False):
+            with transaction.atomic():
+                ids = seed_budget_fixture(options['rows'])
+                results = check_query_budgets(ids)
+                # nothing seeded here outlives the check
+                transaction.set_rollback(True)
+
+        failures = [r for r in results if r['queries'] > r['budget'] or r['status'] >= 400]
+        for result in results:
+            if result['status'] >= 400:
+                self.stdout.write(self.style.ERROR(f"HTTP {result['status']}  {result['label']}"))
+            elif result['queries'] > result['budget']:
+                self.stdout.write(self.style.ERROR(f"OVER BUDGET  {result['report']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"ok           {result['label']}: {result['queries']}/{result['budget']} queries"
+                ))
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {len(results)} endpoints failed their query budget check')
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} endpoints are within their query budgets'))
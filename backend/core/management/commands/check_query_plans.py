@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot tenant-scoped queries and fail if any does not use its expected index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def handle(self, *args, **options):
+        results = check_query_plans(using=options['database'])
+        failures = [r for r in results if r['problem']]
+
+        for result in results:
+            if result['problem']:
+                self.stdout.write(self.style.ERROR(f"FAIL  {result['label']}: {result['problem']}"))
+                self.stdout.write(result['plan'])
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok    {result['label']} ({result['index']})"))
+                if options['verbose_plans']:
+                    self.stdout.write(result['plan'])
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {len(results)} hot queries do not use their index')
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} hot queries use their index'))
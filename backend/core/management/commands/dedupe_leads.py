@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Tenant
+from core.dedup import LeadDeduplicator
+
+
+class Command(BaseCommand):
+    help = 'Merge duplicate leads, incrementally from each tenant\'s last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, action='append', help='Tenant id (repeatable); defaults to all tenants')
+        parser.add_argument('--full', action='store_true', help='Ignore the checkpoint and rescan every lead')
+        parser.add_argument('--dry-run', action='store_true', help='Report the merges without writing anything')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--threshold', type=float, default=None, help='Minimum pair score to merge (0-1)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('id')
+        if options['tenant']:
+            tenants = tenants.filter(id__in=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"No tenant with id in {options['tenant']}")
+
+        for tenant in tenants:
+            result = LeadDeduplicator(
+                tenant.id,
+                batch_size=options['batch_size'],
+                threshold=options['threshold'],
+                dry_run=options['dry_run'],
+            ).run(full=options['full'])
+
+            for merge in result['merges']:
+                self.stdout.write(f"  {tenant.name}: lead {merge['survivor']} <- {merge['duplicates']}")
+            verb = 'would merge' if result['dry_run'] else 'merged'
+            self.stdout.write(self.style.SUCCESS(
+                f"{tenant.name}: scanned {result['scanned']} leads, "
+                f"{result['compared']} pairs compared, {verb} {result['merged']} duplicates"
+            ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from core.models import Customer
+from core.aggregates import reconcile_customers
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Customer booking aggregates from bookings in id-ordered chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Only this tenant id')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this customer id')
+
+    def handle(self, *args, **options):
+        base = Customer.objects.all()
+        if options['tenant']:
+            base = base.filter(tenant_id=options['tenant'])
+
+        last_id = options['start_id']
+        scanned = fixed = 0
+        while True:
+            ids = list(base.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            last_id = ids[-1]
+            scanned += len(ids)
+            fixed += reconcile_customers(ids)
+            self.stdout.write(f'up to id {last_id}: {scanned} checked, {fixed} corrected')
+
+        self.stdout.write(self.style.SUCCESS(f'Checked {scanned} customers, corrected {fixed}'))
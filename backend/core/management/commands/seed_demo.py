@@ -1,10 +1,43 @@
-from django.core.management.base import BaseCommand
+import time
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
 from core.models import Tenant, User, Lead, Customer, TravelPackage, Booking
+from core.synthetic import ScalePlan, generate
+
 
 class Command(BaseCommand):
-    help = 'Seed demo data'
+    help = 'Seed demo data; with --scale, generate many tenants of deterministic synthetic data'
+
+    def add_arguments(self, parser):
+        defaults = ScalePlan()
+        parser.add_argument('--scale', action='store_true', help='Generate synthetic tenants instead of the small demo')
+        parser.add_argument('--tenants', type=int, default=defaults.tenants)
+        parser.add_argument('--leads', type=int, default=defaults.leads, help='Average leads per tenant')
+        parser.add_argument('--customer-rate', type=float, default=defaults.customer_rate,
+                            help='Share of leads that became customers')
+        parser.add_argument('--bookings', type=int, default=defaults.bookings, help='Average bookings per tenant')
+        parser.add_argument('--deals', type=int, default=defaults.deals, help='Average deals per tenant')
+        parser.add_argument('--communications', type=int, default=defaults.communications,
+                            help='Average communications per tenant')
+        parser.add_argument('--campaigns', type=int, default=defaults.campaigns, help='Average Meta Ads campaigns per tenant')
+        parser.add_argument('--conversations', type=int, default=defaults.conversations,
+                            help='Average WhatsApp conversations per tenant')
+        parser.add_argument('--packages', type=int, default=defaults.packages, help='Average travel packages per tenant')
+        parser.add_argument('--agents', type=int, default=defaults.agents, help='Average agents per tenant')
+        parser.add_argument('--days', type=int, default=defaults.days, help='History length in days')
+        parser.add_argument('--skew', type=float, default=defaults.skew,
+                            help='Tenant size skew: tenant i gets a share of 1/(i+1)**skew (0 = equal tenants)')
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument('--until', help='Last day of the history, YYYY-MM-DD (default: today)')
+        parser.add_argument('--chunk-size', type=int, default=defaults.chunk_size, help='Rows per bulk_create')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating tenants in parallel')
 
     def handle(self, *args, **options):
+        if options['scale']:
+            return self.handle_scale(options)
+
         tenant = Tenant.objects.create(name='Demo Travel Co', domain='demo.travelco', subscription_tier='starter', settings={'currency':'USD'})
         admin = User.objects.create_user(email='admin@demo.travelco', password='password123', role='ADMIN', tenant=tenant)
         agent = User.objects.create_user(email='agent@demo.travelco', password='password123', role='AGENT', tenant=tenant)
@@ -13,3 +46,41 @@ class Command(BaseCommand):
         pkg = TravelPackage.objects.create(name='7-Day Hawaii Escape', description='Relaxing beaches', base_price=2500, duration=7, destination='Hawaii', tenant=tenant)
         booking = Booking.objects.create(customer=customer, package=pkg, status='confirmed', total_amount=2500, travel_date='2025-08-20T00:00:00Z', pax_count=2, tenant=tenant)
         self.stdout.write(self.style.SUCCESS('Seeded demo data'))
+
+    def handle_scale(self, options):
+        try:
+            until = date.fromisoformat(options['until']) if options['until'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if options['tenants'] < 1 or options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--tenants, --chunk-size and --workers must be at least 1')
+
+        plan = ScalePlan(
+            tenants=options['tenants'], leads=options['leads'], customer_rate=options['customer_rate'],
+            bookings=options['bookings'], deals=options['deals'], communications=options['communications'],
+            campaigns=options['campaigns'], conversations=options['conversations'], packages=options['packages'],
+            agents=options['agents'], days=options['days'], skew=options['skew'], seed=options['seed'],
+            until=timezone.make_aware(datetime.combine(until, datetime.min.time())) if until else None,
+            chunk_size=options['chunk_size'],
+        )
+        taken = Tenant.objects.filter(domain__in=[plan.domain(i) for i in range(plan.tenants)]).count()
+        if taken:
+            raise CommandError(
+                f'{taken} tenants of seed {plan.seed} already exist; delete them or pick another --seed'
+            )
+
+        started = time.monotonic()
+
+        def progress(index, counts):
+            rows = sum(n for name, n in counts.items() if name != 'tenant')
+            self.stdout.write(f'tenant {index} (id {counts["tenant"]}): {rows} rows, {time.monotonic() - started:.0f}s')
+
+        totals = generate(plan, workers=options['workers'], progress=progress)
+        for name, n in sorted(totals.items()):
+            self.stdout.write(f'  {name}: {n}')
+        elapsed = time.monotonic() - started
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {plan.tenants} tenants, {rows} rows in {elapsed:.0f}s ({rows / max(elapsed, 1e-9):.0f} rows/s); '
+            f'log in as admin@{plan.domain(0)} / {plan.password}'
+        ))
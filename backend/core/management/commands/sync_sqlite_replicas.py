@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the SQLite read replicas (local stand-in for replication)'
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if not primary['ENGINE'].endswith('sqlite3'):
+            raise CommandError('The primary database is not SQLite; replicate with the database server instead')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured; set DB_REPLICAS to one or more SQLite paths')
+
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                path = settings.DATABASES[alias]['NAME']
+                target = sqlite3.connect(path)
+                try:
+                    # online backup: a consistent snapshot even while the app writes
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: {path}')
+        finally:
+            source.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(settings.DATABASE_REPLICAS)} replica(s)'))
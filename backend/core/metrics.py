@@ -0,0 +1,320 @@
+"""
+Request Metrics
+Per-route latency/size histograms, DB and outbound HTTP time, in Prometheus text format
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: scrapes may briefly double count a worker that just exited
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'crm_http_request_duration_seconds': ('histogram', 'Request latency by route', LATENCY_BUCKETS),
+    'crm_http_response_size_bytes': ('histogram', 'Response body size by route (non-streaming)', SIZE_BUCKETS),
+    'crm_http_db_duration_seconds': ('histogram', 'Database time spent per request', LATENCY_BUCKETS),
+    'crm_http_outbound_duration_seconds': ('histogram', 'Outbound HTTP time spent per request', LATENCY_BUCKETS),
+    'crm_http_responses_total': ('counter', 'Responses by route and status', None),
+    'crm_outbound_request_duration_seconds': ('histogram', 'Outbound integration call latency', LATENCY_BUCKETS),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+class MetricsRegistry:
+    """
+    Per-process metric values, sharded per thread.
+
+    Each thread only ever writes to its own shard, so recording takes no lock;
+    a scrape copies and sums the shards. With METRICS_MULTIPROC_DIR set, every
+    worker also writes its totals to a file there (at most every
+    METRICS_FLUSH_INTERVAL seconds) and a scrape merges all workers' files.
+    Files are named per process start, not just pid, so a restarted worker
+    reusing a pid never overwrites its predecessor's counts; an exiting
+    worker folds its counters into DEAD_WORKERS_FILE and removes its own file
+    (like prometheus_client's mark_process_dead).
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 10.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._shards: List[Dict[Key, list]] = []
+        self._flush_lock = threading.Lock()
+        self._next_flush = 0.0
+        self._pid = None
+        self._path = None
+        self._dead = False
+
+    def _shard(self) -> Dict[Key, list]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            # list.append is atomic; shards of finished threads keep their counts
+            self._shards.append(shard)
+        return shard
+
+    def observe(self, name: str, labels: Labels, value: float):
+        buckets = METRICS[name][2]
+        shard = self._shard()
+        entry = shard.get((name, labels))
+        if entry is None:
+            # one slot per bucket, one for +Inf, then the sum
+            entry = shard[(name, labels)] = [0] * (len(buckets) + 1) + [0.0]
+        entry[bisect_left(buckets, value)] += 1
+        entry[-1] += value
+
+    def inc(self, name: str, labels: Labels, amount: float = 1):
+        shard = self._shard()
+        entry = shard.get((name, labels))
+        if entry is None:
+            entry = shard[(name, labels)] = [0]
+        entry[0] += amount
+
+    def snapshot(self) -> Dict[Key, list]:
+        """This process's totals"""
+        totals: Dict[Key, list] = {}
+        for shard in list(self._shards):
+            for key, entry in dict(shard).items():
+                _add(totals, key, entry)
+        return totals
+
+    def collect(self) -> Dict[Key, list]:
+        """Totals across workers when multiprocess, else this process's"""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        totals: Dict[Key, list] = {}
+        with _directory_lock(self.directory):
+            for path in _worker_files(self.directory):
+                for key, entry in _read(path).items():
+                    _add(totals, key, entry)
+        return totals
+
+    def maybe_flush(self):
+        if self.directory and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self):
+        if not self.directory or self._dead or not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_flush = time.monotonic() + self.flush_interval
+            _write(self.directory, self._worker_path(), self.snapshot())
+        finally:
+            self._flush_lock.release()
+
+    def mark_dead(self):
+        """On worker exit: fold this worker's counters into the dead workers' file and drop its own"""
+        if not self.directory or self._dead:
+            return
+        with self._flush_lock:
+            self._dead = True
+            # counters and histograms only grow, so a dead worker's counts stay
+            # in the totals; anything else (gauges) describes a live process
+            mine = {key: entry for key, entry in self.snapshot().items()
+                    if METRICS[key[0]][0] in ('counter', 'histogram')}
+            os.makedirs(self.directory, exist_ok=True)
+            with _directory_lock(self.directory):
+                dead_path = os.path.join(self.directory, DEAD_WORKERS_FILE)
+                dead = _read(dead_path)
+                for key, entry in mine.items():
+                    _add(dead, key, entry)
+                _write(self.directory, dead_path, dead)
+                if self._path is not None and self._pid == os.getpid():
+                    try:
+                        os.remove(self._path)
+                    except FileNotFoundError:
+                        pass
+
+    def _worker_path(self) -> str:
+        pid = os.getpid()
+        if self._pid != pid:
+            # first flush of this process (or of a forked worker)
+            self._pid = pid
+            self._path = os.path.join(self.directory, f'metrics-{pid}-{uuid.uuid4().hex[:12]}.json')
+        return self._path
+
+
+DEAD_WORKERS_FILE = 'metrics-dead.json'
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Serializes scrapes with exiting workers, so none is counted twice or missed"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'metrics.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read(path: str) -> Dict[Key, list]:
+    try:
+        with open(path) as f:
+            rows = json.load(f)
+    except (OSError, ValueError):
+        return {}  # gone, or a worker without a flush yet
+    return {(name, tuple(map(tuple, labels))): entry for name, labels, entry in rows}
+
+
+def _write(directory: str, path: str, totals: Dict[Key, list]):
+    rows = [[name, labels, entry] for (name, labels), entry in totals.items()]
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(rows, f)
+    os.replace(tmp, path)
+
+
+def _add(totals: Dict[Key, list], key: Key, entry: list):
+    current = totals.get(key)
+    if current is None:
+        totals[key] = list(entry)
+    else:
+        for i, value in enumerate(entry):
+            current[i] += value
+
+
+def _worker_files(directory: str) -> Iterable[str]:
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, n) for n in names if n.startswith('metrics-') and n.endswith('.json')]
+
+
+registry = MetricsRegistry(
+    directory=getattr(settings, 'METRICS_MULTIPROC_DIR', None),
+    flush_interval=getattr(settings, 'METRICS_FLUSH_INTERVAL', 10),
+)
+# keep the counts of a worker that is shutting down
+atexit.register(registry.mark_dead)
+
+
+# Per-request accumulators for DB and outbound time
+
+class RequestTimings:
+    __slots__ = ('db', 'outbound')
+
+    def __init__(self):
+        self.db = 0.0
+        self.outbound = 0.0
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def start_request() -> Tuple[RequestTimings, object]:
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def end_request(token):
+    _timings.reset(token)
+
+
+def timed_execute(execute, sql, params, many, context):
+    """Connection execute wrapper adding query time to the current request"""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+
+
+def install_db_timer(sender, connection, **kwargs):
+    """connection_created receiver. First in line, so execute_wrapper() blocks that pop() keep working"""
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+@contextmanager
+def outbound_timer(integration: str):
+    """Time an outbound HTTP call, per integration and toward the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe('crm_outbound_request_duration_seconds', (('integration', integration),), elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings.outbound += elapsed
+
+
+def record_request(route: str, method: str, status: int, tier: str, duration: float,
+                   size: Optional[int], timings: RequestTimings):
+    labels = (('route', route), ('method', method), ('tier', tier))
+    registry.observe('crm_http_request_duration_seconds', labels, duration)
+    if size is not None:
+        registry.observe('crm_http_response_size_bytes', labels, size)
+    registry.observe('crm_http_db_duration_seconds', labels, timings.db)
+    registry.observe('crm_http_outbound_duration_seconds', labels, timings.outbound)
+    registry.inc('crm_http_responses_total', labels + (('status', str(status)),))
+    registry.maybe_flush()
+
+
+# Prometheus text exposition format 0.0.4
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return '{' + pairs + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals: Dict[Key, list]) -> str:
+    by_name: Dict[str, list] = {}
+    for (name, labels), entry in sorted(totals.items()):
+        by_name.setdefault(name, []).append((labels, entry))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, entry in by_name.get(name, []):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(labels)} {_number(entry[0])}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), entry[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(entry[-1])}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
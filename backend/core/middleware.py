@@ -1,13 +1,32 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils.deprecation import MiddlewareMixin
-from .models import Tenant
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .db_router import (
+    RoutingState, choose_replica, enter_state, exit_state, is_pinned, pin_to_primary, replica_aliases,
+)
+from . import metrics, profiling
+from .query_budget import budget_for, budget_report, start_recording, stop_recording
+from .tenant_cache import tenant_resolver
 from django.http import HttpRequest
 
+logger = logging.getLogger(__name__)
+
 class TenantMiddleware(MiddlewareMixin):
     def process_request(self, request: HttpRequest):
         host = request.get_host().split(':')[0]
-        # Try subdomain/domain mapping
+        # Exact/subdomain mapping, served from the in-process resolver cache
         try:
-            tenant = Tenant.objects.filter(domain__icontains=host).first()
+            tenant = tenant_resolver.resolve(host)
             request.tenant = tenant
         except Exception:
             request.tenant = None
@@ -18,3 +37,247 @@ class TenantMiddleware(MiddlewareMixin):
         except Exception:
             pass
 
+
+def _validated_token(request):
+    """The request's valid bearer token, if any; verifies the signature only, no database"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+
+
+def _token_user_id(request) -> Optional[int]:
+    token = _validated_token(request)
+    return token.get(jwt_settings.USER_ID_CLAIM) if token is not None else None
+
+
+def _is_staff(request) -> bool:
+    """Staff per the token's is_staff claim, else per the session user (admin)"""
+    token = _validated_token(request)
+    if token is not None:
+        return bool(token.get('is_staff'))
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_staff)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route the reads of GET/HEAD/OPTIONS requests to a read replica.
+
+    Requests whose user or tenant wrote within REPLICA_STICKY_SECONDS stay on
+    the primary, and any request that writes pins both for that window once
+    it finishes. Place after TenantMiddleware. See core.db_router.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        token = enter_state(self._route(request))
+        try:
+            return self.get_response(request)
+        finally:
+            exit_state(token)
+            self._finish(request)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        # the pin lookup may block on the cache; the state itself is set on the loop
+        token = enter_state(await sync_to_async(self._route)(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            exit_state(token)
+            await sync_to_async(self._finish)(request)
+
+    def _route(self, request) -> RoutingState:
+        tenant_id = getattr(getattr(request, 'tenant', None), 'id', None)
+        request.replica_pin = (tenant_id, _token_user_id(request))
+        pinned = is_pinned(*request.replica_pin)
+        replica = choose_replica() if request.method in SAFE_METHODS and not pinned else None
+        request.replica_state = RoutingState(replica, pinned=pinned)
+        return request.replica_state
+
+    def _finish(self, request):
+        if request.replica_state.wrote:
+            pin_to_primary(*request.replica_pin)
+
+
+class QueryCountMiddleware:
+    """
+    Count each request's queries and flag repeated ones (dev instrumentation).
+
+    Enabled by QUERY_INSTRUMENTATION (default: DEBUG). Adds X-Query-Count and
+    X-Query-Repeats headers and logs a warning when a query signature repeats
+    N_PLUS_ONE_THRESHOLD times or the endpoint goes over its QUERY_BUDGETS
+    entry. Queries run while a streaming response is consumed are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, token = start_recording()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_recording(token)
+        return self._report(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder, token = start_recording()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_recording(token)
+        return self._report(request, response, recorder)
+
+    def _report(self, request, response, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        budget = budget_for(request.method, view_name)
+        duplicates = recorder.duplicates()
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Repeats'] = str(len(duplicates))
+        if duplicates or (budget is not None and recorder.count > budget):
+            logger.warning(budget_report(f'{request.method} {request.path}', recorder, budget))
+        else:
+            logger.debug('%s %s: %d queries', request.method, request.path, recorder.count)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record per-route latency, response size, DB time and outbound HTTP time,
+    labelled by tenant tier, for the /metrics endpoint (see core.metrics).
+    Place first so the latency covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        timings, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self._record(request, response, time.perf_counter() - start, timings)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        timings, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self._record(request, response, time.perf_counter() - start, timings)
+        return response
+
+    def _record(self, request, response, duration, timings):
+        match = getattr(request, 'resolver_match', None)
+        tenant = getattr(request, 'tenant', None)
+        metrics.record_request(
+            route=match.view_name if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            tier=getattr(tenant, 'subscription_tier', None) or 'none',
+            duration=duration,
+            size=None if response.streaming else len(response.content),
+            timings=timings,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with a stack sampler when a staff user sends
+    `X-Profile: 1` or PROFILING_SAMPLE_RATE picks it, and store the result
+    as a RequestProfile (id returned in X-Profile-Id). Untriggered requests
+    pay one header lookup and, with a sample rate set, one random().
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, 'PROFILING_INTERVAL_MS', 5) / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = profiling.should_profile(request, _is_staff)
+        if trigger is None:
+            return self.get_response(request)
+        sampler = profiling.StackSampler([threading.get_ident()], self.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        return self._store(request, response, sampler, trigger, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        trigger = None
+        if profiling.PROFILE_HEADER in request.headers or getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0):
+            # the staff check may load the session user
+            trigger = await sync_to_async(profiling.should_profile)(request, _is_staff)
+        if trigger is None:
+            return await self.get_response(request)
+        # sync views, and the ORM work of async ones, run in this request's
+        # thread-sensitive sync_to_async worker, not on the event loop
+        threads = [await sync_to_async(threading.get_ident)()]
+        if profiling.view_is_async(request):
+            threads.append(threading.get_ident())
+        sampler = profiling.StackSampler(threads, self.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        return await sync_to_async(self._store)(request, response, sampler, trigger, time.perf_counter() - start)
+
+    def _store(self, request, response, sampler, trigger, duration):
+        try:
+            profile = profiling.store_profile(request, response, sampler, trigger, duration, _token_user_id(request))
+        except Exception:
+            # never fail the profiled request itself
+            logger.exception('Could not store request profile for %s', request.path)
+            return response
+        if profile is not None:
+            response['X-Profile-Id'] = str(profile.id)
+        return response
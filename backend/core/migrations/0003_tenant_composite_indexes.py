@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_metaadscampaign_whatsappconversation_integration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['tenant', 'id'], name='booking_tenant_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tenant', 'id'], name='customer_tenant_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['tenant', 'id'], name='deal_tenant_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'id'], name='lead_tenant_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'status', 'created_at'], name='lead_tenant_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'phone'], name='lead_tenant_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'email'], name='lead_tenant_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metaadscampaign',
+            index=models.Index(fields=['tenant', '-created_at'], name='campaign_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='travelpackage',
+            index=models.Index(fields=['tenant', 'id'], name='package_tenant_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='whatsappconversation',
+            index=models.Index(fields=['tenant', 'conversation_id'], name='wa_conv_tenant_conv_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='whatsappconversation',
+            index=models.Index(fields=['tenant', 'phone_number'], name='wa_conv_tenant_phone_idx'),
+        ),
+    ]
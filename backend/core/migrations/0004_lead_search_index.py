@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# The search index as of this migration. The statements are copied here
+# rather than imported from core.search so later changes to that module
+# cannot change what this migration does.
+
+# SQLite: contentless FTS5 table kept in sync by triggers; each row carries
+# its tenant as a "t<id>" token.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_lead_fts USING fts5("
+    "tenant, first_name, last_name, email, phone, destination, notes, content='')",
+    """CREATE TRIGGER IF NOT EXISTS core_lead_fts_ai AFTER INSERT ON core_lead BEGIN
+        INSERT INTO core_lead_fts(rowid, tenant, first_name, last_name, email, phone, destination, notes)
+        VALUES (new.id, 't' || new.tenant_id, new.first_name, new.last_name, new.email, new.phone,
+                new.destination, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS core_lead_fts_ad AFTER DELETE ON core_lead BEGIN
+        INSERT INTO core_lead_fts(core_lead_fts, rowid, tenant, first_name, last_name, email, phone, destination, notes)
+        VALUES ('delete', old.id, 't' || old.tenant_id, old.first_name, old.last_name, old.email, old.phone,
+                old.destination, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS core_lead_fts_au AFTER UPDATE ON core_lead BEGIN
+        INSERT INTO core_lead_fts(core_lead_fts, rowid, tenant, first_name, last_name, email, phone, destination, notes)
+        VALUES ('delete', old.id, 't' || old.tenant_id, old.first_name, old.last_name, old.email, old.phone,
+                old.destination, old.notes);
+        INSERT INTO core_lead_fts(rowid, tenant, first_name, last_name, email, phone, destination, notes)
+        VALUES (new.id, 't' || new.tenant_id, new.first_name, new.last_name, new.email, new.phone,
+                new.destination, new.notes);
+    END""",
+    """INSERT INTO core_lead_fts(rowid, tenant, first_name, last_name, email, phone, destination, notes)
+        SELECT id, 't' || tenant_id, first_name, last_name, email, phone, destination, notes FROM core_lead""",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS core_lead_fts_ai",
+    "DROP TRIGGER IF EXISTS core_lead_fts_ad",
+    "DROP TRIGGER IF EXISTS core_lead_fts_au",
+    "DROP TABLE IF EXISTS core_lead_fts",
+]
+
+# PostgreSQL: a stored generated tsvector column with a GIN index.
+POSTGRES_INSTALL = [
+    """ALTER TABLE core_lead ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(email, '') || ' ' || coalesce(phone, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(destination, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(notes, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS lead_search_vector_idx ON core_lead USING GIN (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS lead_search_vector_idx",
+    "ALTER TABLE core_lead DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def install(apps, schema_editor):
+    statements = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_tenant_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
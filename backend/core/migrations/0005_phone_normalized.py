@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_lead_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lead',
+            name='lead_tenant_phone_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='whatsappconversation',
+            name='wa_conv_tenant_phone_idx',
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='whatsappconversation',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'phone_normalized'], name='lead_tenant_phone_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='whatsappconversation',
+            index=models.Index(fields=['tenant', 'phone_normalized'], name='wa_conv_tenant_phone_norm_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadDedupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('last_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('last_lead_id', models.BigIntegerField(default=0)),
+                ('merged_total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'updated_at', 'id'], name='lead_tenant_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='leaddedupcheckpoint',
+            name='tenant',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='lead_dedup_checkpoint', to='core.tenant'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_lead_dedup_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantModelVersion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100)),
+                ('version', models.BigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField()),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='model_versions', to='core.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant', 'model')},
+            },
+        ),
+    ]
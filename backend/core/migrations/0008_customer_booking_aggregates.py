@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:17
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+
+
+def backfill_booking_created_at(apps, schema_editor):
+    # AddField stamped every existing booking with the time this migration
+    # ran. Use the customer's lead creation time instead (the booking came
+    # after it), or the travel date for customers without a lead, capped at
+    # now, so last_booking_date and the booking rollups keep their history.
+    Booking = apps.get_model('core', 'Booking')
+    Customer = apps.get_model('core', 'Customer')
+    lead_created = Customer.objects.filter(id=OuterRef('customer_id')).values('lead__created_at')[:1]
+    now = django.utils.timezone.now()
+    Booking.objects.update(created_at=Coalesce(
+        Subquery(lead_created), Least('travel_date', Value(now)),
+        output_field=models.DateTimeField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_booking_created_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='customer',
+            name='avg_booking_value',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='booking_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
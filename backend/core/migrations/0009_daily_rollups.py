@@ -0,0 +1,134 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+
+
+def backfill_deal_created_at(apps, schema_editor):
+    # Same as the booking backfill in 0008: AddField stamped every existing
+    # deal with the time this migration ran, which would put the whole deal
+    # history on one day of the rollups. Use the customer's lead creation
+    # time, else the expected close date capped at now.
+    Deal = apps.get_model('core', 'Deal')
+    Customer = apps.get_model('core', 'Customer')
+    lead_created = Customer.objects.filter(id=OuterRef('customer_id')).values('lead__created_at')[:1]
+    now = django.utils.timezone.now()
+    Deal.objects.update(created_at=Coalesce(
+        Subquery(lead_created), Least('expected_close_date', Value(now)), Value(now),
+        output_field=models.DateTimeField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_customer_booking_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('pax', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCampaignRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('campaigns', models.IntegerField(default=0)),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('impressions', models.BigIntegerField(default=0)),
+                ('clicks', models.BigIntegerField(default=0)),
+                ('conversions', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyDealRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('stage', models.CharField(max_length=100)),
+                ('deals', models.IntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyLeadRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('source', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(max_length=50)),
+                ('leads', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_deal_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['tenant', 'created_at'], name='booking_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['tenant', 'created_at'], name='deal_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'created_at'], name='lead_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metaadscampaign',
+            index=models.Index(fields=['tenant', 'start_date'], name='campaign_tenant_start_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailybookingrollup',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.tenant'),
+        ),
+        migrations.AddField(
+            model_name='dailycampaignrollup',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.tenant'),
+        ),
+        migrations.AddField(
+            model_name='dailydealrollup',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.tenant'),
+        ),
+        migrations.AddField(
+            model_name='dailyleadrollup',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.tenant'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailybookingrollup',
+            unique_together={('tenant', 'day')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailycampaignrollup',
+            unique_together={('tenant', 'day')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailydealrollup',
+            unique_together={('tenant', 'day', 'stage')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyleadrollup',
+            unique_together={('tenant', 'day', 'source', 'status')},
+        ),
+    ]
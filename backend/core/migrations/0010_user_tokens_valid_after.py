@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
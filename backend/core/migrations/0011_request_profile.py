@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_user_tokens_valid_after'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('route', models.CharField(max_length=200)),
+                ('status_code', models.IntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('trigger', models.CharField(choices=[('header', 'Header'), ('sampling', 'Sampling')], max_length=20)),
+                ('interval_ms', models.FloatField()),
+                ('sample_count', models.IntegerField()),
+                ('collapsed', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['route', '-id'], name='profile_route_id_idx'), models.Index(fields=['tenant', '-id'], name='profile_tenant_id_idx')],
+            },
+        ),
+    ]
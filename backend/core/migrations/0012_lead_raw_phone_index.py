@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_request_profile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'phone'], name='lead_tenant_phone_idx'),
+        ),
+    ]
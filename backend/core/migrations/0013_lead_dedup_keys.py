@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_lead_raw_phone_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='name_destination_key',
+            field=models.CharField(blank=True, editable=False, max_length=460, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'email_normalized'], name='lead_tenant_email_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'name_destination_key'], name='lead_tenant_name_dest_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from .phones import normalize_phone
+from .lead_keys import normalize_email, name_destination_key
 
 class Tenant(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -45,6 +47,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     last_login = models.DateTimeField(null=True, blank=True)
+    # tokens issued before this are rejected (see core.authentication)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
 
     objects = UserManager()
 
@@ -65,6 +69,11 @@ class Lead(models.Model):
     id = models.BigAutoField(primary_key=True)
     email = models.EmailField(null=True, blank=True)
     phone = models.CharField(max_length=50, null=True, blank=True)
+    # E.164 form of `phone`, maintained on save; match phones on this column
+    phone_normalized = models.CharField(max_length=16, null=True, blank=True, editable=False)
+    # Dedup blocking keys (see core.lead_keys), maintained on save
+    email_normalized = models.CharField(max_length=254, null=True, blank=True, editable=False)
+    name_destination_key = models.CharField(max_length=460, null=True, blank=True, editable=False)
     first_name = models.CharField(max_length=100, null=True, blank=True)
     last_name = models.CharField(max_length=100, null=True, blank=True)
     source = models.CharField(max_length=100, null=True, blank=True)
@@ -81,16 +90,87 @@ class Lead(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='lead_tenant_id_idx'),
+            models.Index(fields=['tenant', 'status', 'created_at'], name='lead_tenant_status_idx'),
+            models.Index(fields=['tenant', 'phone_normalized'], name='lead_tenant_phone_norm_idx'),
+            # raw-phone fallback for numbers that do not normalize (core.phones.phone_lookup)
+            models.Index(fields=['tenant', 'phone'], name='lead_tenant_phone_idx'),
+            models.Index(fields=['tenant', 'email'], name='lead_tenant_email_idx'),
+            models.Index(fields=['tenant', 'email_normalized'], name='lead_tenant_email_norm_idx'),
+            models.Index(fields=['tenant', 'name_destination_key'], name='lead_tenant_name_dest_idx'),
+            models.Index(fields=['tenant', 'updated_at', 'id'], name='lead_tenant_updated_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='lead_tenant_created_idx'),
+        ]
+
+    # source columns -> derived columns set_match_keys() recomputes from them
+    DERIVED_FIELDS = {
+        'phone': {'phone_normalized'},
+        'email': {'email_normalized'},
+        'first_name': {'name_destination_key'},
+        'last_name': {'name_destination_key'},
+        'destination': {'name_destination_key'},
+    }
+
+    def set_match_keys(self):
+        """Recompute the normalized matching columns; bulk writes must call this themselves"""
+        self.phone_normalized = normalize_phone(self.phone)
+        self.email_normalized = normalize_email(self.email)
+        self.name_destination_key = name_destination_key(self.first_name, self.last_name, self.destination)
+
+    def save(self, *args, **kwargs):
+        self.set_match_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = set().union(*(self.DERIVED_FIELDS.get(f, set()) for f in update_fields))
+            if derived:
+                kwargs['update_fields'] = set(update_fields) | derived
+        # the daily rollups are updated from signals in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class LeadDedupCheckpoint(models.Model):
+    """Per-tenant progress of the lead dedup job (see core.dedup)"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, related_name='lead_dedup_checkpoint')
+    # (updated_at, id) of the last lead processed; the next run starts after it
+    last_updated_at = models.DateTimeField(null=True, blank=True)
+    last_lead_id = models.BigIntegerField(default=0)
+    merged_total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class TenantModelVersion(models.Model):
+    """Per-tenant change counter for a model, bumped on every write (see core.versions)"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='model_versions')
+    model = models.CharField(max_length=100)  # app_label.ModelName
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tenant', 'model')
+
 
 class Customer(models.Model):
     id = models.BigAutoField(primary_key=True)
     lead = models.ForeignKey(Lead, null=True, blank=True, on_delete=models.SET_NULL)
     customer_type = models.CharField(max_length=100, null=True, blank=True)
     loyalty_level = models.CharField(max_length=100, null=True, blank=True)
+    # Booking aggregates, kept in step with Booking writes (see core.aggregates)
+    booking_count = models.IntegerField(default=0)
     total_spent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    avg_booking_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     last_booking_date = models.DateTimeField(null=True, blank=True)
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='customer_tenant_id_idx'),
+        ]
+
 
 class Deal(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -102,6 +182,18 @@ class Deal(models.Model):
     expected_close_date = models.DateTimeField(null=True, blank=True)
     assigned_to = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='deal_tenant_id_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='deal_tenant_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the daily rollups are updated from signals in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 class Communication(models.Model):
@@ -124,6 +216,11 @@ class TravelPackage(models.Model):
     destination = models.CharField(max_length=255)
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='package_tenant_id_idx'),
+        ]
+
 
 class Booking(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -134,6 +231,18 @@ class Booking(models.Model):
     travel_date = models.DateTimeField()
     pax_count = models.IntegerField()
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='booking_tenant_id_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='booking_tenant_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the customer aggregates and daily rollups are updated from signals in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 class Integration(models.Model):
@@ -190,9 +299,20 @@ class MetaAdsCampaign(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', '-created_at'], name='campaign_tenant_created_idx'),
+            models.Index(fields=['tenant', 'start_date'], name='campaign_tenant_start_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.campaign_name} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        # the daily rollups are updated from signals in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class WhatsAppConversation(models.Model):
     """Track WhatsApp conversations"""
@@ -202,6 +322,8 @@ class WhatsAppConversation(models.Model):
     customer = models.ForeignKey(Customer, null=True, blank=True, on_delete=models.SET_NULL)
     conversation_id = models.CharField(max_length=255)  # ID from WhatsApp Agent
     phone_number = models.CharField(max_length=50)
+    # E.164 form of `phone_number`, maintained on save
+    phone_normalized = models.CharField(max_length=16, null=True, blank=True, editable=False)
     last_message_at = models.DateTimeField()
     message_count = models.IntegerField(default=0)
     sentiment_score = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)  # -1.0 to 1.0
@@ -211,5 +333,107 @@ class WhatsAppConversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'conversation_id'], name='wa_conv_tenant_conv_idx'),
+            models.Index(fields=['tenant', 'phone_normalized'], name='wa_conv_tenant_phone_norm_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.phone_normalized = normalize_phone(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone_number' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'phone_normalized'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"Conversation with {self.phone_number}"
+
+
+# Daily rollups: one row per (tenant, day[, dimension]), moved by the
+# difference on every write to a source row (see core.rollups)
+
+class DailyLeadRollup(models.Model):
+    """Leads created per day, by source and current status"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    day = models.DateField()
+    source = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=50)
+    leads = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('tenant', 'day', 'source', 'status')
+
+
+class DailyBookingRollup(models.Model):
+    """Bookings made per day and their value (cancelled bookings excluded)"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    day = models.DateField()
+    bookings = models.IntegerField(default=0)
+    pax = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('tenant', 'day')
+
+
+class DailyDealRollup(models.Model):
+    """Deals opened per day, by current stage"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    day = models.DateField()
+    stage = models.CharField(max_length=100)
+    deals = models.IntegerField(default=0)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('tenant', 'day', 'stage')
+
+
+class DailyCampaignRollup(models.Model):
+    """Meta Ads campaigns by start day, with their latest reported performance"""
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    day = models.DateField()
+    campaigns = models.IntegerField(default=0)
+    spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    impressions = models.BigIntegerField(default=0)
+    clicks = models.BigIntegerField(default=0)
+    conversions = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('tenant', 'day')
+
+
+class RequestProfile(models.Model):
+    """Sampled call stacks of one profiled request (see core.profiling)"""
+    TRIGGER_CHOICES = [
+        ('header', 'Header'),
+        ('sampling', 'Sampling'),
+    ]
+    id = models.BigAutoField(primary_key=True)
+    tenant = models.ForeignKey(Tenant, null=True, blank=True, on_delete=models.SET_NULL)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    route = models.CharField(max_length=200)
+    status_code = models.IntegerField()
+    duration_ms = models.FloatField()
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    interval_ms = models.FloatField()
+    sample_count = models.IntegerField()
+    # collapsed stacks, one "root;...;leaf count" line each (flamegraph.pl / speedscope input)
+    collapsed = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['route', '-id'], name='profile_route_id_idx'),
+            models.Index(fields=['tenant', '-id'], name='profile_tenant_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration_ms:.0f}ms)'
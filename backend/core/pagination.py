@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Opaque-cursor pagination over the primary key.
+
+    Ids are BigAutoField and therefore unique and monotonic, so every page
+    is a single `WHERE id < :cursor ORDER BY id DESC LIMIT n` probe; deep
+    pages cost the same as the first one and never need an OFFSET.
+    """
+    ordering = '-id'
+    page_size = getattr(settings, 'DEFAULT_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 500)
@@ -0,0 +1,53 @@
+"""
+Phone Number Normalization
+Best-effort E.164 formatting used for indexed phone matching
+"""
+import re
+from typing import Dict, Optional
+
+from django.conf import settings
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(raw: Optional[str], default_country_code: Optional[str] = None) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 ('+<country><number>').
+
+    '+1 (555) 010-0100', '001 555 010 0100' and, with default country code
+    '1', '(555) 010-0100' all become '+15550100100'. Numbers without a
+    country code are only normalized when a default is configured. Returns
+    None for values that cannot be a valid E.164 number.
+    """
+    if not raw:
+        return None
+    raw = raw.strip()
+    if default_country_code is None:
+        default_country_code = getattr(settings, 'DEFAULT_PHONE_COUNTRY_CODE', '')
+
+    digits = _NON_DIGITS.sub('', raw)
+    if raw.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif default_country_code:
+        # drop a national trunk prefix ('0...') before adding the country code
+        digits = default_country_code + digits.lstrip('0')
+    else:
+        return None
+
+    if not 8 <= len(digits) <= 15 or digits.startswith('0'):
+        return None
+    return '+' + digits
+
+
+def phone_lookup(raw: Optional[str], field: str = 'phone') -> Dict[str, Optional[str]]:
+    """
+    Filter kwargs matching a phone number: the indexed normalized column when
+    the number normalizes, otherwise an exact match on the raw column (Lead
+    keeps a (tenant, phone) index for that fallback).
+    """
+    normalized = normalize_phone(raw)
+    if normalized:
+        return {'phone_normalized': normalized}
+    return {field: raw}
@@ -0,0 +1,63 @@
+"""
+Deal Pipeline Summary
+Per-stage and per-assignee pipeline totals from a single GROUP BY
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Deal
+
+_ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def pipeline_summary(tenant_id: int) -> Dict[str, Any]:
+    """
+    Deals grouped by (stage, assignee) in the database; the per-stage and
+    per-assignee views are folded from those few rows in Python. A deal
+    without a probability contributes nothing to the weighted value.
+    """
+    weighted = ExpressionWrapper(
+        F('value') * Coalesce('probability', Value(0)) / Value(100.0),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    rows = (Deal.objects.filter(tenant_id=tenant_id)
+            .values('stage', 'assigned_to_id', 'assigned_to__email')
+            .annotate(
+                deals=Count('id'),
+                total_value=Coalesce(Sum('value'), _ZERO),
+                total_weighted=Coalesce(Sum(weighted), _ZERO),
+            )
+            .order_by())
+
+    by_stage = defaultdict(lambda: {'deals': 0, 'value': Decimal('0'), 'weighted_value': Decimal('0')})
+    by_assignee = defaultdict(lambda: {'deals': 0, 'value': Decimal('0'), 'weighted_value': Decimal('0')})
+    assignee_emails = {}
+    for row in rows:
+        for bucket in (by_stage[row['stage']], by_assignee[row['assigned_to_id']]):
+            bucket['deals'] += row['deals']
+            bucket['value'] += Decimal(row['total_value'])
+            bucket['weighted_value'] += Decimal(row['total_weighted'])
+        assignee_emails[row['assigned_to_id']] = row['assigned_to__email']
+
+    def money(totals):
+        return {
+            'deals': totals['deals'],
+            'value': float(totals['value']),
+            'weighted_value': round(float(totals['weighted_value']), 2),
+        }
+
+    stages = [{'stage': stage, **money(totals)} for stage, totals in sorted(by_stage.items())]
+    assignees = [
+        {'assigned_to': user_id, 'email': assignee_emails[user_id], **money(totals)}
+        for user_id, totals in sorted(by_assignee.items(), key=lambda item: -item[1]['value'])
+    ]
+    total = {'deals': 0, 'value': Decimal('0'), 'weighted_value': Decimal('0')}
+    for totals in by_stage.values():
+        for key in total:
+            total[key] += totals[key]
+
+    return {'total': money(total), 'by_stage': stages, 'by_assignee': assignees}
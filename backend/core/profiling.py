@@ -0,0 +1,135 @@
+"""
+Request Profiling
+Sampling profiler for single requests, stored as collapsed stacks for flamegraphs
+"""
+import os
+import random
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from .models import RequestProfile
+
+PROFILE_HEADER = 'X-Profile'
+
+# longest prefixes first, so site-packages wins over the stdlib directory containing it
+_PATH_PREFIXES = sorted(
+    {p for p in (sysconfig.get_paths().get('purelib'), sysconfig.get_paths().get('stdlib'),
+                 str(settings.BASE_DIR)) if p},
+    key=len, reverse=True,
+)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+def collapse(frame, labels: Dict) -> str:
+    """Root-first "func (file:line);..." for one stack; labels caches per code object"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+        names.append(label)
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class StackSampler:
+    """
+    Samples the stacks of the given threads every `interval` seconds from a
+    helper thread.
+
+    The profiled threads run untouched (no tracing hooks), so the cost is
+    the sampler's own work, paid only while a request is being profiled.
+    Under ASGI the event loop is shared, so when it is sampled (async views)
+    concurrent requests on the same loop show up too.
+    """
+
+    def __init__(self, thread_ids: Iterable[int], interval: float):
+        self.thread_ids = tuple(thread_ids)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._labels: Dict = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[collapse(frame, self._labels)] += 1
+            del frames, frame
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def should_profile(request, is_staff) -> Optional[str]:
+    """
+    'header' when a staff user sent X-Profile: 1, 'sampling' for the
+    PROFILING_SAMPLE_RATE share of requests, else None. `is_staff` is only
+    called when the header is present.
+    """
+    if request.headers.get(PROFILE_HEADER) == '1' and is_staff(request):
+        return 'header'
+    rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+    if rate and random.random() < rate:
+        return 'sampling'
+    return None
+
+
+def view_is_async(request) -> bool:
+    """Whether the request's view is a coroutine, i.e. runs on the event loop under ASGI"""
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return False
+    return iscoroutinefunction(match.func)
+
+
+def store_profile(request, response, sampler: StackSampler, trigger: str, duration: float,
+                  user_id: Optional[int]) -> Optional[RequestProfile]:
+    """Save the profile; sampled requests faster than PROFILING_MIN_DURATION_MS are dropped"""
+    duration_ms = duration * 1000
+    if trigger == 'sampling' and duration_ms < getattr(settings, 'PROFILING_MIN_DURATION_MS', 500):
+        return None
+    match = getattr(request, 'resolver_match', None)
+    return RequestProfile.objects.create(
+        tenant_id=getattr(getattr(request, 'tenant', None), 'id', None),
+        user_id=user_id,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        route=(match.view_name if match else 'unmatched')[:200],
+        status_code=response.status_code,
+        duration_ms=duration_ms,
+        trigger=trigger,
+        interval_ms=sampler.interval * 1000,
+        sample_count=sampler.sample_count,
+        collapsed=sampler.collapsed(),
+    )
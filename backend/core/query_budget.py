@@ -0,0 +1,236 @@
+"""
+Query Budgets
+Per-request query counting, repeated-query (N+1) detection and per-endpoint budgets
+"""
+import json
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+# "IN (%s, %s, %s)" and multi-row VALUES differ only in how many placeholders they carry
+_PLACEHOLDER_RUN = re.compile(r'%s(?:\s*,\s*%s)+')
+_VALUES_RUN = re.compile(r'\(%s\.\.\.\)(?:\s*,\s*\(%s\.\.\.\))+')
+
+
+def query_signature(sql: str) -> str:
+    """SQL text with parameter lists collapsed, so the same query with other values matches"""
+    sql = _PLACEHOLDER_RUN.sub('%s...', sql)
+    return _VALUES_RUN.sub('(%s...)', sql)
+
+
+class QueryRecorder:
+    """execute_wrapper counting queries and their signatures on every connection"""
+
+    def __init__(self):
+        self.count = 0
+        self.signatures: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.signatures[query_signature(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def duplicates(self, min_repeats: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Signatures run at least `min_repeats` times, most repeated first"""
+        if min_repeats is None:
+            min_repeats = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 3)
+        return [(sql, n) for sql, n in self.signatures.most_common() if n >= min_repeats]
+
+
+@contextmanager
+def record_queries():
+    """Record the queries run inside the block, on every configured database"""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+_request_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar('request_queries', default=None)
+
+
+def start_recording() -> Tuple[QueryRecorder, object]:
+    """
+    Count the queries of the current request on any thread it runs on. Unlike
+    record_queries(), this follows the request into sync_to_async workers,
+    which use their own connections.
+    """
+    recorder = QueryRecorder()
+    return recorder, _request_recorder.set(recorder)
+
+
+def stop_recording(token):
+    _request_recorder.reset(token)
+
+
+def recorded_execute(execute, sql, params, many, context):
+    """Connection execute wrapper counting queries toward the current request"""
+    recorder = _request_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver, first in line like metrics.install_db_timer"""
+    if recorded_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, recorded_execute)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def budget_report(label: str, recorder: QueryRecorder, limit: Optional[int]) -> str:
+    lines = [f"{label}: {recorder.count} queries, budget {limit if limit is not None else 'none'}"]
+    lines += [f'  {n}x {sql}' for sql, n in recorder.duplicates(min_repeats=2)]
+    return '\n'.join(lines)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = 'block'):
+    """
+    Fail with QueryBudgetExceeded when the block runs more than `limit`
+    queries; the message lists the repeated ones. For tests and CI checks.
+    """
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.count > limit:
+        raise QueryBudgetExceeded(budget_report(label, recorder, limit))
+
+
+class EndpointBudget(NamedTuple):
+    method: str
+    view_name: str
+    # formatted with the ids of the check_query_budgets fixture
+    path: str
+    max_queries: int
+    data: Optional[dict] = None
+
+
+# Most queries one request may run, measured by check_query_budgets with the
+# response cache off and auth served from token claims. A budget must not depend on how many rows the
+# tenant has; check_query_budgets seeds several rows per table so an N+1 shows up.
+QUERY_BUDGETS: List[EndpointBudget] = [
+    EndpointBudget('GET', 'lead-list', '/api/leads/', 2),
+    EndpointBudget('GET', 'lead-detail', '/api/leads/{lead}/', 2),
+    EndpointBudget('GET', 'lead-search', '/api/leads/search/?q=maria', 2),
+    EndpointBudget('GET', 'customer-list', '/api/customers/', 2),
+    EndpointBudget('GET', 'customer-detail', '/api/customers/{customer}/', 2),
+    EndpointBudget('GET', 'deal-list', '/api/deals/', 2),
+    EndpointBudget('GET', 'deal-pipeline', '/api/deals/pipeline/', 1),
+    EndpointBudget('GET', 'travelpackage-list', '/api/packages/', 2),
+    EndpointBudget('GET', 'booking-list', '/api/bookings/', 2),
+    EndpointBudget('GET', 'user-list', '/api/users/', 1),
+    EndpointBudget('GET', 'dashboard-summary', '/api/dashboard/summary/?days=30', 7),
+    EndpointBudget('GET', 'dashboard-leads', '/api/dashboard/leads/?days=30', 3),
+    EndpointBudget('GET', 'dashboard-bookings', '/api/dashboard/bookings/?days=30', 1),
+    EndpointBudget('GET', 'dashboard-deals', '/api/dashboard/deals/?days=30', 2),
+    EndpointBudget('GET', 'dashboard-campaigns', '/api/dashboard/campaigns/?days=30', 1),
+    EndpointBudget('GET', 'integration-list', '/api/integrations/', 1),
+    EndpointBudget('GET', 'meta-ads-campaigns', '/api/meta-ads/campaigns/', 1),
+    EndpointBudget('GET', 'ml:forecast-revenue', '/api/ml/forecast-revenue/', 2),
+    EndpointBudget('GET', 'ml:insights', '/api/ml/insights/', 4),
+    EndpointBudget('POST', 'ml:score-lead', '/api/ml/score-lead/', 1, {'lead_id': '{lead}'}),
+    EndpointBudget('POST', 'ml:predict-churn', '/api/ml/predict-churn/', 1, {'customer_id': '{customer}'}),
+    EndpointBudget('POST', 'ml:recommend-price', '/api/ml/recommend-price/', 2, {'package_id': '{package}'}),
+]
+
+_by_view: Dict[Tuple[str, str], int] = {(b.method, b.view_name): b.max_queries for b in QUERY_BUDGETS}
+
+
+def budget_for(method: str, view_name: Optional[str]) -> Optional[int]:
+    return _by_view.get((method, view_name))
+
+
+def seed_budget_fixture(rows: int = 5) -> Dict[str, int]:
+    """One tenant with `rows` rows per table; returns the ids QUERY_BUDGETS paths use"""
+    from .models import (
+        Tenant, User, Lead, Customer, Deal, TravelPackage, Booking, Integration, MetaAdsCampaign,
+        WhatsAppConversation,
+    )
+
+    now = timezone.now()
+    tenant = Tenant.objects.create(name='Budget Check', domain='budget-check.travelcrm.io', subscription_tier='pro')
+    user = User.objects.create_user('budget-check@travelcrm.io', 'budget-check', tenant=tenant, role='ADMIN')
+    packages, leads, customers = [], [], []
+    for i in range(rows):
+        packages.append(TravelPackage.objects.create(
+            tenant=tenant, name=f'Package {i}', base_price=1000 + i, duration=7, destination='Bali'))
+        leads.append(Lead.objects.create(
+            tenant=tenant, first_name='Maria', last_name=f'Garcia{i}', email=f'maria{i}@example.com',
+            phone=f'+1555000{i:04d}', destination='Bali', budget=2000, assigned_to=user))
+        customers.append(Customer.objects.create(tenant=tenant, lead=leads[-1]))
+        Booking.objects.create(
+            tenant=tenant, customer=customers[-1], package=packages[-1], status='confirmed',
+            total_amount=1000 + i, travel_date=now, pax_count=2)
+        Deal.objects.create(
+            tenant=tenant, customer=customers[-1], title=f'Deal {i}', value=1000 + i, stage='proposal',
+            assigned_to=user)
+        MetaAdsCampaign.objects.create(
+            tenant=tenant, package=packages[-1], campaign_id=f'cmp-{i}', campaign_name=f'Campaign {i}',
+            budget=100, start_date=now)
+        WhatsAppConversation.objects.create(
+            tenant=tenant, lead=leads[-1], conversation_id=f'conv-{i}', phone_number=leads[-1].phone,
+            last_message_at=now)
+    for integration_type, _ in Integration.INTEGRATION_TYPES[:rows]:
+        Integration.objects.create(tenant=tenant, integration_type=integration_type, credentials={})
+    return {
+        'tenant': tenant.id, 'user': user.id,
+        'lead': leads[0].id, 'customer': customers[0].id, 'package': packages[0].id,
+    }
+
+
+def _format(value, ids: Dict[str, int]):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _format(item, ids) for key, item in value.items()}
+    return value
+
+
+def check_query_budgets(ids: Dict[str, int]) -> List[Dict[str, object]]:
+    """
+    Request every QUERY_BUDGETS endpoint as the fixture's admin and count queries.
+    Each endpoint is requested twice and the second, warm request is measured.
+    Run inside a transaction that is rolled back, with the response cache off.
+    """
+    from django.test import Client
+    from .authentication import TenantTokenObtainPairSerializer
+    from .models import Tenant, User
+
+    user = User.objects.get(pk=ids['user'])
+    token = TenantTokenObtainPairSerializer.get_token(user).access_token
+    client = Client(
+        HTTP_HOST=Tenant.objects.get(pk=ids['tenant']).domain,
+        HTTP_AUTHORIZATION=f'Bearer {token}',
+    )
+
+    results = []
+    for budget in QUERY_BUDGETS:
+        path = _format(budget.path, ids)
+        data = _format(budget.data, ids)
+
+        def request():
+            if budget.method == 'GET':
+                return client.get(path)
+            return client.generic(budget.method, path, json.dumps(data or {}), content_type='application/json')
+
+        request()
+        with record_queries() as recorder:
+            response = request()
+        results.append({
+            'label': f'{budget.method} {path}',
+            'status': response.status_code,
+            'queries': recorder.count,
+            'budget': budget.max_queries,
+            'report': budget_report(f'{budget.method} {path}', recorder, budget.max_queries),
+        })
+    return results
@@ -0,0 +1,156 @@
+"""
+Query Plan Regression Checks
+EXPLAIN the hot tenant-scoped queries and check each one uses the index it was built for
+"""
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from django.db import connections
+from django.db.models import Count
+
+from .models import (
+    Lead, Customer, Deal, TravelPackage, Booking, MetaAdsCampaign, WhatsAppConversation, Integration,
+    DailyLeadRollup, User,
+)
+
+
+class AutoIndex(NamedTuple):
+    """An index Django named itself (ForeignKey, db_index, unique_together); found by its columns"""
+    model: type
+    fields: Tuple[str, ...]
+
+
+class HotQuery(NamedTuple):
+    index: Union[str, AutoIndex]
+    # queryset factory taking a tenant id
+    query: Callable
+
+
+# label -> the index the query must use. Keep this in sync with the filters
+# used by the views and integration syncs.
+HOT_QUERIES: Dict[str, HotQuery] = {
+    'lead list page': HotQuery('lead_tenant_id_idx', lambda t: Lead.objects.filter(tenant_id=t).order_by('-id')[:51]),
+    'lead list next page': HotQuery('lead_tenant_id_idx',
+                                    lambda t: Lead.objects.filter(tenant_id=t, id__lt=10 ** 9).order_by('-id')[:51]),
+    'lead status filter': HotQuery('lead_tenant_status_idx',
+                                   lambda t: Lead.objects.filter(tenant_id=t, status__in=['new', 'contacted', 'qualified'])),
+    'lead by phone': HotQuery('lead_tenant_phone_norm_idx',
+                              lambda t: Lead.objects.filter(tenant_id=t, phone_normalized='+15555550100')),
+    'lead by raw phone': HotQuery('lead_tenant_phone_idx', lambda t: Lead.objects.filter(tenant_id=t, phone='555 0100')),
+    'lead by email': HotQuery('lead_tenant_email_idx', lambda t: Lead.objects.filter(tenant_id=t, email='lead@example.com')),
+    'dedup email block': HotQuery('lead_tenant_email_norm_idx',
+                                  lambda t: Lead.objects.filter(tenant_id=t, email_normalized__in=['a@example.com', 'b@example.com'])),
+    'dedup name block': HotQuery('lead_tenant_name_dest_idx',
+                                 lambda t: Lead.objects.filter(tenant_id=t, name_destination_key__in=['maria garcia|bali'])),
+    'customer list page': HotQuery('customer_tenant_id_idx',
+                                   lambda t: Customer.objects.filter(tenant_id=t).order_by('-id')[:51]),
+    'deal list page': HotQuery('deal_tenant_id_idx', lambda t: Deal.objects.filter(tenant_id=t).order_by('-id')[:51]),
+    'package list page': HotQuery('package_tenant_id_idx',
+                                  lambda t: TravelPackage.objects.filter(tenant_id=t).order_by('-id')[:51]),
+    'booking list page': HotQuery('booking_tenant_id_idx', lambda t: Booking.objects.filter(tenant_id=t).order_by('-id')[:51]),
+    'campaigns newest first': HotQuery('campaign_tenant_created_idx',
+                                       lambda t: MetaAdsCampaign.objects.filter(tenant_id=t).order_by('-created_at')),
+    'conversation by id': HotQuery('wa_conv_tenant_conv_idx',
+                                   lambda t: WhatsAppConversation.objects.filter(tenant_id=t, conversation_id='conv-1')),
+    'conversation by phone': HotQuery('wa_conv_tenant_phone_norm_idx',
+                                      lambda t: WhatsAppConversation.objects.filter(tenant_id=t, phone_normalized='+15555550100')),
+    'integrations for tenant': HotQuery(AutoIndex(Integration, ('tenant',)), lambda t: Integration.objects.filter(tenant_id=t)),
+    'integration by type': HotQuery(AutoIndex(Integration, ('tenant', 'integration_type')),
+                                    lambda t: Integration.objects.filter(tenant_id=t, integration_type='whatsapp')),
+    'deal pipeline': HotQuery(AutoIndex(Deal, ('tenant',)),
+                              lambda t: Deal.objects.filter(tenant_id=t).values('stage', 'assigned_to_id').annotate(n=Count('id'))),
+    'lead rollup range': HotQuery(AutoIndex(DailyLeadRollup, ('tenant', 'day', 'source', 'status')),
+                                  lambda t: DailyLeadRollup.objects.filter(tenant_id=t, day__gte='2024-01-01', day__lte='2024-01-31')),
+    'token revocation list': HotQuery(AutoIndex(User, ('tokens_valid_after',)),
+                                      lambda t: User.objects.filter(tokens_valid_after__gt='2024-01-01T00:00:00Z')
+                                      .values_list('id', 'tokens_valid_after')),
+}
+
+# SQLite: "SEARCH core_lead USING INDEX lead_tenant_id_idx (tenant_id=?)",
+# also "USING COVERING INDEX"
+_SQLITE_INDEX = re.compile(r'\bUSING (?:COVERING )?INDEX (\w+)')
+# PostgreSQL: "Index Scan using x on t", "Index Only Scan using x on t", "Bitmap Index Scan on x"
+_POSTGRES_INDEX = re.compile(r'\b(?:Index (?:Only )?Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)')
+
+
+def explain(queryset, using: str = 'default') -> str:
+    """Return the backend's EXPLAIN output for a queryset"""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # tables are tiny in CI; make the planner show which index it
+            # would pick instead of a sequential scan
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            return queryset.using(using).explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+    return queryset.using(using).explain()
+
+
+def indexes_used(plan: str, vendor: str) -> List[str]:
+    """Names of the indexes the plan reads"""
+    pattern = _POSTGRES_INDEX if vendor == 'postgresql' else _SQLITE_INDEX
+    return pattern.findall(plan)
+
+
+def table_indexes(model, using: str = 'default') -> Dict[str, List[str]]:
+    """Index name -> columns for the model's table, as the database has them"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return {
+        name: info['columns'] for name, info in constraints.items()
+        if (info['index'] or info['unique']) and not info['primary_key'] and info['columns']
+    }
+
+
+def _key(columns: List[str], model, vendor: str) -> Tuple[str, ...]:
+    # every SQLite index ends in the rowid (the integer primary key), so an
+    # index on (tenant_id) orders its entries exactly like one on (tenant_id, id)
+    pk = model._meta.pk.column
+    if vendor == 'sqlite' and pk not in columns:
+        columns = columns + [pk]
+    return tuple(columns)
+
+
+def resolve_index(expected: Union[str, AutoIndex], indexes: Dict[str, List[str]]) -> Optional[str]:
+    """Name of the expected index in this database, or None if it does not exist"""
+    if isinstance(expected, str):
+        return expected if expected in indexes else None
+    columns = [expected.model._meta.get_field(name).column for name in expected.fields]
+    return next((name for name, cols in indexes.items() if cols == columns), None)
+
+
+def check_query_plans(tenant_id: int = 1, using: str = 'default') -> List[Dict[str, object]]:
+    """
+    EXPLAIN every hot query and check it reads its expected index.
+    Returns one result per query with its plan, the indexes it uses and
+    `problem` (None when the expected index exists and the plan uses it).
+    """
+    vendor = connections[using].vendor
+    results = []
+    for label, hot in HOT_QUERIES.items():
+        queryset = hot.query(tenant_id)
+        model = queryset.model
+        indexes = table_indexes(model, using)
+        expected = resolve_index(hot.index, indexes)
+        plan = explain(queryset, using)
+        used = indexes_used(plan, vendor)
+        problem = None
+        if expected is None:
+            name = hot.index if isinstance(hot.index, str) else f"{model.__name__}({', '.join(hot.index.fields)})"
+            problem = f'index {name} does not exist'
+        elif expected not in used:
+            wanted = _key(indexes[expected], model, vendor)
+            if not any(name in indexes and _key(indexes[name], model, vendor) == wanted for name in used):
+                problem = f"does not use {expected} (uses {', '.join(used) or 'no index'})"
+        results.append({
+            'label': label,
+            'index': expected or hot.index,
+            'plan': plan,
+            'indexes': used,
+            'problem': problem,
+        })
+    return results
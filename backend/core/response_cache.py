@@ -0,0 +1,142 @@
+"""
+Versioned Response Cache
+Per-tenant GET response cache keyed on the models' change versions
+"""
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .versions import version_token
+
+logger = logging.getLogger(__name__)
+
+
+def request_tenant_id(request) -> Optional[int]:
+    tenant = getattr(request, 'tenant', None)
+    if tenant is not None:
+        return tenant.id
+    return getattr(request.user, 'tenant_id', None)
+
+
+def normalized_params(request) -> str:
+    """Query string with keys and repeated values sorted, so ?a=1&b=2 == ?b=2&a=1"""
+    params = request.query_params
+    return '&'.join(f'{key}={value}' for key in sorted(params) for value in sorted(params.getlist(key)))
+
+
+class ResponseCache:
+    """
+    Cache of GET response data keyed by (tenant, endpoint, query params, versions).
+
+    The key embeds the tenant's current version of every model the endpoint
+    reads (core.versions), and model signals move those versions on each
+    write, so invalidation is a key change rather than a delete: stale entries
+    are never read again and age out through the timeout. Because versions
+    live in the database this stays correct with a per-process local memory
+    cache; point RESPONSE_CACHE_ALIAS at a shared cache (Redis) so several
+    app servers also share their hits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+    def key(self, tenant_id: int, endpoint: str, request, models: Iterable, extra: str = '') -> str:
+        params = f'{normalized_params(request)}|{request.accepted_renderer.format}|{extra}'
+        digest = hashlib.sha1(params.encode()).hexdigest()
+        return f'resp:{tenant_id}:{endpoint}:{digest}:{version_token(models, tenant_id)}'
+
+    def fetch(self, request, endpoint: str, models: Iterable, compute: Callable, extra: str = ''):
+        """Return the cached response for this request, or compute and store it"""
+        tenant_id = request_tenant_id(request)
+        if not getattr(settings, 'RESPONSE_CACHE_ENABLED', True) or tenant_id is None:
+            return compute()
+
+        key = self.key(tenant_id, endpoint, request, models, extra)
+        try:
+            data = self.cache.get(key)
+        except Exception as e:
+            # an unreachable shared cache must not fail the request
+            logger.warning(f"Response cache read failed for {endpoint}: {e}")
+            data = None
+        if data is not None:
+            self._record(endpoint, hit=True)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        self._record(endpoint, hit=False)
+        response = compute()
+        if response.status_code == 200:
+            try:
+                self.cache.set(key, response.data, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+            except Exception as e:
+                logger.warning(f"Response cache write failed for {endpoint}: {e}")
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _record(self, endpoint: str, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits[endpoint] += 1
+            else:
+                self._misses[endpoint] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process, overall and per endpoint"""
+        with self._lock:
+            endpoints = {}
+            for endpoint in sorted(set(self._hits) | set(self._misses)):
+                hits, misses = self._hits[endpoint], self._misses[endpoint]
+                endpoints[endpoint] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+            hits, misses = sum(self._hits.values()), sum(self._misses.values())
+        return {
+            'backend': type(self.cache).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'endpoints': endpoints,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cache_response(*models, endpoint: Optional[str] = None):
+    """
+    Cache a viewset method's GET response per tenant until any of `models`
+    changes for that tenant. URL kwargs (e.g. pk) are part of the key.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapped(self, request, *args, **kwargs):
+            name = endpoint or f'{type(self).__name__}.{view_method.__name__}'
+            extra = '&'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))
+            return response_cache.fetch(
+                request, name, models,
+                lambda: view_method(self, request, *args, **kwargs),
+                extra=extra,
+            )
+        return wrapped
+    return decorator
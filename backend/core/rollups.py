@@ -0,0 +1,243 @@
+"""
+Daily Rollups
+Per-tenant, per-day summary tables behind the dashboard endpoints
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .aggregates import EXCLUDED_STATUSES
+from .models import (
+    Lead, Booking, Deal, MetaAdsCampaign,
+    DailyLeadRollup, DailyBookingRollup, DailyDealRollup, DailyCampaignRollup,
+)
+
+
+class Rollup:
+    """
+    How one rollup table is derived from its source model: rows are bucketed
+    by (tenant, local day of `date_field`, *dimensions) and `measures` are
+    aggregated per bucket.
+    """
+
+    def __init__(self, source, target, date_field: str, dimensions: Dict[str, str],
+                 measures: Dict[str, object], exclude: Optional[Dict] = None):
+        self.source = source
+        self.target = target
+        self.date_field = date_field
+        self.dimensions = dimensions  # target field -> source field
+        self.measures = measures      # target field -> aggregate
+        self.exclude = exclude or {}
+        # what one source row adds to each measure: 1 for Count, the field for Sum
+        self.row_measures = {
+            name: None if isinstance(aggregate, Count) else aggregate.source_expressions[0].name
+            for name, aggregate in measures.items()
+        }
+        self.count_field = next(name for name, field in self.row_measures.items() if field is None)
+        self.state_fields = list(dict.fromkeys([
+            'tenant_id', date_field, *dimensions.values(),
+            *(field for field in self.row_measures.values() if field),
+            *(lookup.split('__')[0] for lookup in self.exclude),
+        ]))
+
+    def source_rows(self, tenant_ids: Optional[Iterable[int]], start: datetime, end: datetime):
+        qs = self.source.objects.filter(**{
+            f'{self.date_field}__gte': start,
+            f'{self.date_field}__lt': end,
+        })
+        if tenant_ids is not None:
+            qs = qs.filter(tenant_id__in=list(tenant_ids))
+        if self.exclude:
+            qs = qs.exclude(**self.exclude)
+        group = ['tenant_id', 'day', *self.dimensions.values()]
+        return (qs.annotate(day=TruncDate(self.date_field, tzinfo=timezone.get_default_timezone()))
+                .values(*group).annotate(**self.measures).order_by())
+
+    def rebuild(self, tenant_ids: Optional[Iterable[int]], first_day: date, last_day: date) -> int:
+        """
+        Replace the rollup rows of [first_day, last_day] with fresh aggregates.
+        For backfills and repairs; live writes go through apply_changes.
+        """
+        start, end = day_bounds(first_day)[0], day_bounds(last_day)[1]
+        if tenant_ids is not None:
+            tenant_ids = list(tenant_ids)
+        rows = []
+        for row in self.source_rows(tenant_ids, start, end):
+            values = {target: row[source] or '' for target, source in self.dimensions.items()}
+            values.update({name: row[name] or 0 for name in self.measures})
+            rows.append(self.target(tenant_id=row['tenant_id'], day=row['day'], **values))
+
+        with transaction.atomic():
+            stale = self.target.objects.filter(day__gte=first_day, day__lte=last_day)
+            if tenant_ids is not None:
+                stale = stale.filter(tenant_id__in=tenant_ids)
+            stale.delete()
+            self.target.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    # --- incremental upkeep ----------------------------------------------------
+
+    def state(self, instance) -> Dict[str, object]:
+        """The source fields of an instance that decide its bucket and measures"""
+        return {field: getattr(instance, field) for field in self.state_fields}
+
+    def _excluded(self, values: Dict[str, object]) -> bool:
+        for lookup, excluded in self.exclude.items():
+            field, _, op = lookup.partition('__')
+            if (values[field] in excluded) if op == 'in' else values[field] == excluded:
+                return True
+        return False
+
+    def contribution(self, values: Optional[Dict[str, object]]):
+        """(bucket key, measures) a source row with these values adds, or None"""
+        if values is None or values['tenant_id'] is None or values[self.date_field] is None or self._excluded(values):
+            return None
+        key = (values['tenant_id'], local_day(values[self.date_field]),
+               *(values[field] or '' for field in self.dimensions.values()))
+        measures = {name: 1 if field is None else (values[field] or 0) for name, field in self.row_measures.items()}
+        return key, measures
+
+    def apply_changes(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]):
+        """
+        Move the rollup rows by the difference between the old and new state
+        of each changed source row (None for a created or deleted row).
+        """
+        net = defaultdict(lambda: defaultdict(int))
+        for old, new in changes:
+            for values, sign in ((old, -1), (new, 1)):
+                found = self.contribution(values)
+                if found:
+                    key, measures = found
+                    for name, value in measures.items():
+                        net[key][name] += sign * value
+        # a fixed order keeps two transactions touching the same buckets from deadlocking
+        for key in sorted(net):
+            deltas = {name: value for name, value in net[key].items() if value}
+            if deltas:
+                self._apply(key, deltas)
+
+    def _apply(self, key: tuple, deltas: Dict[str, object]):
+        """One UPDATE moving a bucket by `deltas`; the first write of a bucket inserts it"""
+        tenant_id, day, *dimensions = key
+        dimensions = dict(zip(self.dimensions, dimensions))
+        bucket = self.target.objects.filter(tenant_id=tenant_id, day=day, **dimensions)
+        updates = {name: F(name) + value for name, value in deltas.items()}
+        if not bucket.update(**updates):
+            try:
+                with transaction.atomic():
+                    self.target.objects.create(tenant_id=tenant_id, day=day, **dimensions, **deltas)
+            except IntegrityError:
+                # a concurrent write created the bucket first; the unique
+                # (tenant, day, ...) index made this insert wait for it
+                bucket.update(**updates)
+        if deltas.get(self.count_field, 0) < 0:
+            bucket.filter(**{self.count_field: 0}).delete()
+
+
+ROLLUPS = {
+    Lead: Rollup(
+        Lead, DailyLeadRollup, 'created_at',
+        dimensions={'source': 'source', 'status': 'status'},
+        measures={'leads': Count('id')},
+    ),
+    Booking: Rollup(
+        Booking, DailyBookingRollup, 'created_at',
+        dimensions={},
+        measures={'bookings': Count('id'), 'pax': Sum('pax_count'), 'revenue': Sum('total_amount')},
+        exclude={'status__in': EXCLUDED_STATUSES},
+    ),
+    Deal: Rollup(
+        Deal, DailyDealRollup, 'created_at',
+        dimensions={'stage': 'stage'},
+        measures={'deals': Count('id'), 'value': Sum('value')},
+    ),
+    MetaAdsCampaign: Rollup(
+        MetaAdsCampaign, DailyCampaignRollup, 'start_date',
+        dimensions={},
+        measures={
+            'campaigns': Count('id'), 'spend': Sum('spend'), 'impressions': Sum('impressions'),
+            'clicks': Sum('clicks'), 'conversions': Sum('conversions'), 'revenue': Sum('revenue'),
+        },
+    ),
+}
+
+
+def local_day(value: datetime) -> date:
+    return timezone.localtime(value, timezone.get_default_timezone()).date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a local day as aware datetimes, so filters stay index range scans"""
+    tz = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+
+
+# --- signals -------------------------------------------------------------------
+# Every write moves the buckets of the row's old and new state by the
+# difference, with F() updates in the write's own transaction, so upkeep costs
+# a few single-row UPDATEs however large the day is. Bulk writes that send no
+# signals call Rollup.apply_changes themselves (see core.lead_import).
+
+
+def _locked_state(rollup: Rollup, instance, using: Optional[str]) -> Optional[Dict[str, object]]:
+    """
+    The instance's row as it is now, read under a row lock in the write's
+    transaction, so concurrent writes to one row move its buckets one after
+    the other. None when the row does not exist (any more).
+    """
+    return (rollup.source._base_manager.db_manager(using).select_for_update()
+            .filter(pk=instance.pk).values(*rollup.state_fields).first())
+
+
+def rollup_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    if raw or instance.pk is None:
+        instance._rollup_old = None
+    else:
+        instance._rollup_old = _locked_state(ROLLUPS[sender], instance, using)
+
+
+def rollup_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollup = ROLLUPS[sender]
+    rollup.apply_changes([(getattr(instance, '_rollup_old', None), rollup.state(instance))])
+
+
+def rollup_pre_delete(sender, instance, using=None, **kwargs):
+    # a concurrent delete that got there first leaves nothing to subtract
+    instance._rollup_old = _locked_state(ROLLUPS[sender], instance, using)
+
+
+def rollup_deleted(sender, instance, **kwargs):
+    ROLLUPS[sender].apply_changes([(getattr(instance, '_rollup_old', None), None)])
+
+
+def backfill(model, tenant_ids: Optional[List[int]] = None, first_day: Optional[date] = None,
+             last_day: Optional[date] = None, chunk_days: int = 31, progress=None) -> int:
+    """Rebuild a rollup over a date range, `chunk_days` at a time (oldest source row to today by default)"""
+    rollup = ROLLUPS[model]
+    if first_day is None:
+        qs = model.objects.all()
+        if tenant_ids:
+            qs = qs.filter(tenant_id__in=tenant_ids)
+        oldest = qs.order_by(rollup.date_field).values_list(rollup.date_field, flat=True).first()
+        if oldest is None:
+            return 0
+        first_day = local_day(oldest)
+    last_day = last_day or local_day(timezone.now())
+
+    written = 0
+    day = first_day
+    while day <= last_day:
+        chunk_end = min(day + timedelta(days=chunk_days - 1), last_day)
+        written += rollup.rebuild(tenant_ids, day, chunk_end)
+        if progress:
+            progress(model, day, chunk_end, written)
+        day = chunk_end + timedelta(days=1)
+    return written
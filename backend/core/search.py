@@ -0,0 +1,134 @@
+"""
+Lead / Customer Full-Text Search
+SQLite FTS5 in development, a Postgres tsvector + GIN index in production
+"""
+import re
+from typing import List
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Lead
+
+# Columns indexed for search (see migration 0004)
+SEARCH_COLUMNS = ['first_name', 'last_name', 'email', 'phone', 'destination', 'notes']
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+# Postgres' parser keeps emails/hosts as single lexemes, so keep those intact
+_PG_WORD = re.compile(r'[\w@.+-]+', re.UNICODE)
+
+# The index itself is created by migration 0004_lead_search_index:
+# - SQLite: a contentless FTS5 table (core_lead_fts) kept in sync by
+#   triggers, so bulk_create/update() are covered as well as save(). Each
+#   row carries its tenant as a "t<id>" token, which lets MATCH intersect on
+#   the tenant inside the index instead of post-filtering every tenant's hits.
+#   Migrations that rebuild core_lead on SQLite drop those triggers and must
+#   recreate them.
+# - PostgreSQL: a stored generated tsvector column (search_vector) with a
+#   GIN index, maintained by Postgres on every write.
+
+
+def search_tokens(query: str) -> List[str]:
+    return _TOKEN.findall(query.lower())[:10]
+
+
+def _sqlite_match(tenant_id: int, tokens: List[str]) -> str:
+    terms = ' AND '.join(f'"{t}"*' for t in tokens)
+    return f'tenant : t{int(tenant_id)} AND {{{" ".join(SEARCH_COLUMNS)}}} : ({terms})'
+
+
+def _postgres_tsquery(query: str) -> str:
+    words = [w.strip('.-') for w in _PG_WORD.findall(query.lower())][:10]
+    return ' & '.join("'{}':*".format(w.replace("'", "''")) for w in words if w)
+
+
+def _candidate_limit() -> int:
+    """
+    Matches considered for ranking, newest first (leads for lead search,
+    customers for customer search). Ranking every hit of a very common word
+    would grow with the tenant; capping candidates keeps queries flat, and
+    results are exact whenever there are fewer hits than this.
+    """
+    return getattr(settings, 'SEARCH_CANDIDATE_LIMIT', 2000)
+
+
+def search_lead_ids(tenant_id: int, query: str, limit: int = 20) -> List[int]:
+    """Ids of the tenant's best matching leads, best first (prefix match on every word)"""
+    tokens = search_tokens(query)
+    if not tokens:
+        return []
+
+    candidates = _candidate_limit()
+    if connection.vendor == 'sqlite':
+        sql = """SELECT rowid FROM (
+                     SELECT rowid, rank FROM core_lead_fts WHERE core_lead_fts MATCH %s
+                     ORDER BY rowid DESC LIMIT %s
+                 ) ORDER BY rank LIMIT %s"""
+        params = [_sqlite_match(tenant_id, tokens), candidates, limit]
+    elif connection.vendor == 'postgresql':
+        sql = """SELECT id FROM (
+                     SELECT id, search_vector FROM core_lead, to_tsquery('simple', %s) query
+                     WHERE tenant_id = %s AND search_vector @@ query
+                     ORDER BY id DESC LIMIT %s
+                 ) hits, to_tsquery('simple', %s) query
+                 ORDER BY ts_rank(search_vector, query) DESC, id DESC LIMIT %s"""
+        tsquery = _postgres_tsquery(query)
+        params = [tsquery, tenant_id, candidates, tsquery, limit]
+    else:
+        return _fallback_lead_ids(tenant_id, tokens, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_customer_ids(tenant_id: int, query: str, limit: int = 20) -> List[int]:
+    """Ids of the tenant's customers whose lead matches, best first"""
+    tokens = search_tokens(query)
+    if not tokens:
+        return []
+
+    # the candidate cap applies to customers, not to lead hits: capping the
+    # newest leads first would drop older leads that did become customers
+    candidates = _candidate_limit()
+    if connection.vendor == 'sqlite':
+        sql = """SELECT id FROM (
+                     SELECT c.id, core_lead_fts.rank AS rank
+                     FROM core_lead_fts JOIN core_customer c ON c.lead_id = core_lead_fts.rowid
+                     WHERE core_lead_fts MATCH %s AND c.tenant_id = %s
+                     ORDER BY c.id DESC LIMIT %s
+                 ) ORDER BY rank, id DESC LIMIT %s"""
+        params = [_sqlite_match(tenant_id, tokens), tenant_id, candidates, limit]
+    elif connection.vendor == 'postgresql':
+        sql = """SELECT id FROM (
+                     SELECT c.id, l.search_vector FROM core_lead l JOIN core_customer c ON c.lead_id = l.id,
+                          to_tsquery('simple', %s) query
+                     WHERE l.tenant_id = %s AND c.tenant_id = l.tenant_id AND l.search_vector @@ query
+                     ORDER BY c.id DESC LIMIT %s
+                 ) hits, to_tsquery('simple', %s) query
+                 ORDER BY ts_rank(search_vector, query) DESC, id DESC LIMIT %s"""
+        tsquery = _postgres_tsquery(query)
+        params = [tsquery, tenant_id, candidates, tsquery, limit]
+    else:
+        from .models import Customer
+        lead_ids = _fallback_lead_ids(tenant_id, tokens, None)
+        return list(Customer.objects.filter(tenant_id=tenant_id, lead_id__in=lead_ids)
+                    .order_by('-id').values_list('id', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_lead_ids(tenant_id: int, tokens: List[str], limit):
+    """Unindexed icontains search for backends without a full-text index"""
+    from django.db.models import Q
+
+    qs = Lead.objects.filter(tenant_id=tenant_id)
+    for token in tokens:
+        match = Q()
+        for column in SEARCH_COLUMNS:
+            match |= Q(**{f'{column}__icontains': token})
+        qs = qs.filter(match)
+    qs = qs.order_by('-id').values_list('id', flat=True)
+    return list(qs[:limit] if limit else qs)
@@ -1,5 +1,30 @@
 from rest_framework import serializers
-from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking
+from rest_framework.permissions import SAFE_METHODS
+from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking, RequestProfile
+
+
+def _param_list(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    return {f.strip() for f in value.split(',') if f.strip()}
+
+
+class SparseFieldsMixin:
+    """Trim read output to ?fields=a,b and/or drop ?exclude=c,d.
+
+    Unknown names are ignored. Writes always use the full field set.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        only = _param_list(request, 'fields')
+        exclude = _param_list(request, 'exclude')
+        for name in list(self.fields):
+            if (only is not None and name not in only) or (exclude and name in exclude):
+                self.fields.pop(name)
 
 class TenantSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,32 +36,45 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id','email','first_name','last_name','role','tenant','is_active','last_login']
 
-class LeadSerializer(serializers.ModelSerializer):
+class LeadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Lead
-        fields = '__all__'
+        # internal dedup blocking keys
+        exclude = ['email_normalized', 'name_destination_key']
 
-class CustomerSerializer(serializers.ModelSerializer):
+class LeadImportSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk lead import; tenant comes from the request"""
+    class Meta:
+        model = Lead
+        fields = ['email', 'phone', 'first_name', 'last_name', 'source', 'status', 'score',
+                  'travel_dates', 'destination', 'budget', 'adults', 'children', 'notes']
+
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
 
-class DealSerializer(serializers.ModelSerializer):
+class DealSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Deal
         fields = '__all__'
 
-class CommunicationSerializer(serializers.ModelSerializer):
+class CommunicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Communication
         fields = '__all__'
 
-class TravelPackageSerializer(serializers.ModelSerializer):
+class TravelPackageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TravelPackage
         fields = '__all__'
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = '__all__'
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RequestProfile
+        exclude = ['collapsed']
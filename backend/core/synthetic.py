@@ -0,0 +1,465 @@
+"""
+Synthetic Data
+Deterministic multi-tenant data with skewed distributions, at scale (seed_demo --scale)
+"""
+import multiprocessing
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from math import log
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import connections, models
+from django.utils import timezone
+
+from .models import (
+    Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking, MetaAdsCampaign,
+    WhatsAppConversation,
+)
+from .rollups import ROLLUPS, backfill, local_day
+
+SOURCES = {'website': 34, 'meta_ads': 24, 'whatsapp': 18, 'referral': 9, 'organic': 15}
+LEAD_STATUSES = {'new': 38, 'contacted': 30, 'qualified': 20, 'lost': 12}
+BOOKING_STATUSES = {'confirmed': 58, 'pending': 18, 'completed': 16, 'cancelled': 8}
+# stage -> (weight, win probability)
+DEAL_STAGES = {'prospecting': (30, 10), 'proposal': (28, 35), 'negotiation': (17, 60), 'won': (15, 100), 'lost': (10, 0)}
+COMMUNICATION_TYPES = {'email': 50, 'whatsapp': 30, 'sms': 12, 'call': 8}
+COMMUNICATION_STATUSES = {'delivered': 62, 'opened': 25, 'sent': 9, 'failed': 4}
+CAMPAIGN_STATUSES = {'completed': 45, 'active': 30, 'paused': 15, 'draft': 10}
+INTENTS = {'inquiry': 45, 'booking': 30, 'pricing': 15, 'complaint': 6, 'cancellation': 4}
+CUSTOMER_TYPES = {'individual': 70, 'family': 22, 'corporate': 8}
+# ordered by popularity; picked with a Zipf-like skew
+DESTINATIONS = [
+    'Bali', 'Paris', 'Cancun', 'Hawaii', 'Rome', 'Tokyo', 'Dubai', 'Maldives', 'Barcelona', 'London',
+    'Santorini', 'Phuket', 'New York', 'Lisbon', 'Cape Town', 'Reykjavik', 'Marrakech', 'Sydney',
+    'Queenstown', 'Prague', 'Cusco', 'Havana', 'Zanzibar', 'Kyoto', 'Vienna', 'Amalfi', 'Banff',
+    'Seychelles', 'Petra', 'Patagonia',
+]
+FIRST_NAMES = [
+    'Maria', 'James', 'Sofia', 'Liam', 'Olivia', 'Noah', 'Emma', 'Lucas', 'Ava', 'Mateo', 'Mia', 'Ethan',
+    'Isabella', 'Arjun', 'Chloe', 'Yuki', 'Amara', 'Leon', 'Fatima', 'Diego', 'Hannah', 'Omar', 'Priya', 'Jonas',
+]
+LAST_NAMES = [
+    'Garcia', 'Smith', 'Johnson', 'Rossi', 'Muller', 'Silva', 'Nguyen', 'Kim', 'Patel', 'Brown', 'Lopez',
+    'Martin', 'Kowalski', 'Tanaka', 'Okafor', 'Dubois', 'Jensen', 'Costa', 'Cohen', 'Ivanova',
+]
+EMAIL_DOMAINS = {'gmail.com': 45, 'outlook.com': 20, 'yahoo.com': 15, 'icloud.com': 12, 'proton.me': 8}
+
+
+class ScalePlan(NamedTuple):
+    """Rows per tenant are averages; tenant i gets a share proportional to 1 / (i + 1) ** skew"""
+    tenants: int = 10
+    leads: int = 10000
+    customer_rate: float = 0.3
+    bookings: int = 4000
+    deals: int = 2000
+    communications: int = 10000
+    campaigns: int = 50
+    conversations: int = 3000
+    packages: int = 40
+    agents: int = 10
+    days: int = 730
+    skew: float = 1.0
+    seed: int = 42
+    # data ends on this date, so the same seed gives the same rows on another day
+    until: Optional[datetime] = None
+    chunk_size: int = 5000
+    password: str = 'password123'
+
+    def size_factors(self) -> List[float]:
+        weights = [(i + 1) ** -self.skew for i in range(self.tenants)]
+        total = sum(weights)
+        return [w * self.tenants / total for w in weights]
+
+    def domain(self, index: int) -> str:
+        return f'synthetic-{self.seed}-{index}.travelcrm.io'
+
+
+def _weighted(rng: random.Random, table: Dict) -> Callable[[], str]:
+    keys = list(table)
+    weights = [w[0] if isinstance(w, tuple) else w for w in table.values()]
+    cum = []
+    total = 0
+    for w in weights:
+        total += w
+        cum.append(total)
+
+    def pick() -> str:
+        x = rng.random() * total
+        for key, bound in zip(keys, cum):
+            if x < bound:
+                return key
+        return keys[-1]
+    return pick
+
+
+def _skewed_index(rng: random.Random, n: int, power: float) -> int:
+    """Index in [0, n) favouring low indexes; power 1 is uniform"""
+    return min(int(n * rng.random() ** power), n - 1)
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(f'{value:.2f}')
+
+
+@contextmanager
+def explicit_timestamps(model_classes: Iterable):
+    """Let bulk_create keep the created_at/updated_at values we set instead of now()"""
+    fields = [f for model in model_classes for f in model._meta.concrete_fields
+              if isinstance(f, models.DateField) and (f.auto_now or f.auto_now_add)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TenantGenerator:
+    """
+    Creates one tenant and all of its rows.
+
+    Every table draws from its own Random seeded with (seed, tenant index,
+    table), so a tenant's rows do not depend on the other tenants, the
+    worker that generated it or the order tenants were generated in. Rows
+    are written with bulk_create in chunks; derived data that bulk_create
+    skips (Lead match keys, conversation phone_normalized, customer
+    booking aggregates, daily rollups) is filled in here.
+    """
+
+    def __init__(self, plan: ScalePlan, index: int, factor: float):
+        self.plan = plan
+        self.index = index
+        self.factor = factor
+        self.end = plan.until or timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.span = plan.days * 86400
+        self.counts: Dict[str, int] = {}
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f'{self.plan.seed}:{self.index}:{table}')
+
+    def count(self, mean: float) -> int:
+        return max(1, round(mean * self.factor)) if mean else 0
+
+    def moment(self, rng: random.Random, after: Optional[float] = None) -> float:
+        """Seconds before `end`; recent times are likelier (the business grows)"""
+        if after is None:
+            return self.span * rng.random() ** 1.6
+        return after * rng.random()
+
+    def at(self, seconds_ago: float) -> datetime:
+        return self.end - timedelta(seconds=seconds_ago)
+
+    def insert(self, model, rows: Iterable) -> array:
+        ids = array('q')
+        written = 0
+        for chunk in _chunks(rows, self.plan.chunk_size):
+            model.objects.bulk_create(chunk, batch_size=self.plan.chunk_size)
+            ids.extend(obj.pk for obj in chunk)
+            written += len(chunk)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + written
+        return ids
+
+    def run(self) -> Dict[str, int]:
+        with explicit_timestamps([Lead, Deal, Communication, Booking, MetaAdsCampaign, WhatsAppConversation]):
+            self.tenant = self.create_tenant()
+            self.create_users()
+            self.create_packages()
+            self.create_leads()
+            self.create_customers()
+            self.create_bookings()
+            self.create_deals()
+            self.create_communications()
+            self.create_campaigns()
+            self.create_conversations()
+        first_day = local_day(self.at(self.span))
+        last_day = max(local_day(self.end), local_day(timezone.now()))
+        for model in ROLLUPS:
+            backfill(model, tenant_ids=[self.tenant.id], first_day=first_day, last_day=last_day, chunk_days=366)
+        return {'tenant': self.tenant.id, **self.counts}
+
+    def create_tenant(self) -> Tenant:
+        tier = 'enterprise' if self.factor >= 3 else 'pro' if self.factor >= 0.8 else 'starter'
+        rng = self.rng('tenant')
+        name = f'{rng.choice(LAST_NAMES)} {rng.choice(["Travel", "Journeys", "Getaways", "Voyages", "Holidays"])}'
+        return Tenant.objects.create(
+            name=f'{name} #{self.index}', domain=self.plan.domain(self.index), subscription_tier=tier,
+            settings={'currency': 'USD', 'synthetic_seed': self.plan.seed},
+        )
+
+    def create_users(self):
+        password = _password_hash(self.plan.password)
+        domain = self.tenant.domain
+        users = [User(email=f'admin@{domain}', role='ADMIN', tenant=self.tenant, password=password)]
+        agents = max(1, self.count(self.plan.agents))
+        for j in range(agents):
+            role = 'MANAGER' if j % 8 == 0 else 'AGENT'
+            users.append(User(email=f'agent{j}@{domain}', role=role, tenant=self.tenant, password=password,
+                              first_name=FIRST_NAMES[j % len(FIRST_NAMES)], last_name=LAST_NAMES[j % len(LAST_NAMES)]))
+        self.agent_ids = self.insert(User, users)[1:]
+
+    def create_packages(self):
+        rng = self.rng('packages')
+        n = self.count(self.plan.packages)
+        self.package_prices = []
+        packages = []
+        for j in range(n):
+            destination = DESTINATIONS[_skewed_index(rng, len(DESTINATIONS), 2)]
+            duration = rng.choice([3, 4, 5, 7, 7, 7, 10, 14])
+            price = round(rng.lognormvariate(log(250 * duration), 0.45), -1)
+            self.package_prices.append(price)
+            packages.append(TravelPackage(
+                tenant=self.tenant, name=f'{duration}-Day {destination} #{j}', destination=destination,
+                duration=duration, base_price=_money(price), description=f'{duration} days in {destination}',
+            ))
+        self.package_ids = self.insert(TravelPackage, packages)
+
+    def lead_phone(self, j: int) -> str:
+        # unique per (tenant, lead); 14 digits fit E.164
+        return f'+1555{self.index % 1000:03d}{j:07d}'
+
+    def create_leads(self):
+        n = self.count(self.plan.leads)
+        self.lead_created = array('d')
+        self.lead_has_phone = bytearray(n)
+
+        def rows():
+            rng = self.rng('leads')
+            source, status = _weighted(rng, SOURCES), _weighted(rng, LEAD_STATUSES)
+            email_domain = _weighted(rng, EMAIL_DOMAINS)
+            agents = len(self.agent_ids)
+            for j in range(n):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                ago = self.moment(rng)
+                self.lead_created.append(ago)
+                has_phone = rng.random() < 0.85
+                self.lead_has_phone[j] = has_phone
+                phone = self.lead_phone(j) if has_phone else None
+                created = self.at(ago)
+                lead = Lead(
+                    tenant_id=self.tenant.id, first_name=first, last_name=last,
+                    email=f'{first}.{last}{j}@{email_domain()}'.lower() if rng.random() < 0.9 else None,
+                    phone=phone, source=source(), status=status(),
+                    score=min(100, int(rng.betavariate(2, 3) * 100)),
+                    assigned_to_id=self.agent_ids[_skewed_index(rng, agents, 1.5)] if rng.random() < 0.9 else None,
+                    destination=DESTINATIONS[_skewed_index(rng, len(DESTINATIONS), 2)],
+                    budget=_money(round(rng.lognormvariate(log(3000), 0.6), -1)),
+                    adults=rng.choice([1, 2, 2, 2, 2, 3, 4]), children=rng.choice([0, 0, 0, 1, 2, 3]),
+                    created_at=created, updated_at=self.at(ago * rng.random()),
+                )
+                lead.set_match_keys()
+                yield lead
+        self.lead_ids = self.insert(Lead, rows())
+
+    def create_customers(self):
+        rng = self.rng('customers')
+        converted = [j for j in range(len(self.lead_ids)) if rng.random() < self.plan.customer_rate]
+        # customers are listed by conversion order; earlier ones book more (see _booking_plan)
+        rng.shuffle(converted)
+        self.customer_leads = array('q', converted)
+        totals = self._booking_totals()
+        customer_type = _weighted(rng, CUSTOMER_TYPES)
+
+        def rows():
+            for c, lead in enumerate(self.customer_leads):
+                count, total, last = totals.get(c, (0, Decimal('0.00'), None))
+                yield Customer(
+                    tenant_id=self.tenant.id, lead_id=self.lead_ids[lead], customer_type=customer_type(),
+                    loyalty_level=('platinum' if count >= 7 else 'gold' if count >= 4
+                                   else 'silver' if count >= 2 else 'bronze'),
+                    booking_count=count, total_spent=total,
+                    avg_booking_value=(total / count).quantize(Decimal('0.01')) if count else Decimal('0.00'),
+                    last_booking_date=last,
+                )
+        self.customer_ids = self.insert(Customer, rows())
+
+    def _booking_plan(self) -> Iterator[tuple]:
+        """(customer, package, status, amount, pax, created_at, travel_date); replayed identically on each call"""
+        customers = len(self.customer_leads)
+        if not customers or not self.package_ids:
+            return
+        rng = self.rng('bookings')
+        status = _weighted(rng, BOOKING_STATUSES)
+        for _ in range(self.count(self.plan.bookings)):
+            c = _skewed_index(rng, customers, 2.5)
+            p = _skewed_index(rng, len(self.package_ids), 2)
+            pax = rng.choice([1, 2, 2, 2, 3, 4, 4, 5, 6])
+            amount = _money(self.package_prices[p] * pax * rng.uniform(0.85, 1.15))
+            created = self.at(self.moment(rng, after=self.lead_created[self.customer_leads[c]]))
+            yield c, p, status(), amount, pax, created, created + timedelta(days=rng.randint(7, 180))
+
+    def _booking_totals(self) -> Dict[int, tuple]:
+        """Customer aggregates as reconcile_customers would compute them"""
+        totals: Dict[int, list] = {}
+        for c, _, status, amount, _, created, _ in self._booking_plan():
+            if status == 'cancelled':
+                continue
+            entry = totals.setdefault(c, [0, Decimal('0'), created])
+            entry[0] += 1
+            entry[1] += amount
+            entry[2] = max(entry[2], created)
+        return {c: (count, total.quantize(Decimal('0.01')), last) for c, (count, total, last) in totals.items()}
+
+    def create_bookings(self):
+        self.insert(Booking, (
+            Booking(tenant_id=self.tenant.id, customer_id=self.customer_ids[c], package_id=self.package_ids[p],
+                    status=status, total_amount=amount, pax_count=pax, created_at=created, travel_date=travel)
+            for c, p, status, amount, pax, created, travel in self._booking_plan()
+        ))
+
+    def create_deals(self):
+        customers = len(self.customer_ids)
+        if not customers:
+            return
+
+        def rows():
+            rng = self.rng('deals')
+            stage = _weighted(rng, DEAL_STAGES)
+            for j in range(self.count(self.plan.deals)):
+                c = _skewed_index(rng, customers, 2)
+                created = self.at(self.moment(rng, after=self.lead_created[self.customer_leads[c]]))
+                name = stage()
+                yield Deal(
+                    tenant_id=self.tenant.id, customer_id=self.customer_ids[c], title=f'Deal {j}', stage=name,
+                    value=_money(round(rng.lognormvariate(log(4000), 0.7), -1)),
+                    probability=DEAL_STAGES[name][1], created_at=created,
+                    expected_close_date=created + timedelta(days=rng.randint(7, 90)),
+                    assigned_to_id=self.agent_ids[_skewed_index(rng, len(self.agent_ids), 1.5)],
+                )
+        self.insert(Deal, rows())
+
+    def create_communications(self):
+        customers = len(self.customer_ids)
+        if not customers:
+            return
+
+        def rows():
+            rng = self.rng('communications')
+            kind, status = _weighted(rng, COMMUNICATION_TYPES), _weighted(rng, COMMUNICATION_STATUSES)
+            for j in range(self.count(self.plan.communications)):
+                c = _skewed_index(rng, customers, 2)
+                yield Communication(
+                    tenant_id=self.tenant.id, customer_id=self.customer_ids[c], type=kind(), status=status(),
+                    subject=f'Your trip to {DESTINATIONS[_skewed_index(rng, len(DESTINATIONS), 2)]}',
+                    content='Thanks for getting in touch. Here are a few options for your dates.',
+                    sent_at=self.at(self.moment(rng, after=self.lead_created[self.customer_leads[c]])),
+                )
+        self.insert(Communication, rows())
+
+    def create_campaigns(self):
+        def rows():
+            rng = self.rng('campaigns')
+            status = _weighted(rng, CAMPAIGN_STATUSES)
+            for j in range(self.count(self.plan.campaigns)):
+                p = _skewed_index(rng, len(self.package_ids), 2) if self.package_ids else None
+                budget = round(rng.lognormvariate(log(1500), 0.8), -1)
+                name = status()
+                spend = 0.0 if name == 'draft' else budget * rng.uniform(0.3, 1.0)
+                impressions = int(spend * rng.uniform(40, 220))
+                clicks = int(impressions * rng.uniform(0.004, 0.03))
+                conversions = int(clicks * rng.uniform(0.01, 0.06))
+                revenue = conversions * (self.package_prices[p] if p is not None else 2000) * 2
+                start = self.at(self.moment(rng))
+                yield MetaAdsCampaign(
+                    tenant_id=self.tenant.id, package_id=self.package_ids[p] if p is not None else None,
+                    campaign_id=f'syn-{self.plan.seed}-{self.index}-{j}', campaign_name=f'Campaign {j}',
+                    status=name, budget=_money(budget), spend=_money(spend), impressions=impressions,
+                    clicks=clicks, conversions=conversions, revenue=_money(revenue),
+                    roi=_money((revenue - spend) / spend * 100 if spend else 0),
+                    start_date=start, end_date=start + timedelta(days=rng.choice([7, 14, 30, 60])),
+                    created_at=start - timedelta(days=rng.randint(0, 5)), updated_at=start,
+                )
+        self.insert(MetaAdsCampaign, rows())
+
+    def create_conversations(self):
+        leads = len(self.lead_ids)
+        if not leads:
+            return
+
+        def rows():
+            rng = self.rng('conversations')
+            intent = _weighted(rng, INTENTS)
+            for j in range(self.count(self.plan.conversations)):
+                lead = _skewed_index(rng, leads, 1.5)
+                if not self.lead_has_phone[lead]:
+                    continue
+                phone = self.lead_phone(lead)
+                sentiment = max(-1.0, min(1.0, rng.gauss(0.25, 0.45)))
+                started = self.moment(rng, after=self.lead_created[lead])
+                yield WhatsAppConversation(
+                    tenant_id=self.tenant.id, lead_id=self.lead_ids[lead], conversation_id=f'syn-{self.index}-{j}',
+                    phone_number=phone, phone_normalized=phone, message_count=int(rng.expovariate(1 / 12)) + 1,
+                    last_message_at=self.at(started * rng.random()), created_at=self.at(started),
+                    updated_at=self.at(started * rng.random()), is_active=rng.random() < 0.3,
+                    sentiment_score=_money(sentiment),
+                    sentiment_label='positive' if sentiment > 0.2 else 'negative' if sentiment < -0.2 else 'neutral',
+                    intent=intent(),
+                )
+        self.insert(WhatsAppConversation, rows())
+
+
+_password_hashes: Dict[str, str] = {}
+
+
+def _password_hash(password: str) -> str:
+    # hashing is deliberately slow; every synthetic user shares one hash
+    if password not in _password_hashes:
+        _password_hashes[password] = make_password(password)
+    return _password_hashes[password]
+
+
+def generate_tenant(plan: ScalePlan, index: int) -> Dict[str, int]:
+    """Worker entry point: one tenant, on this process's own connection"""
+    try:
+        return TenantGenerator(plan, index, plan.size_factors()[index]).run()
+    finally:
+        connections.close_all()
+
+
+def generate(plan: ScalePlan, workers: int = 1, progress: Optional[Callable[[int, Dict[str, int]], None]] = None):
+    """
+    Generate every tenant of the plan, largest first, in `workers` processes.
+    Returns the rows written per model.
+    """
+    factors = plan.size_factors()
+    order = sorted(range(plan.tenants), key=lambda i: -factors[i])
+    totals: Dict[str, int] = {}
+
+    def done(index: int, counts: Dict[str, int]):
+        for name, n in counts.items():
+            if name != 'tenant':
+                totals[name] = totals.get(name, 0) + n
+        if progress:
+            progress(index, counts)
+
+    if workers <= 1:
+        for index in order:
+            done(index, TenantGenerator(plan, index, factors[index]).run())
+        return totals
+
+    # forked children must not share the parent's open connections
+    connections.close_all()
+    # spawned workers import nothing of ours before django.setup() has run
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=django.setup) as pool:
+        futures = {pool.submit(generate_tenant, plan, index): index for index in order}
+        for future in as_completed(futures):
+            done(futures[future], future.result())
+    return totals
@@ -0,0 +1,162 @@
+"""
+Tenant Resolution Cache
+In-process host -> tenant lookup used by TenantMiddleware
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Tenant
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Shared counter moved on every tenant change, so other processes drop their entries too
+GENERATION_KEY = 'tenant-resolver:generation'
+# Cache backends that are not shared between processes
+_PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def candidate_domains(host: str) -> List[str]:
+    """
+    Domains that may own a host, most specific first.
+
+    'a.b.example.com' -> ['a.b.example.com', 'b.example.com', 'example.com']
+    Single-label suffixes ('com') are never considered.
+    """
+    host = host.strip().lower().rstrip('.')
+    if not host:
+        return []
+    labels = host.split('.')
+    if len(labels) == 1:
+        return [host]
+    return ['.'.join(labels[i:]) for i in range(len(labels) - 1)]
+
+
+class TenantResolver:
+    """
+    Bounded LRU cache of host -> Tenant with a TTL.
+
+    Misses are cached too (as None) so unknown hosts do not hit the
+    database on every request. Entries are dropped wholesale when a
+    Tenant row is saved or deleted (see core.apps): right away in the
+    writing process, and in the others once they see the shared generation
+    counter move, which they check at most every `sync_interval` seconds.
+    That counter lives in the `cache_alias` cache, so it has to be shared
+    (Redis) when several processes serve requests; see check_shared_cache.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0, sync_interval: float = 1.0,
+                 cache_alias: str = 'default'):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._next_sync = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host: str) -> Optional[Tenant]:
+        key = host.strip().lower().rstrip('.')
+        now = time.monotonic()
+        if now >= self._next_sync:
+            self._sync(now)
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        tenant = self._lookup(key)
+
+        with self._lock:
+            self._entries[key] = (tenant, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return tenant
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def publish_change(self):
+        """Move the shared generation so every process drops its entries"""
+        self.invalidate()
+        cache = caches[self.cache_alias]
+        try:
+            if not cache.add(GENERATION_KEY, 1, timeout=None):
+                cache.incr(GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Could not publish tenant change; other processes catch up within the TTL: {e}")
+
+    def _sync(self, now: float):
+        self._next_sync = now + self.sync_interval
+        try:
+            generation = caches[self.cache_alias].get(GENERATION_KEY, 0)
+        except Exception as e:
+            logger.warning(f"Could not read the tenant cache generation: {e}")
+            return
+        if generation != self._generation:
+            self.invalidate()
+            self._generation = generation
+
+    def _lookup(self, host: str) -> Optional[Tenant]:
+        """Exact match on the host, then on each parent domain"""
+        candidates = candidate_domains(host)
+        if not candidates:
+            return None
+        # domain is unique, so this is a single index probe per candidate
+        tenants = {t.domain.lower(): t for t in Tenant.objects.filter(domain__in=candidates)}
+        for domain in candidates:
+            if domain in tenants:
+                return tenants[domain]
+        return None
+
+
+tenant_resolver = TenantResolver(
+    max_size=getattr(settings, 'TENANT_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', 300),
+    sync_interval=getattr(settings, 'TENANT_CACHE_SYNC_INTERVAL', 1.0),
+)
+
+
+def invalidate_tenant_cache(sender=None, **kwargs):
+    """Signal receiver for Tenant post_save/post_delete"""
+    tenant_resolver.invalidate()
+    # again once committed (a request may have cached the old row meanwhile),
+    # and for the other processes, which only see the change from then on
+    transaction.on_commit(tenant_resolver.publish_change)
+
+
+def check_shared_cache(app_configs=None, **kwargs):
+    """System check: outside DEBUG, tenant changes must reach every worker process"""
+    if settings.DEBUG:
+        return []
+    backend = settings.CACHES.get(tenant_resolver.cache_alias, {}).get('BACKEND', '')
+    if backend not in _PROCESS_LOCAL_BACKENDS:
+        return []
+    return [checks.Warning(
+        f"The '{tenant_resolver.cache_alias}' cache ({backend.rsplit('.', 1)[-1]}) is per process, so "
+        "with several workers a changed or deleted tenant is still served by the other workers "
+        "for up to TENANT_CACHE_TTL seconds.",
+        hint='Set REDIS_URL to share the cache between processes, or run a single worker.',
+        id='core.W001',
+    )]
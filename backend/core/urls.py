@@ -1,7 +1,7 @@
 from django.urls import path, include
 from django.http import HttpResponse
 from rest_framework.routers import DefaultRouter
-from .views import TenantViewSet, UserViewSet, LeadViewSet, CustomerViewSet, DealViewSet, TravelPackageViewSet, BookingViewSet
+from .views import TenantViewSet, UserViewSet, LeadViewSet, CustomerViewSet, DealViewSet, TravelPackageViewSet, BookingViewSet, ResponseCacheStatsView, DashboardViewSet, RequestProfileViewSet
 
 router = DefaultRouter()
 router.register(r'tenants', TenantViewSet)
@@ -11,8 +11,11 @@ router.register(r'customers', CustomerViewSet)
 router.register(r'deals', DealViewSet)
 router.register(r'packages', TravelPackageViewSet)
 router.register(r'bookings', BookingViewSet)
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'profiles', RequestProfileViewSet)
 
 urlpatterns = [
     path('test/', lambda r: HttpResponse('ok')),
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='response_cache_stats'),
     path('', include(router.urls)),
 ]
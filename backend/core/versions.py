@@ -0,0 +1,91 @@
+"""
+Tenant Change Versions
+Per-tenant, per-model counters that move whenever a row of that model changes
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, SET_NULL
+from django.utils import timezone
+
+from .models import TenantModelVersion
+
+# Tenant-scoped models whose writes move their version (wired up in core.apps)
+VERSIONED_MODELS = [
+    'User', 'Lead', 'Customer', 'Deal', 'Communication', 'TravelPackage', 'Booking',
+    'Integration', 'MetaAdsCampaign', 'WhatsAppConversation',
+]
+
+
+def model_label(model) -> str:
+    return model._meta.label
+
+
+def get_version(model, tenant_id: int) -> Tuple[int, Optional[datetime]]:
+    """(version, changed_at) for a tenant's rows of `model`; (0, None) if never changed"""
+    rows = list(TenantModelVersion.objects
+                .filter(tenant_id=tenant_id, model=model_label(model))
+                .values_list('version', 'changed_at')[:1])
+    return rows[0] if rows else (0, None)
+
+
+def version_token(models: Iterable, tenant_id: int) -> str:
+    """Compact token of the tenant's current versions of several models, one query"""
+    labels = sorted(model_label(model) for model in models)
+    versions = dict(TenantModelVersion.objects
+                    .filter(tenant_id=tenant_id, model__in=labels)
+                    .values_list('model', 'version'))
+    return '.'.join(str(versions.get(label, 0)) for label in labels)
+
+
+def _bump_now(label: str, tenant_id: int):
+    now = timezone.now()
+    updated = TenantModelVersion.objects.filter(tenant_id=tenant_id, model=label).update(
+        version=F('version') + 1, changed_at=now
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            TenantModelVersion.objects.create(tenant_id=tenant_id, model=label, version=1, changed_at=now)
+    except IntegrityError:
+        # created concurrently, or the tenant itself is being deleted
+        TenantModelVersion.objects.filter(tenant_id=tenant_id, model=label).update(
+            version=F('version') + 1, changed_at=now
+        )
+
+
+def bump_version(model, tenant_id: Optional[int]):
+    """
+    Move the tenant's version for `model`.
+
+    The bump runs once the surrounding transaction commits, so a reader never
+    sees the new version before the data behind it, and the counter row is
+    not held locked for the length of the writer's transaction. Call this
+    after writes that skip model signals (bulk_create, bulk_update, update()).
+    """
+    if tenant_id is None:
+        return
+    label = model_label(model)
+    transaction.on_commit(lambda: _bump_now(label, tenant_id))
+
+
+def bump_versions(models: Iterable, tenant_ids: Iterable[int]):
+    for tenant_id in set(tenant_ids):
+        for model in models:
+            bump_version(model, tenant_id)
+
+
+def bump_on_save(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        bump_version(sender, getattr(instance, 'tenant_id', None))
+
+
+def bump_on_delete(sender, instance, **kwargs):
+    tenant_id = getattr(instance, 'tenant_id', None)
+    bump_version(sender, tenant_id)
+    # SET_NULL cascades are plain UPDATEs that send no signals of their own
+    for relation in sender._meta.related_objects:
+        if relation.on_delete is SET_NULL and relation.related_model.__name__ in VERSIONED_MODELS:
+            bump_version(relation.related_model, tenant_id)
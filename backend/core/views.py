@@ -1,7 +1,29 @@
-from rest_framework import viewsets, permissions
-from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking
-from .serializers import TenantSerializer, UserSerializer, LeadSerializer, CustomerSerializer, DealSerializer, CommunicationSerializer, TravelPackageSerializer, BookingSerializer
+import hmac
+import math
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import Tenant, User, Lead, Customer, Deal, Communication, TravelPackage, Booking, RequestProfile
+from .serializers import TenantSerializer, UserSerializer, LeadSerializer, CustomerSerializer, DealSerializer, CommunicationSerializer, TravelPackageSerializer, BookingSerializer, RequestProfileSerializer
 from .permissions import RoleBasedPermission
+from .pagination import KeysetCursorPagination
+from .fast_serializers import FastRowSerializer
+from .lead_import import LeadImporter, iter_upload_rows
+from .exports import EXPORT_FORMATS, iter_batches, ndjson_chunks, csv_chunks, aiter_chunks
+from .search import search_lead_ids, search_customer_ids
+from .versions import get_version
+from .response_cache import response_cache, cache_response
+from .pipeline import pipeline_summary
+from . import dashboard, metrics
 
 
 class IsTenantAdmin(permissions.BasePermission):
@@ -24,6 +46,274 @@ class TenantScopedMixin:
         return qs.none()
 
 
+class SparseQuerysetMixin:
+    """Project the queryset down to the fields the serializer will render.
+
+    Pairs with serializers using SparseFieldsMixin so ?fields=/?exclude=
+    also skip reading large columns (e.g. Lead.notes) from the database.
+    """
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.method not in permissions.SAFE_METHODS:
+            return qs
+        if not ('fields' in self.request.query_params or 'exclude' in self.request.query_params):
+            return qs
+        concrete = {f.name for f in qs.model._meta.concrete_fields}
+        rendered = [
+            field.source for field in self.get_serializer().fields.values()
+            if field.source in concrete
+        ]
+        return qs.only('pk', *rendered)
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified on GET list/retrieve from the tenant's change version.
+
+    The validators come from the per-tenant model version (core.versions),
+    one indexed lookup, so a matching If-None-Match/If-Modified-Since gets a
+    304 before the list query runs or anything is serialized.
+    """
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None:
+            return handler(request, *args, **kwargs)
+
+        model = self.queryset.model
+        version, changed_at = get_version(model, tenant.id)
+        # the rendered format is part of the representation (json vs browsable api)
+        etag = f'W/"{model._meta.model_name}-{tenant.id}-{version}-{request.accepted_renderer.format}"'
+        last_modified = int(changed_at.timestamp()) if changed_at else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # let clients keep the body, but always revalidate it
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
+
+
+class CachedListMixin:
+    """Serve GET list from the per-tenant versioned response cache.
+
+    Entries are keyed on the tenant's versions of `cache_models` (the
+    queryset's model by default), so any write to them misses the old entry.
+    """
+    cache_models = None
+
+    def list(self, request, *args, **kwargs):
+        models = self.cache_models or [self.queryset.model]
+        return response_cache.fetch(
+            request, f'{type(self).__name__}.list', models,
+            lambda: super(CachedListMixin, self).list(request, *args, **kwargs)
+        )
+
+
+class FastReadMixin:
+    """Opt-in GET list/retrieve path that skips per-row ModelSerializer work.
+
+    Rows are read with .values() and rendered by a FastRowSerializer compiled
+    from the view's serializer, producing the same JSON. Enabled by
+    settings.FAST_READ_SERIALIZATION or `fast_read = True` on the view; views
+    whose serializer cannot be compiled use the regular path.
+    """
+    fast_read = None
+
+    def get_fast_serializer(self):
+        enabled = self.fast_read if self.fast_read is not None else getattr(settings, 'FAST_READ_SERIALIZATION', False)
+        if not enabled:
+            return None
+        return FastRowSerializer.compile(self.get_serializer())
+
+    def _has_object_permissions(self):
+        return any(
+            type(permission).has_object_permission is not permissions.BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = fast.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.many(page))
+        return Response(fast.many(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        if fast is None or self._has_object_permissions():
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = fast.values(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(rows, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(fast.to_representation(row))
+
+
+class ExportMixin:
+    """GET <resource>/export/?output=ndjson|csv streams the whole tenant table.
+
+    Rows are read in chunks through a server-side cursor (keyset pages
+    behind PgBouncer) and each chunk is sent as soon as it is rendered, also
+    under ASGI, so memory stays flat however large the tenant is. Honours
+    ?fields=/?exclude= like the list endpoint.
+    """
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        serializer = self.get_serializer()
+        fast = FastRowSerializer.compile(serializer)
+        if fast is not None:
+            batches = iter_batches(fast.values(queryset), fast.to_representation)
+        else:
+            batches = iter_batches(queryset, lambda obj: self.get_serializer(obj).data)
+
+        if output == 'csv':
+            chunks = csv_chunks(batches, list(serializer.fields))
+        else:
+            chunks = ndjson_chunks(batches)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[output])
+        filename = self.basename or queryset.model._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+        return response
+
+
+class SearchMixin:
+    """GET <resource>/search/?q=...&limit=N ranked full-text search (see core.search)"""
+    search_function = None
+    max_search_results = 100
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_search_results)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None:
+            return Response({'results': []})
+
+        ids = type(self).search_function(tenant.id, query, limit)
+        objects = self.get_queryset().in_bulk(ids)
+        ranked = [objects[pk] for pk in ids if pk in objects]
+        return Response({'results': self.get_serializer(ranked, many=True).data})
+
+
+class ResponseCacheStatsView(APIView):
+    """GET /api/cache/stats/ - response cache hits and misses for this process"""
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+
+def metrics_view(request):
+    """GET /metrics - Prometheus scrape endpoint; needs `Bearer <METRICS_TOKEN>` when that is set"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(metrics.registry.collect()), content_type=metrics.CONTENT_TYPE)
+
+
+class RequestProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """Stored request profiles (staff only); filter with ?route=, ?tenant=, ?min_duration_ms="""
+    queryset = RequestProfile.objects.defer('collapsed')
+    serializer_class = RequestProfileSerializer
+    pagination_class = KeysetCursorPagination
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        params = self.request.query_params
+        if params.get('route'):
+            qs = qs.filter(route=params['route'])
+        if params.get('tenant'):
+            try:
+                qs = qs.filter(tenant_id=int(params['tenant']))
+            except ValueError:
+                raise ValidationError({'error': 'tenant must be an integer'})
+        if params.get('min_duration_ms'):
+            try:
+                min_duration_ms = float(params['min_duration_ms'])
+            except ValueError:
+                min_duration_ms = math.nan
+            if not math.isfinite(min_duration_ms):
+                raise ValidationError({'error': 'min_duration_ms must be a number'})
+            qs = qs.filter(duration_ms__gte=min_duration_ms)
+        return qs
+
+    @action(detail=True, methods=['get'])
+    def collapsed(self, request, pk=None):
+        """Collapsed stacks as a file for flamegraph.pl, speedscope or inferno"""
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(profile.collapsed, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.id}.folded"'
+        return response
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """GET /api/dashboard/<metric>/?start=&end= (or ?days=N), read from the daily rollups only"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _metric(self, request, compute):
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None:
+            return Response({'error': 'Unknown tenant'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            first, last = dashboard.parse_range(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'start': first, 'end': last, **compute(tenant.id, first, last)})
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return self._metric(request, dashboard.summary)
+
+    @action(detail=False, methods=['get'])
+    def leads(self, request):
+        return self._metric(request, dashboard.lead_metrics)
+
+    @action(detail=False, methods=['get'])
+    def bookings(self, request):
+        return self._metric(request, dashboard.booking_metrics)
+
+    @action(detail=False, methods=['get'])
+    def deals(self, request):
+        return self._metric(request, dashboard.deal_metrics)
+
+    @action(detail=False, methods=['get'])
+    def campaigns(self, request):
+        return self._metric(request, dashboard.campaign_metrics)
+
+
 class TenantViewSet(viewsets.ModelViewSet):
     queryset = Tenant.objects.all()
     serializer_class = TenantSerializer
@@ -43,31 +333,71 @@ class UserViewSet(TenantScopedMixin, viewsets.ModelViewSet):
         return perms
 
 
-class LeadViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class LeadViewSet(SearchMixin, ExportMixin, ConditionalGetMixin, CachedListMixin, FastReadMixin, SparseQuerysetMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = Lead.objects.all()
     serializer_class = LeadSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
+    search_function = search_lead_ids
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """Upsert leads from a JSON array body or an uploaded CSV/JSON/NDJSON file"""
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None:
+            return Response({'error': 'Unknown tenant'}, status=status.HTTP_400_BAD_REQUEST)
 
-class CustomerViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            rows = iter_upload_rows(upload)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {'error': 'Send a JSON array of leads or upload a file as "file"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = LeadImporter(tenant.id).run(rows)
+        if 'error' in result:
+            # unreadable rest of the file: the report covers the rows before it
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class CustomerViewSet(SearchMixin, ExportMixin, ConditionalGetMixin, CachedListMixin, FastReadMixin, SparseQuerysetMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
+    search_function = search_customer_ids
 
 
-class DealViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class DealViewSet(ConditionalGetMixin, CachedListMixin, FastReadMixin, SparseQuerysetMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = Deal.objects.all()
     serializer_class = DealSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
+    @action(detail=False, methods=['get'])
+    @cache_response(Deal, User)
+    def pipeline(self, request):
+        """Count, value and probability-weighted value per stage and per assignee"""
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None:
+            return Response({'error': 'Unknown tenant'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(pipeline_summary(tenant.id))
+
 
-class TravelPackageViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class TravelPackageViewSet(ConditionalGetMixin, CachedListMixin, FastReadMixin, SparseQuerysetMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = TravelPackage.objects.all()
     serializer_class = TravelPackageSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
 
-class BookingViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class BookingViewSet(ExportMixin, ConditionalGetMixin, CachedListMixin, FastReadMixin, SparseQuerysetMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
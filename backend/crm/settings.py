@@ -8,7 +8,8 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv('DJANGO_SECRET', 'change-me')
 DEBUG = os.getenv('DEBUG', '1') == '1'
-ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
+# comma-separated; '.travelcrm.io' also matches every tenant subdomain
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1,0.0.0.0').split(',')
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -23,7 +24,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -31,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.TenantMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'crm.urls'
@@ -53,30 +58,81 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'crm.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(BASE_DIR / 'db.sqlite3'),
-    }
-}
+# Database: DB_ENGINE=sqlite (default, local development) or postgres (production)
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
 
-# Allow a local SQLite fallback for quick local development when Postgres/Docker isn't available.
-USE_SQLITE = True
-if USE_SQLITE:
-    DATABASES['default'] = {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(BASE_DIR / 'db.sqlite3'),
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'travel_crm_dev'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            # Persistent connections, checked before reuse so a dropped one is replaced
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', '5')),
+            },
+        }
     }
+    # In-process psycopg 3 pool shared by a worker's threads (replaces CONN_MAX_AGE)
+    if os.getenv('DB_POOL', '0') == '1':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+    # Behind PgBouncer in transaction mode: cursors cannot outlive a transaction
+    if os.getenv('DB_PGBOUNCER', '0') == '1':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 else:
-    DATABASES['default'] = {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('POSTGRES_DB', 'travel_crm_dev'),
-        'USER': os.getenv('POSTGRES_USER', 'postgres'),
-        'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
-        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
-        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # seconds a writer waits for the lock before "database is locked"
+                'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+                # take the write lock at BEGIN so concurrent writers queue on the
+                # timeout instead of failing on a read -> write lock upgrade
+                'transaction_mode': 'IMMEDIATE',
+                # WAL lets readers run alongside the writer; NORMAL only syncs at
+                # checkpoints, which WAL keeps crash-safe
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+                    'PRAGMA cache_size=-64000;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
     }
 
+# Read replicas (see core.db_router), comma-separated: SQLite file paths, or
+# Postgres host[:port][/dbname] entries (unset parts come from the primary)
+DATABASE_REPLICAS = []
+for index, entry in enumerate(filter(None, (e.strip() for e in os.getenv('DB_REPLICAS', '').split(',')))):
+    replica = dict(DATABASES['default'], OPTIONS=dict(DATABASES['default']['OPTIONS']), TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'postgres':
+        address, _, name = entry.partition('/')
+        host, _, port = address.partition(':')
+        replica.update(HOST=host or replica['HOST'], PORT=port or replica['PORT'], NAME=name or replica['NAME'])
+    else:
+        replica['NAME'] = entry
+    DATABASES[f'replica_{index}'] = replica
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Seconds a user/tenant keeps reading from the primary after a write
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+REPLICA_PIN_CACHE_ALIAS = os.getenv('REPLICA_PIN_CACHE_ALIAS', 'default')
+
 # AUTH_USER_MODEL = 'core.User'
 
 # REST_FRAMEWORK = {
@@ -92,13 +148,57 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.TenantJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Page size and ?page_size= upper bound for the keyset-paginated core list
+# endpoints (core.pagination); other endpoints are not paginated
+DEFAULT_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+
+# Serve core GET list/retrieve from .values() rows instead of ModelSerializer
+FAST_READ_SERIALIZATION = os.getenv('FAST_READ_SERIALIZATION', '0') == '1'
+
+# Country code assumed for phone numbers written without one (e.g. '1');
+# leave empty to only normalize numbers that carry a +/00 prefix
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv('DEFAULT_PHONE_COUNTRY_CODE', '')
+
+# Rows per bulk_create/bulk_update round trip in POST /api/leads/import/
+LEAD_IMPORT_BATCH_SIZE = int(os.getenv('LEAD_IMPORT_BATCH_SIZE', '1000'))
+
+# Lead dedup (manage.py dedupe_leads): changed leads per batch, minimum pair score to merge
+LEAD_DEDUP_BATCH_SIZE = int(os.getenv('LEAD_DEDUP_BATCH_SIZE', '1000'))
+LEAD_DEDUP_THRESHOLD = float(os.getenv('LEAD_DEDUP_THRESHOLD', '0.6'))
+
+# Per-request query counts (X-Query-Count / X-Query-Repeats headers, warnings for
+# repeated queries and QUERY_BUDGETS overruns); see core.query_budget
+QUERY_INSTRUMENTATION = os.getenv('QUERY_INSTRUMENTATION', '1' if DEBUG else '0') == '1'
+# Runs of the same query signature in one request that count as an N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '3'))
+
+# GET /metrics (Prometheus). With several workers per host point
+# METRICS_MULTIPROC_DIR at a directory they share (emptied on deploy); each
+# worker writes its totals there every METRICS_FLUSH_INTERVAL seconds
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '10'))
+
+# Request profiling (see core.profiling): staff send `X-Profile: 1`, or set a
+# sample rate (e.g. 0.001); sampled profiles faster than the minimum are dropped
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_MIN_DURATION_MS = float(os.getenv('PROFILING_MIN_DURATION_MS', '500'))
+PROFILING_INTERVAL_MS = float(os.getenv('PROFILING_INTERVAL_MS', '5'))
+
+# Rows fetched per server-side cursor round trip by the /export/ endpoints
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Newest full-text matches ranked per lead/customer search (see core.search)
+SEARCH_CANDIDATE_LIMIT = int(os.getenv('SEARCH_CANDIDATE_LIMIT', '2000'))
+
 # from rest_framework.settings import api_settings  # noqa: E402
 
 # SIMPLE_JWT = {
@@ -109,11 +209,50 @@ from rest_framework.settings import api_settings  # noqa: E402
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=8),
+    # tokens carry tenant_id and role so requests authenticate without a query
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.TenantTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.authentication.TenantTokenRefreshSerializer',
 }
 
+# Seconds each process keeps the token revocation list before reloading it
+AUTH_REVOCATION_CACHE_TTL = int(os.getenv('AUTH_REVOCATION_CACHE_TTL', '30'))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 STATIC_URL = '/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Host -> tenant resolution cache used by core.middleware.TenantMiddleware
+TENANT_CACHE_MAX_SIZE = int(os.getenv('TENANT_CACHE_MAX_SIZE', '1024'))
+TENANT_CACHE_TTL = int(os.getenv('TENANT_CACHE_TTL', '300'))
+# Seconds between checks for tenant changes made by other processes (shared cache counter)
+TENANT_CACHE_SYNC_INTERVAL = float(os.getenv('TENANT_CACHE_SYNC_INTERVAL', '1'))
+
+# Local memory cache per process; set REDIS_URL (e.g. redis://localhost:6379/0)
+# to share one cache between app servers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'travel-crm',
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Versioned GET response cache (see core.response_cache)
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', '1') == '1'
+RESPONSE_CACHE_ALIAS = os.getenv('RESPONSE_CACHE_ALIAS', 'default')
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Outbound agent HTTP (see integrations.http_client); one pooled client per event loop
+INTEGRATION_HTTP_TIMEOUT = float(os.getenv('INTEGRATION_HTTP_TIMEOUT', '30'))
+INTEGRATION_HTTP_CONNECT_TIMEOUT = float(os.getenv('INTEGRATION_HTTP_CONNECT_TIMEOUT', '5'))
+INTEGRATION_HTTP_MAX_CONNECTIONS = int(os.getenv('INTEGRATION_HTTP_MAX_CONNECTIONS', '1000'))
+INTEGRATION_HTTP_MAX_KEEPALIVE = int(os.getenv('INTEGRATION_HTTP_MAX_KEEPALIVE', '200'))
+# Serve the WhatsApp / Meta Ads endpoints with the async views (run under an ASGI server)
+ASYNC_INTEGRATION_VIEWS = os.getenv('ASYNC_INTEGRATION_VIEWS', '0') == '1'
@@ -0,0 +1,348 @@
+"""
+Async API Views for Agent Integrations
+Coroutine versions of the WhatsApp and Meta Ads endpoints for the ASGI stack
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.utils import timezone
+from core.models import MetaAdsCampaign, TravelPackage
+from integrations.manager import IntegrationManager
+from .views import WhatsAppViewSet, MetaAdsViewSet
+
+
+class AsyncViewSetMixin:
+    """
+    Lets a DRF viewset serve `async def` actions.
+
+    DRF dispatches synchronously, so under ASGI every outbound agent call
+    would hold a worker thread for its full round trip. Here authentication,
+    permissions and throttling still run in a thread (they touch the ORM),
+    but the action itself is awaited on the event loop, so a slow agent only
+    costs an idle coroutine. Actions left synchronous are run in a thread.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # the wrapper returns dispatch()'s coroutine; tell Django to await it
+        markcoroutinefunction(view)
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _connected(tenant_id, integration_name: str):
+    integration = IntegrationManager(tenant_id).get_integration(integration_name)
+    if not integration or not integration.is_connected:
+        return None
+    return integration
+
+
+def _error(message: str, status_code=status.HTTP_400_BAD_REQUEST) -> Response:
+    return Response({
+        'success': False,
+        'error': message
+    }, status=status_code)
+
+
+def _package_data(package: TravelPackage):
+    return {
+        'id': str(package.id),
+        'name': package.name,
+        'description': package.description,
+        'base_price': str(package.base_price),
+        'duration': package.duration,
+        'destination': package.destination
+    }
+
+
+class AsyncWhatsAppViewSet(AsyncViewSetMixin, WhatsAppViewSet):
+    """WhatsApp Agent integration endpoints (async)"""
+
+    @action(detail=False, methods=['post'])
+    async def send_message(self, request):
+        """Send WhatsApp message to a contact"""
+        phone_number = request.data.get('phone_number')
+
+        if not phone_number:
+            return _error('phone_number is required')
+
+        whatsapp = _connected(request.user.tenant_id, 'whatsapp')
+        if not whatsapp:
+            return _error('WhatsApp not connected')
+
+        result = await whatsapp.asend_message(
+            phone_number=phone_number,
+            message=request.data.get('message'),
+            template_name=request.data.get('template_name'),
+            template_params=request.data.get('template_params', {})
+        )
+
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    async def send_package(self, request):
+        """Send package details via WhatsApp"""
+        tenant_id = request.user.tenant_id
+        phone_number = request.data.get('phone_number')
+        package_id = request.data.get('package_id')
+
+        if not phone_number or not package_id:
+            return _error('phone_number and package_id are required')
+
+        try:
+            package = await TravelPackage.objects.aget(id=package_id, tenant_id=tenant_id)
+        except TravelPackage.DoesNotExist:
+            return _error('Package not found', status.HTTP_404_NOT_FOUND)
+
+        whatsapp = _connected(tenant_id, 'whatsapp')
+        if not whatsapp:
+            return _error('WhatsApp not connected')
+
+        result = await whatsapp.asend_package_details(phone_number, _package_data(package))
+
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    async def broadcast(self, request):
+        """Broadcast message to multiple contacts"""
+        phone_numbers = request.data.get('phone_numbers', [])
+        message = request.data.get('message')
+
+        if not phone_numbers or not message:
+            return _error('phone_numbers and message are required')
+
+        whatsapp = _connected(request.user.tenant_id, 'whatsapp')
+        if not whatsapp:
+            return _error('WhatsApp not connected')
+
+        result = await whatsapp.abroadcast_message(
+            phone_numbers=phone_numbers,
+            message=message,
+            template_name=request.data.get('template_name')
+        )
+
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    async def analytics(self, request):
+        """Get WhatsApp analytics"""
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+
+        if not start_date or not end_date:
+            return _error('start_date and end_date are required')
+
+        whatsapp = _connected(request.user.tenant_id, 'whatsapp')
+        if not whatsapp:
+            return _error('WhatsApp not connected')
+
+        result = await whatsapp.aget_analytics(start_date, end_date)
+
+        return Response(result)
+
+
+class AsyncMetaAdsViewSet(AsyncViewSetMixin, MetaAdsViewSet):
+    """
+    Meta Ads Agent integration endpoints (async).
+    `campaigns` only reads the database and stays synchronous.
+    """
+
+    @action(detail=False, methods=['post'])
+    async def create_campaign(self, request):
+        """Create a new Meta Ads campaign"""
+        tenant_id = request.user.tenant_id
+        campaign_data = request.data.get('campaign_data', {})
+
+        meta_ads = _connected(tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        result = await meta_ads.acreate_campaign(campaign_data)
+
+        if not result['success']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+        package = None
+        if campaign_data.get('package_id'):
+            package = await TravelPackage.objects.filter(
+                id=campaign_data['package_id'], tenant_id=tenant_id
+            ).afirst()
+
+        campaign = await MetaAdsCampaign.objects.acreate(
+            tenant_id=tenant_id,
+            package=package,
+            campaign_id=result.get('campaign_id'),
+            campaign_name=result.get('campaign_name'),
+            status='active',
+            budget=campaign_data.get('budget', 0),
+            start_date=timezone.now()
+        )
+
+        return Response({
+            'success': True,
+            'campaign': {
+                'id': campaign.id,
+                'campaign_id': campaign.campaign_id,
+                'campaign_name': campaign.campaign_name,
+                'status': campaign.status
+            }
+        })
+
+    @action(detail=False, methods=['post'])
+    async def promote_package(self, request):
+        """Quick campaign creation for a package"""
+        tenant_id = request.user.tenant_id
+        package_id = request.data.get('package_id')
+        budget = request.data.get('budget')
+        duration_days = request.data.get('duration_days', 7)
+
+        if not package_id or not budget:
+            return _error('package_id and budget are required')
+
+        try:
+            package = await TravelPackage.objects.aget(id=package_id, tenant_id=tenant_id)
+        except TravelPackage.DoesNotExist:
+            return _error('Package not found', status.HTTP_404_NOT_FOUND)
+
+        meta_ads = _connected(tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        result = await meta_ads.acreate_package_campaign(_package_data(package), float(budget), duration_days)
+
+        if not result['success']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+        campaign = await MetaAdsCampaign.objects.acreate(
+            tenant_id=tenant_id,
+            package=package,
+            campaign_id=result.get('campaign_id'),
+            campaign_name=result.get('campaign_name'),
+            status='active',
+            budget=budget,
+            start_date=timezone.now()
+        )
+
+        return Response({
+            'success': True,
+            'campaign': {
+                'id': campaign.id,
+                'campaign_id': campaign.campaign_id,
+                'campaign_name': campaign.campaign_name
+            }
+        })
+
+    async def _campaign(self, request, pk):
+        return await MetaAdsCampaign.objects.filter(id=pk, tenant_id=request.user.tenant_id).afirst()
+
+    @action(detail=True, methods=['get'])
+    async def performance(self, request, pk=None):
+        """Get campaign performance"""
+        campaign = await self._campaign(request, pk)
+        if campaign is None:
+            return _error('Campaign not found', status.HTTP_404_NOT_FOUND)
+
+        meta_ads = _connected(request.user.tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        result = await meta_ads.aget_campaign_performance(campaign.campaign_id)
+
+        if result['success']:
+            # Update database with latest performance
+            performance = result['performance']
+            campaign.spend = performance.get('spend', 0)
+            campaign.impressions = performance.get('impressions', 0)
+            campaign.clicks = performance.get('clicks', 0)
+            campaign.conversions = performance.get('conversions', 0)
+            campaign.revenue = performance.get('revenue', 0)
+            campaign.roi = performance.get('roi', 0)
+            campaign.status = performance.get('status', campaign.status)
+            await campaign.asave()
+
+        return Response(result)
+
+    @action(detail=True, methods=['post'])
+    async def pause(self, request, pk=None):
+        """Pause a campaign"""
+        return await self._set_status(request, pk, 'paused')
+
+    @action(detail=True, methods=['post'])
+    async def resume(self, request, pk=None):
+        """Resume a paused campaign"""
+        return await self._set_status(request, pk, 'active')
+
+    async def _set_status(self, request, pk, new_status: str):
+        campaign = await self._campaign(request, pk)
+        if campaign is None:
+            return _error('Campaign not found', status.HTTP_404_NOT_FOUND)
+
+        meta_ads = _connected(request.user.tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        if new_status == 'paused':
+            result = await meta_ads.apause_campaign(campaign.campaign_id)
+        else:
+            result = await meta_ads.aresume_campaign(campaign.campaign_id)
+
+        if result['success']:
+            campaign.status = new_status
+            await campaign.asave()
+
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    async def analytics(self, request):
+        """Get Meta Ads analytics"""
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+
+        if not start_date or not end_date:
+            return _error('start_date and end_date are required')
+
+        meta_ads = _connected(request.user.tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        result = await meta_ads.aget_analytics(start_date, end_date)
+
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    async def recommendations(self, request):
+        """Get AI recommendations for campaigns"""
+        meta_ads = _connected(request.user.tenant_id, 'meta_ads')
+        if not meta_ads:
+            return _error('Meta Ads not connected')
+
+        result = await meta_ads.aget_ai_recommendations(request.query_params.get('campaign_id'))
+
+        return Response(result)
@@ -5,9 +5,13 @@ All external integrations inherit from this base class
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import requests
+import httpx
 from django.conf import settings
 import logging
 
+from core.metrics import outbound_timer
+from .http_client import get_async_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +53,19 @@ class BaseIntegration(ABC):
         """
         pass
     
+    def _request_url(self, endpoint: str) -> str:
+        return f"{self.api_url}/{endpoint.lstrip('/')}"
+    
+    def _request_headers(self, headers: Optional[Dict] = None) -> Dict[str, str]:
+        default_headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        if headers:
+            default_headers.update(headers)
+        return default_headers
+    
     def make_request(
         self, 
         method: str, 
@@ -61,24 +78,52 @@ class BaseIntegration(ABC):
         Make HTTP request to external API
         """
         try:
-            url = f"{self.api_url}/{endpoint.lstrip('/')}"
+            with outbound_timer(self.__class__.__name__):
+                response = requests.request(
+                    method=method,
+                    url=self._request_url(endpoint),
+                    json=data,
+                    params=params,
+                    headers=self._request_headers(headers),
+                    timeout=30
+                )
             
-            default_headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
+            response.raise_for_status()
+            return {
+                'success': True,
+                'data': response.json() if response.content else {},
+                'status_code': response.status_code
             }
             
-            if headers:
-                default_headers.update(headers)
-            
-            response = requests.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                headers=default_headers,
-                timeout=30
-            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"API request failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'status_code': getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
+            }
+    
+    async def amake_request(
+        self, 
+        method: str, 
+        endpoint: str, 
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Async make_request on the loop's pooled client; same result shape.
+        Waiting on the agent holds no thread, only a pooled connection.
+        """
+        try:
+            with outbound_timer(self.__class__.__name__):
+                response = await get_async_client().request(
+                    method,
+                    self._request_url(endpoint),
+                    json=data,
+                    params=params,
+                    headers=self._request_headers(headers)
+                )
             
             response.raise_for_status()
             return {
@@ -87,12 +132,12 @@ class BaseIntegration(ABC):
                 'status_code': response.status_code
             }
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"API request failed: {str(e)}")
             return {
                 'success': False,
                 'error': str(e),
-                'status_code': getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
+                'status_code': e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
             }
     
     def log_activity(self, activity_type: str, details: Dict[str, Any]):
@@ -0,0 +1,45 @@
+"""
+Pooled Async HTTP Client
+One httpx.AsyncClient per event loop, shared by all outbound agent calls
+"""
+import asyncio
+import weakref
+
+import httpx
+from django.conf import settings
+
+# httpx clients are bound to the loop they were first used on
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = weakref.WeakKeyDictionary()
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            getattr(settings, 'INTEGRATION_HTTP_TIMEOUT', 30),
+            connect=getattr(settings, 'INTEGRATION_HTTP_CONNECT_TIMEOUT', 5),
+        ),
+        limits=httpx.Limits(
+            max_connections=getattr(settings, 'INTEGRATION_HTTP_MAX_CONNECTIONS', 1000),
+            max_keepalive_connections=getattr(settings, 'INTEGRATION_HTTP_MAX_KEEPALIVE', 200),
+        ),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    The running loop's shared client. Connections are pooled and kept alive
+    across requests, so concurrent calls to the same agent reuse sockets
+    instead of paying a TCP/TLS handshake each time.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = _build_client()
+    return client
+
+
+async def close_async_client():
+    """Close the running loop's client (e.g. from an ASGI lifespan shutdown hook)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -119,14 +119,22 @@ class MetaAdsAgentIntegration(BaseIntegration):
                 'duration_days': 7
             }
         """
-        payload = {
+        result = self.make_request('POST', '/campaigns/create', data=self._campaign_payload(campaign_data))
+        return self._campaign_created(result, campaign_data)
+    
+    async def acreate_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async create_campaign"""
+        result = await self.amake_request('POST', '/campaigns/create', data=self._campaign_payload(campaign_data))
+        return self._campaign_created(result, campaign_data)
+    
+    def _campaign_payload(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             'ad_account_id': self.ad_account_id,
             'tenant_id': self.tenant_id,
             **campaign_data
         }
-        
-        result = self.make_request('POST', '/campaigns/create', data=payload)
-        
+    
+    def _campaign_created(self, result: Dict[str, Any], campaign_data: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             campaign_id = result.get('data', {}).get('campaign_id')
             self.log_activity('campaign_created', {
@@ -151,7 +159,14 @@ class MetaAdsAgentIntegration(BaseIntegration):
         Quick campaign creation for a travel package
         Uses AI to generate optimal ad creative and targeting
         """
-        campaign_data = {
+        return self.create_campaign(self._package_campaign_data(package_data, budget, duration_days))
+    
+    async def acreate_package_campaign(self, package_data: Dict[str, Any], budget: float, duration_days: int = 7) -> Dict[str, Any]:
+        """Async create_package_campaign"""
+        return await self.acreate_campaign(self._package_campaign_data(package_data, budget, duration_days))
+    
+    def _package_campaign_data(self, package_data: Dict[str, Any], budget: float, duration_days: int) -> Dict[str, Any]:
+        return {
             'name': f"{package_data['name']} - {timezone.now().strftime('%Y-%m-%d')}",
             'objective': 'CONVERSIONS',
             'budget': budget,
@@ -165,15 +180,20 @@ class MetaAdsAgentIntegration(BaseIntegration):
             'duration_days': duration_days,
             'auto_optimize': True  # Let Meta Ads Agent AI optimize
         }
-        
-        return self.create_campaign(campaign_data)
     
     def get_campaign_performance(self, campaign_id: str) -> Dict[str, Any]:
         """
         Get real-time performance metrics for a campaign
         """
         result = self.make_request('GET', f'/campaigns/{campaign_id}/performance')
-        
+        return self._shape_performance(result)
+    
+    async def aget_campaign_performance(self, campaign_id: str) -> Dict[str, Any]:
+        """Async get_campaign_performance"""
+        result = await self.amake_request('GET', f'/campaigns/{campaign_id}/performance')
+        return self._shape_performance(result)
+    
+    def _shape_performance(self, result: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             performance = result.get('data', {})
             return {
@@ -216,18 +236,26 @@ class MetaAdsAgentIntegration(BaseIntegration):
     def pause_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """Pause an active campaign"""
         result = self.make_request('POST', f'/campaigns/{campaign_id}/pause')
-        
-        if result['success']:
-            self.log_activity('campaign_paused', {'campaign_id': campaign_id})
-        
-        return result
+        return self._logged(result, 'campaign_paused', campaign_id)
+    
+    async def apause_campaign(self, campaign_id: str) -> Dict[str, Any]:
+        """Async pause_campaign"""
+        result = await self.amake_request('POST', f'/campaigns/{campaign_id}/pause')
+        return self._logged(result, 'campaign_paused', campaign_id)
     
     def resume_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """Resume a paused campaign"""
         result = self.make_request('POST', f'/campaigns/{campaign_id}/resume')
-        
+        return self._logged(result, 'campaign_resumed', campaign_id)
+    
+    async def aresume_campaign(self, campaign_id: str) -> Dict[str, Any]:
+        """Async resume_campaign"""
+        result = await self.amake_request('POST', f'/campaigns/{campaign_id}/resume')
+        return self._logged(result, 'campaign_resumed', campaign_id)
+    
+    def _logged(self, result: Dict[str, Any], activity_type: str, campaign_id: str) -> Dict[str, Any]:
         if result['success']:
-            self.log_activity('campaign_resumed', {'campaign_id': campaign_id})
+            self.log_activity(activity_type, {'campaign_id': campaign_id})
         
         return result
     
@@ -264,13 +292,22 @@ class MetaAdsAgentIntegration(BaseIntegration):
         """
         Get AI-powered recommendations for campaign optimization
         """
+        result = self.make_request('GET', '/ai/recommendations', params=self._recommendation_params(campaign_id))
+        return self._shape_recommendations(result)
+    
+    async def aget_ai_recommendations(self, campaign_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async get_ai_recommendations"""
+        result = await self.amake_request('GET', '/ai/recommendations', params=self._recommendation_params(campaign_id))
+        return self._shape_recommendations(result)
+    
+    def _recommendation_params(self, campaign_id: Optional[str]) -> Dict[str, Any]:
         params = {'ad_account_id': self.ad_account_id}
         
         if campaign_id:
             params['campaign_id'] = campaign_id
-        
-        result = self.make_request('GET', '/ai/recommendations', params=params)
-        
+        return params
+    
+    def _shape_recommendations(self, result: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             recommendations = result.get('data', {}).get('recommendations', [])
             return {
@@ -360,12 +397,22 @@ class MetaAdsAgentIntegration(BaseIntegration):
         """
         Get comprehensive analytics for date range
         """
-        result = self.make_request('GET', '/analytics', params={
+        result = self.make_request('GET', '/analytics', params=self._analytics_params(start_date, end_date))
+        return self._shape_analytics(result)
+    
+    async def aget_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Async get_analytics"""
+        result = await self.amake_request('GET', '/analytics', params=self._analytics_params(start_date, end_date))
+        return self._shape_analytics(result)
+    
+    def _analytics_params(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        return {
             'ad_account_id': self.ad_account_id,
             'start_date': start_date,
             'end_date': end_date
-        })
-        
+        }
+    
+    def _shape_analytics(self, result: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             analytics = result.get('data', {})
             return {
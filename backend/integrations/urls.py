@@ -1,10 +1,14 @@
 """
 URLs for Integration APIs
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import IntegrationViewSet, WhatsAppViewSet, MetaAdsViewSet
 
+if settings.ASYNC_INTEGRATION_VIEWS:
+    from .async_views import AsyncWhatsAppViewSet as WhatsAppViewSet, AsyncMetaAdsViewSet as MetaAdsViewSet
+
 router = DefaultRouter()
 router.register(r'integrations', IntegrationViewSet, basename='integration')
 router.register(r'whatsapp', WhatsAppViewSet, basename='whatsapp')
@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from core.models import Integration, MetaAdsCampaign, WhatsAppConversation, TravelPackage
+from core.response_cache import cache_response
+from core.versions import bump_version
 from integrations.manager import IntegrationManager
 import json
 
@@ -15,6 +17,7 @@ class IntegrationViewSet(viewsets.ViewSet):
     """Manage external integrations"""
     permission_classes = [IsAuthenticated]
     
+    @cache_response(Integration)
     def list(self, request):
         """Get all integrations status for current tenant"""
         tenant_id = request.user.tenant_id
@@ -108,6 +111,7 @@ class IntegrationViewSet(viewsets.ViewSet):
             tenant_id=tenant_id,
             integration_type=integration_type
         ).update(is_active=False)
+        bump_version(Integration, tenant_id)
         
         return Response(result)
     
@@ -152,6 +156,7 @@ class IntegrationViewSet(viewsets.ViewSet):
                 tenant_id=tenant_id,
                 integration_type=integration_type
             ).update(last_synced_at=timezone.now())
+            bump_version(Integration, tenant_id)
         else:
             # Sync all integrations
             result = manager.sync_all_integrations()
@@ -161,6 +166,7 @@ class IntegrationViewSet(viewsets.ViewSet):
                 tenant_id=tenant_id,
                 is_active=True
             ).update(last_synced_at=timezone.now())
+            bump_version(Integration, tenant_id)
         
         return Response({
             'success': True,
@@ -426,11 +432,12 @@ class MetaAdsViewSet(viewsets.ViewSet):
         return Response(result, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'])
+    @cache_response(MetaAdsCampaign, TravelPackage)
     def campaigns(self, request):
         """Get all campaigns for tenant"""
         tenant_id = request.user.tenant_id
         
-        campaigns = MetaAdsCampaign.objects.filter(tenant_id=tenant_id).order_by('-created_at')
+        campaigns = MetaAdsCampaign.objects.filter(tenant_id=tenant_id).select_related('package').order_by('-created_at')
         
         campaigns_list = []
         for campaign in campaigns:
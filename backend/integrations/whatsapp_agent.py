@@ -5,7 +5,7 @@ Connects to your custom WhatsApp ML-powered agent API
 from typing import Dict, Any, List, Optional
 from .base import BaseIntegration
 from core.models import Lead, Customer, Communication
-from django.utils import timezone
+from core.phones import phone_lookup
 import json
 
 
@@ -106,6 +106,29 @@ class WhatsAppAgentIntegration(BaseIntegration):
             template_name: WhatsApp template name (optional)
             template_params: Template parameters (optional)
         """
+        payload = self._message_payload(phone_number, message, template_name, template_params)
+        result = self.make_request('POST', '/messages/send', data=payload)
+        return self._message_sent(result, phone_number)
+    
+    async def asend_message(
+        self, 
+        phone_number: str, 
+        message: str, 
+        template_name: Optional[str] = None,
+        template_params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Async send_message"""
+        payload = self._message_payload(phone_number, message, template_name, template_params)
+        result = await self.amake_request('POST', '/messages/send', data=payload)
+        return self._message_sent(result, phone_number)
+    
+    def _message_payload(
+        self, 
+        phone_number: str, 
+        message: str, 
+        template_name: Optional[str],
+        template_params: Optional[Dict]
+    ) -> Dict[str, Any]:
         payload = {
             'phone_number': phone_number,
             'tenant_id': self.tenant_id
@@ -118,9 +141,9 @@ class WhatsAppAgentIntegration(BaseIntegration):
             }
         else:
             payload['message'] = message
-        
-        result = self.make_request('POST', '/messages/send', data=payload)
-        
+        return payload
+    
+    def _message_sent(self, result: Dict[str, Any], phone_number: str) -> Dict[str, Any]:
         if result['success']:
             self.log_activity('message_sent', {
                 'phone_number': phone_number,
@@ -134,15 +157,25 @@ class WhatsAppAgentIntegration(BaseIntegration):
         Send travel package details via WhatsApp
         Uses formatted template with package information
         """
-        payload = {
+        payload = self._package_payload(phone_number, package_data)
+        result = self.make_request('POST', '/messages/send-package', data=payload)
+        return self._package_shared(result, phone_number, package_data)
+    
+    async def asend_package_details(self, phone_number: str, package_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async send_package_details"""
+        payload = self._package_payload(phone_number, package_data)
+        result = await self.amake_request('POST', '/messages/send-package', data=payload)
+        return self._package_shared(result, phone_number, package_data)
+    
+    def _package_payload(self, phone_number: str, package_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             'phone_number': phone_number,
             'tenant_id': self.tenant_id,
             'type': 'package_share',
             'package': package_data
         }
-        
-        result = self.make_request('POST', '/messages/send-package', data=payload)
-        
+    
+    def _package_shared(self, result: Dict[str, Any], phone_number: str, package_data: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             self.log_activity('package_shared', {
                 'phone_number': phone_number,
@@ -230,6 +263,22 @@ class WhatsAppAgentIntegration(BaseIntegration):
         Broadcast message to multiple contacts
         Useful for promotional campaigns
         """
+        payload = self._broadcast_payload(phone_numbers, message, template_name)
+        result = self.make_request('POST', '/messages/broadcast', data=payload)
+        return self._broadcast_sent(result, phone_numbers)
+    
+    async def abroadcast_message(
+        self, 
+        phone_numbers: List[str], 
+        message: str,
+        template_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async broadcast_message"""
+        payload = self._broadcast_payload(phone_numbers, message, template_name)
+        result = await self.amake_request('POST', '/messages/broadcast', data=payload)
+        return self._broadcast_sent(result, phone_numbers)
+    
+    def _broadcast_payload(self, phone_numbers: List[str], message: str, template_name: Optional[str]) -> Dict[str, Any]:
         payload = {
             'phone_numbers': phone_numbers,
             'tenant_id': self.tenant_id,
@@ -238,9 +287,9 @@ class WhatsAppAgentIntegration(BaseIntegration):
         
         if template_name:
             payload['template_name'] = template_name
-        
-        result = self.make_request('POST', '/messages/broadcast', data=payload)
-        
+        return payload
+    
+    def _broadcast_sent(self, result: Dict[str, Any], phone_numbers: List[str]) -> Dict[str, Any]:
         if result['success']:
             self.log_activity('broadcast_sent', {
                 'recipient_count': len(phone_numbers),
@@ -262,29 +311,34 @@ class WhatsAppAgentIntegration(BaseIntegration):
             if extracted['success']:
                 lead_data = extracted['extracted_data']
                 
-                # Check if lead already exists
-                lead, created = Lead.objects.get_or_create(
-                    tenant_id=self.tenant_id,
-                    phone=phone_number,
-                    defaults={
-                        'name': lead_data.get('name', 'WhatsApp Lead'),
-                        'email': lead_data.get('email', ''),
-                        'source': 'whatsapp',
-                        'status': 'new',
-                        'budget': lead_data.get('budget'),
-                        'notes': f"Auto-created from WhatsApp conversation. Intent score: {lead_data.get('intent_score')}"
-                    }
-                )
-                
+                # Check if lead already exists (indexed match on the E.164 form).
+                # phone_normalized is not unique: the same number stored in
+                # several formats matches several leads, so take the oldest.
+                lead = (Lead.objects.filter(tenant_id=self.tenant_id, **phone_lookup(phone_number))
+                        .order_by('id').first())
+                created = lead is None
+                if created:
+                    first_name, _, last_name = (lead_data.get('name') or 'WhatsApp Lead').partition(' ')
+                    lead = Lead.objects.create(
+                        tenant_id=self.tenant_id,
+                        phone=phone_number,
+                        first_name=first_name,
+                        last_name=last_name,
+                        email=lead_data.get('email', ''),
+                        source='whatsapp',
+                        status='new',
+                        budget=lead_data.get('budget'),
+                        notes=f"Auto-created from WhatsApp conversation. Intent score: {lead_data.get('intent_score')}"
+                    )
+
                 # Create communication record
                 Communication.objects.create(
                     tenant_id=self.tenant_id,
-                    lead=lead,
+                    customer=None if created else Customer.objects.filter(tenant_id=self.tenant_id, lead=lead).first(),
                     type='whatsapp',
-                    direction='inbound',
-                    subject=f"WhatsApp conversation",
-                    body=json.dumps(conversation_data),
-                    created_at=timezone.now()
+                    subject="WhatsApp conversation",
+                    content=json.dumps(conversation_data),
+                    status='received'
                 )
                 
                 self.log_activity('lead_processed', {
@@ -300,12 +354,22 @@ class WhatsAppAgentIntegration(BaseIntegration):
         """
         Get WhatsApp analytics from the agent
         """
-        result = self.make_request('GET', '/analytics', params={
+        result = self.make_request('GET', '/analytics', params=self._analytics_params(start_date, end_date))
+        return self._shape_analytics(result)
+    
+    async def aget_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Async get_analytics"""
+        result = await self.amake_request('GET', '/analytics', params=self._analytics_params(start_date, end_date))
+        return self._shape_analytics(result)
+    
+    def _analytics_params(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        return {
             'start_date': start_date,
             'end_date': end_date,
             'tenant_id': self.tenant_id
-        })
-        
+        }
+    
+    def _shape_analytics(self, result: Dict[str, Any]) -> Dict[str, Any]:
         if result['success']:
             analytics = result.get('data', {})
             return {
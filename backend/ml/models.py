@@ -84,7 +84,8 @@ class LeadScoringModel:
         # 4. Interaction Frequency (0-15 points)
         last_contact = lead_data.get('last_contact_date')
         if last_contact:
-            days_since = (datetime.now() - last_contact).days
+            # DB timestamps are timezone-aware, manual input may be naive
+            days_since = (datetime.now(last_contact.tzinfo) - last_contact).days
             if days_since <= 1:
                 scores['interaction_frequency'] = 15
             elif days_since <= 3:
@@ -6,10 +6,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime, timedelta
-from django.db.models import Sum, Count, Avg
+from django.db.models import Sum, Count, Avg, Q
+from django.utils import timezone
 from decimal import Decimal
 
-from core.models import Lead, Customer, Booking, Package
+from core.db_router import replica_reads
+from core.models import Lead, Customer, Booking, TravelPackage as Package
 from .models import (
     LeadScoringModel,
     ChurnPredictionModel,
@@ -21,6 +23,7 @@ from .models import (
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def score_lead(request):
     """
     Score a lead based on attributes
@@ -41,15 +44,15 @@ def score_lead(request):
     # If lead_id provided, fetch from database
     if lead_id:
         try:
-            lead = Lead.objects.get(id=lead_id, tenant=request.user.tenant)
+            lead = Lead.objects.get(id=lead_id, tenant_id=request.user.tenant_id)
             
             # Calculate interaction count (you may need to track this in your model)
             interaction_count = request.data.get('interaction_count', 1)
             
             lead_data = {
                 'interaction_count': interaction_count,
-                'budget': float(lead.budget) if hasattr(lead, 'budget') else 0,
-                'source': lead.source if hasattr(lead, 'source') else 'website',
+                'budget': float(lead.budget or 0),
+                'source': lead.source or 'website',
                 'response_time_hours': request.data.get('response_time_hours', 12),
                 'last_contact_date': lead.updated_at,
                 'package_interest': lead.interested_package.name if hasattr(lead, 'interested_package') else ''
@@ -82,6 +85,7 @@ def score_lead(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def predict_churn(request):
     """
     Predict churn risk for a customer
@@ -100,28 +104,22 @@ def predict_churn(request):
         )
     
     try:
-        customer = Customer.objects.get(id=customer_id, tenant=request.user.tenant)
+        # booking aggregates are kept on the customer row (see core.aggregates)
+        customer = Customer.objects.get(id=customer_id, tenant_id=request.user.tenant_id)
         
-        # Get customer booking data
-        bookings = Booking.objects.filter(customer=customer)
-        total_bookings = bookings.count()
-        
-        if total_bookings == 0:
+        if customer.booking_count == 0:
             return Response({
                 'risk_level': 'unknown',
                 'message': 'Customer has no booking history'
             })
         
-        last_booking = bookings.order_by('-created_at').first()
-        days_since_last = (datetime.now() - last_booking.created_at.replace(tzinfo=None)).days
-        
-        avg_value = bookings.aggregate(avg=Avg('total_price'))['avg']
+        days_since_last = (timezone.now() - customer.last_booking_date).days
         
         customer_data = {
             'days_since_last_booking': days_since_last,
-            'total_bookings': total_bookings,
-            'avg_booking_value': float(avg_value) if avg_value else 0,
-            'last_interaction_date': customer.updated_at,
+            'total_bookings': customer.booking_count,
+            'avg_booking_value': float(customer.avg_booking_value),
+            'last_interaction_date': customer.last_booking_date,
             'satisfaction_score': request.data.get('satisfaction_score', 4.0)
         }
         
@@ -138,40 +136,22 @@ def predict_churn(request):
         )
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def forecast_revenue(request):
-    """
-    Forecast revenue based on pipeline
-    
-    GET /api/ml/forecast-revenue/
-    """
-    tenant = request.user.tenant
-    
-    # Get all active leads with potential deal values
-    leads = Lead.objects.filter(
-        tenant=tenant,
-        status__in=['new', 'contacted', 'qualified']
+def revenue_forecast(tenant_id):
+    """Forecast a tenant's pipeline revenue in a fixed number of queries"""
+    counts = Lead.objects.filter(tenant_id=tenant_id).aggregate(
+        total=Count('id'),
+        converted=Count('id', filter=Q(status='converted')),
+        open=Count('id', filter=Q(status__in=['new', 'contacted', 'qualified'])),
     )
     
-    # Calculate pipeline value (you may need to add estimated_value field to Lead model)
-    deals_in_pipeline = []
-    for lead in leads:
-        # Estimate deal value based on interested package or average
-        if hasattr(lead, 'interested_package') and lead.interested_package:
-            deals_in_pipeline.append(float(lead.interested_package.base_price))
-        else:
-            # Use average package price
-            avg_price = Package.objects.filter(tenant=tenant).aggregate(
-                avg=Avg('base_price')
-            )['avg']
-            if avg_price:
-                deals_in_pipeline.append(float(avg_price))
+    # Leads carry no deal value yet; estimate each open lead at the average package price
+    avg_price = Package.objects.filter(tenant_id=tenant_id).aggregate(
+        avg=Avg('base_price')
+    )['avg']
+    deals_in_pipeline = [float(avg_price)] * counts['open'] if avg_price else []
     
     # Calculate historical conversion rate
-    total_leads = Lead.objects.filter(tenant=tenant).count()
-    converted_leads = Lead.objects.filter(tenant=tenant, status='converted').count()
-    conversion_rate = converted_leads / total_leads if total_leads > 0 else 0.25
+    conversion_rate = counts['converted'] / counts['total'] if counts['total'] > 0 else 0.25
     
     # Seasonal factor (current month)
     current_month = datetime.now().month
@@ -186,9 +166,18 @@ def forecast_revenue(request):
     
     # Forecast
     model = RevenueForecastModel()
-    result = model.forecast(pipeline_data)
+    return model.forecast(pipeline_data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def forecast_revenue(request):
+    """
+    Forecast revenue based on pipeline
     
-    return Response(result)
+    GET /api/ml/forecast-revenue/
+    """
+    return Response(revenue_forecast(request.user.tenant_id))
 
 
 @api_view(['POST'])
@@ -218,6 +207,7 @@ def analyze_sentiment(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def recommend_price(request):
     """
     Get dynamic pricing recommendation
@@ -238,7 +228,7 @@ def recommend_price(request):
         )
     
     try:
-        package = Package.objects.get(id=package_id, tenant=request.user.tenant)
+        package = Package.objects.get(id=package_id, tenant_id=request.user.tenant_id)
         
         # Get current bookings for this package
         bookings_count = Booking.objects.filter(
@@ -277,11 +267,11 @@ def ml_insights_dashboard(request):
     
     GET /api/ml/insights/
     """
-    tenant = request.user.tenant
+    tenant_id = request.user.tenant_id
     
     # 1. Top 5 hot leads
     leads = Lead.objects.filter(
-        tenant=tenant,
+        tenant_id=tenant_id,
         status__in=['new', 'contacted', 'qualified']
     )[:10]  # Get top 10 to score
     
@@ -291,8 +281,8 @@ def ml_insights_dashboard(request):
     for lead in leads:
         lead_data = {
             'interaction_count': 3,  # You may track this
-            'budget': float(getattr(lead, 'budget', 1000)),
-            'source': getattr(lead, 'source', 'website'),
+            'budget': float(lead.budget or 0),
+            'source': lead.source or 'website',
             'response_time_hours': 6,
             'last_contact_date': lead.updated_at,
         }
@@ -300,7 +290,7 @@ def ml_insights_dashboard(request):
         
         lead_scores.append({
             'lead_id': lead.id,
-            'lead_name': lead.name,
+            'lead_name': ' '.join(filter(None, [lead.first_name, lead.last_name])),
             'score': score_result['score'],
             'category': score_result['category'],
             'probability': score_result['conversion_probability']
@@ -311,37 +301,35 @@ def ml_insights_dashboard(request):
     hot_leads = lead_scores[:5]
     
     # 2. Churn risks
-    customers = Customer.objects.filter(tenant=tenant)[:5]
+    customers = Customer.objects.filter(tenant_id=tenant_id, booking_count__gt=0).values(
+        'id', 'booking_count', 'avg_booking_value', 'last_booking_date',
+        'lead__first_name', 'lead__last_name'
+    )[:5]
     churn_risks = []
     churn_model = ChurnPredictionModel()
+    now = timezone.now()
     
     for customer in customers:
-        bookings = Booking.objects.filter(customer=customer)
-        if bookings.exists():
-            last_booking = bookings.order_by('-created_at').first()
-            days_since = (datetime.now() - last_booking.created_at.replace(tzinfo=None)).days
-            
-            customer_data = {
-                'days_since_last_booking': days_since,
-                'total_bookings': bookings.count(),
-                'avg_booking_value': 2500,
-                'last_interaction_date': customer.updated_at,
-                'satisfaction_score': 3.5
-            }
-            
-            churn_result = churn_model.predict_churn(customer_data)
-            
-            if churn_result['risk_level'] in ['high', 'medium']:
-                churn_risks.append({
-                    'customer_id': customer.id,
-                    'customer_name': customer.name,
-                    'risk_level': churn_result['risk_level'],
-                    'probability': churn_result['churn_probability']
-                })
+        customer_data = {
+            'days_since_last_booking': (now - customer['last_booking_date']).days,
+            'total_bookings': customer['booking_count'],
+            'avg_booking_value': float(customer['avg_booking_value']),
+            'last_interaction_date': customer['last_booking_date'],
+            'satisfaction_score': 3.5
+        }
+        
+        churn_result = churn_model.predict_churn(customer_data)
+        
+        if churn_result['risk_level'] in ['high', 'medium']:
+            churn_risks.append({
+                'customer_id': customer['id'],
+                'customer_name': ' '.join(filter(None, [customer['lead__first_name'], customer['lead__last_name']])),
+                'risk_level': churn_result['risk_level'],
+                'probability': churn_result['churn_probability']
+            })
     
     # 3. Revenue forecast
-    forecast_model = RevenueForecastModel()
-    forecast_result = forecast_revenue(request).data
+    forecast_result = revenue_forecast(tenant_id)
     
     return Response({
         'hot_leads': hot_leads,
@@ -0,0 +1,128 @@
+"""
+Benchmark concurrent read/write throughput of the database modes.
+
+Threads share one tenant; each operation is either a paged lead list
+(read) or a lead insert (write). Modes:
+
+    sqlite-default  SQLite with Django's default connection settings
+    sqlite-tuned    SQLite with the WAL / busy-timeout OPTIONS of crm.settings
+    postgres        the Postgres settings of crm.settings (DB_ENGINE=postgres;
+                    set DB_POOL=1 to measure the psycopg pool)
+
+    python scripts/bench_db_concurrency.py --threads 8 --seconds 10
+    python scripts/bench_db_concurrency.py --mode postgres --write-ratio 0.5
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from bench_utils import setup_django
+
+MODES = ['sqlite-default', 'sqlite-tuned', 'postgres']
+
+
+def setup_mode(mode):
+    if mode.startswith('sqlite'):
+        # read the SQLite OPTIONS of crm.settings even when the shell selects Postgres
+        os.environ['DB_ENGINE'] = 'sqlite'
+    if mode == 'sqlite-default':
+        return setup_django(options={})
+    if mode == 'sqlite-tuned':
+        return setup_django()
+
+    import django
+    from django.conf import settings
+    from django.db import connection
+
+    if not settings.DATABASES['default']['ENGINE'].endswith('postgresql'):
+        sys.exit('postgres mode needs DB_ENGINE=postgres and the POSTGRES_* variables')
+    django.setup()
+    # migrates a throwaway test_<POSTGRES_DB> database and points the connection at it
+    return connection.creation.create_test_db(verbosity=0, keepdb=False)
+
+
+def run(mode, args):
+    setup_mode(mode)
+
+    from django.db import connection, OperationalError
+    from core.models import Tenant, Lead
+
+    tenant = Tenant.objects.create(name='Bench', domain='bench.travelcrm.io', subscription_tier='pro')
+    Lead.objects.bulk_create(
+        [Lead(tenant=tenant, first_name=f'Seed{i}', email=f'seed{i}@example.com') for i in range(args.seed)],
+        batch_size=1000,
+    )
+    connection.close()
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(index):
+        rng = random.Random(index)
+        reads = writes = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    if rng.random() < args.write_ratio:
+                        Lead.objects.create(tenant=tenant, first_name=f'W{index}', email=f'w{index}@example.com')
+                        writes += 1
+                    else:
+                        list(Lead.objects.filter(tenant=tenant).order_by('-id')
+                             .values('id', 'first_name', 'email', 'status')[:50])
+                        reads += 1
+                except OperationalError:
+                    # "database is locked" once a writer gives up waiting
+                    errors += 1
+        finally:
+            connection.close()
+        with lock:
+            counts['reads'] += reads
+            counts['writes'] += writes
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if mode == 'postgres':
+        connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+
+    total = counts['reads'] + counts['writes']
+    print(f'{mode:>15}: {total / elapsed:9,.0f} ops/s  reads {counts["reads"] / elapsed:9,.0f}/s  '
+          f'writes {counts["writes"] / elapsed:8,.0f}/s  errors {counts["errors"]:>5}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', choices=MODES + ['all'], default='all',
+                        help='"all" runs both SQLite modes, plus postgres when DB_ENGINE=postgres')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=20000, help='leads created before the run')
+    args = parser.parse_args()
+
+    if args.mode != 'all':
+        run(args.mode, args)
+        return
+
+    modes = MODES if os.getenv('DB_ENGINE') == 'postgres' else MODES[:2]
+    print(f'{args.threads} threads, {args.seconds:g}s per mode, {args.write_ratio:.0%} writes')
+    # one process per mode: Django settings are fixed once django.setup() runs
+    forwarded = ['--threads', str(args.threads), '--seconds', str(args.seconds),
+                 '--write-ratio', str(args.write_ratio), '--seed', str(args.seed)]
+    for mode in modes:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode] + forwarded, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark core list serialization: ModelSerializer vs the fast .values() path.
+
+Renders the same rows both ways through the real viewsets, checks that the
+JSON bytes are identical, and reports rows/sec for each.
+
+    python scripts/bench_list_serialization.py --rows 20000 --page-size 500
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from bench_utils import setup_django, measure
+
+
+def seed(tenant, user, rows, rng):
+    from django.utils import timezone
+    from core.models import Lead, Customer, TravelPackage, Booking
+
+    now = timezone.now()
+    Lead.objects.bulk_create([
+        Lead(
+            tenant=tenant, email=f'lead{i}@example.com', phone=f'+1555{i:07d}',
+            first_name=f'First{i}', last_name=f'Last{i}', source=rng.choice(['web', 'whatsapp', 'meta_ads']),
+            status=rng.choice(['new', 'contacted', 'qualified', 'lost']), score=rng.randrange(100),
+            assigned_to=user if i % 3 else None, destination=rng.choice(['Bali', 'Paris', 'Hawaii']),
+            budget=Decimal(rng.randrange(50000, 900000)) / 100 if i % 5 else None,
+            notes='Prefers beach resorts. ' * rng.randrange(1, 10),
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    package = TravelPackage.objects.create(
+        tenant=tenant, name='Bali Escape', description='x', base_price=Decimal('1999.90'), duration=7, destination='Bali')
+    customers = Customer.objects.bulk_create([Customer(tenant=tenant, customer_type='individual') for _ in range(100)])
+    Booking.objects.bulk_create([
+        Booking(tenant=tenant, customer=rng.choice(customers), package=package, status='confirmed',
+                total_amount=Decimal(rng.randrange(10000, 500000)) / 100,
+                travel_date=now + timedelta(days=rng.randrange(365)), pax_count=rng.randrange(1, 6))
+        for _ in range(rows)
+    ], batch_size=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from core.models import Tenant, User
+    from core.pagination import KeysetCursorPagination
+    from core.views import LeadViewSet, BookingViewSet
+
+    tenant = Tenant.objects.create(name='Bench Travel', domain='bench.travelcrm.io', subscription_tier='enterprise')
+    user = User.objects.create_user(email='bench@bench.travelcrm.io', password='x', role='ADMIN', tenant=tenant)
+    seed(tenant, user, args.rows, random.Random(7))
+
+    factory = APIRequestFactory()
+
+    def render(viewset, fast):
+        viewset.fast_read = fast
+        view = viewset.as_view({'get': 'list'})
+        request = factory.get('/', {'page_size': args.page_size}, HTTP_HOST='bench.travelcrm.io')
+        request.tenant = tenant
+        force_authenticate(request, user)
+        response = view(request)
+        response.render()
+        return response.content
+
+    KeysetCursorPagination.max_page_size = args.page_size
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for viewset in (LeadViewSet, BookingViewSet):
+            slow_bytes, fast_bytes = render(viewset, False), render(viewset, True)
+            assert slow_bytes == fast_bytes, f'{viewset.__name__}: fast path output differs'
+
+            slow, _ = measure(lambda: render(viewset, False), args.iterations)
+            fast, _ = measure(lambda: render(viewset, True), args.iterations)
+            rows = args.page_size * args.iterations
+            print(f'{viewset.__name__}: {args.page_size} rows/page, output byte-identical')
+            print(f'  ModelSerializer: {rows / slow:>10,.0f} rows/s')
+            print(f'  fast path:       {rows / fast:>10,.0f} rows/s ({slow / fast:.1f}x)')
+            viewset.fast_read = None
+
+
+if __name__ == '__main__':
+    main()
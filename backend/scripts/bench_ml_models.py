@@ -0,0 +1,189 @@
+"""
+Benchmark the ml.models scoring classes on fixed synthetic inputs.
+
+For each model and input size, calls the scoring method once per record and
+reports ops/sec (best of --repeat runs; small sizes are looped until a run
+takes --min-time) and allocations: bytes and memory blocks each result
+keeps alive, and the largest temporary allocation of one call. Allocations are
+measured in a separate, untimed pass under tracemalloc over at most
+--alloc-sample records. Inputs come from a fixed seed; sizes above --pool
+cycle through a pool of that many distinct records.
+
+    python scripts/bench_ml_models.py
+    python scripts/bench_ml_models.py --models lead,churn --sizes 1,1000 --json bench-ml.json
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple
+
+import bench_utils  # noqa: F401  (puts the backend on sys.path)
+
+from ml.models import LeadScoringModel, ChurnPredictionModel, SentimentAnalysisModel, DynamicPricingModel
+
+SOURCES = ['whatsapp', 'meta_ads', 'website', 'referral', 'organic', 'Website', 'other']
+POSITIVE = ['amazing', 'excellent', 'great', 'wonderful', 'love', 'perfect', 'thank you', 'enjoyed']
+NEGATIVE = ['terrible', 'bad', 'worst', 'disappointing', 'refund', 'cancel', 'problem', 'issue']
+FILLER = ['the', 'hotel', 'flight', 'tour', 'guide', 'room', 'beach', 'transfer', 'booking', 'was', 'our',
+          'trip', 'to', 'bali', 'and', 'very', 'with', 'staff', 'dinner', 'on', 'day', 'we', 'family']
+
+
+def lead_record(rng: random.Random, now: datetime) -> dict:
+    # shaped like the lead_data ml.views builds from a Lead row
+    return {
+        'interaction_count': rng.choice([0, 1, 2, 3, 5, 8, 12]),
+        'budget': rng.choice([0, 300, 900, 2000, 3500, 6000, 12000]) * rng.uniform(0.8, 1.2),
+        'source': rng.choice(SOURCES),
+        'response_time_hours': rng.choice([0.5, 2, 6, 12, 20, 48]),
+        'last_contact_date': now - timedelta(hours=rng.randrange(0, 24 * 60)) if rng.random() < 0.85 else None,
+        'package_interest': rng.choice(['Bali', 'Paris', '']),
+    }
+
+
+def customer_record(rng: random.Random, now: datetime) -> dict:
+    return {
+        'days_since_last_booking': rng.randrange(0, 700),
+        'total_bookings': rng.choice([0, 1, 1, 2, 3, 5, 9]),
+        'avg_booking_value': rng.uniform(300, 8000),
+        'last_interaction_date': now - timedelta(days=rng.randrange(0, 400)),
+        'satisfaction_score': round(rng.uniform(1, 5), 1),
+    }
+
+
+def message_text(rng: random.Random, now: datetime) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randrange(4, 60))]
+    for pool, chance in ((POSITIVE, 0.6), (NEGATIVE, 0.35)):
+        while rng.random() < chance:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(pool))
+    text = ' '.join(words)
+    return text.capitalize() + rng.choice(['.', '!', '?'])
+
+
+def package_record(rng: random.Random, now: datetime) -> dict:
+    return {
+        'base_price': round(rng.uniform(400, 9000), 2),
+        'current_bookings': rng.randrange(0, 20),
+        'competition_price': round(rng.uniform(400, 9000), 2),
+        'seasonality': rng.choice(['high', 'medium', 'low']),
+        'days_until_departure': rng.randrange(1, 240),
+    }
+
+
+class Benchmark(NamedTuple):
+    name: str
+    method: str
+    make_model: Callable
+    make_record: Callable[[random.Random, datetime], object]
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark('lead', 'LeadScoringModel.calculate_score', LeadScoringModel, lead_record),
+    Benchmark('churn', 'ChurnPredictionModel.predict_churn', ChurnPredictionModel, customer_record),
+    Benchmark('sentiment', 'SentimentAnalysisModel.analyze', SentimentAnalysisModel, message_text),
+    Benchmark('pricing', 'DynamicPricingModel.recommend_price', DynamicPricingModel, package_record),
+]
+
+
+def make_inputs(bench: Benchmark, size: int, pool: int, seed: int) -> List:
+    rng = random.Random(f'{seed}:{bench.name}')
+    # LeadScoringModel measures against the clock; dates relative to today keep its branch mix fixed
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    distinct = [bench.make_record(rng, now) for _ in range(min(size, pool))]
+    if size <= pool:
+        return distinct
+    # list of references: no extra records are built for the large sizes
+    return [distinct[i % pool] for i in range(size)]
+
+
+def time_run(fn: Callable, records: List, min_time: float) -> float:
+    """Seconds per call over `records`, looping the batch until one run takes `min_time`"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for record in records:
+                fn(record)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            return elapsed / (loops * len(records))
+        loops *= 2 if elapsed * 2 >= min_time else max(2, int(min_time / max(elapsed, 1e-9)))
+
+
+def allocations(fn: Callable, records: List) -> Dict[str, float]:
+    """Bytes and blocks each result keeps alive, and the most one call needs temporarily"""
+    results = [None] * len(records)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks()
+        for i, record in enumerate(records):
+            results[i] = fn(record)
+        current, peak = tracemalloc.get_traced_memory()
+        kept_blocks = sys.getallocatedblocks() - blocks
+    finally:
+        tracemalloc.stop()
+    del results
+    return {
+        'bytes_per_op': (current - base) / len(records),
+        'blocks_per_op': kept_blocks / len(records),
+        # retained memory only grows, so the peak is the end state plus one call's temporaries
+        'temp_bytes': peak - current,
+    }
+
+
+def run(bench: Benchmark, size: int, args) -> dict:
+    records = make_inputs(bench, size, args.pool, args.seed)
+    fn = getattr(bench.make_model(), bench.method.split('.')[1])
+    fn(records[0])  # warm up
+    seconds = min(time_run(fn, records, args.min_time) for _ in range(args.repeat))
+    alloc = allocations(fn, records[:args.alloc_sample])
+    del records
+    gc.collect()
+    return {'model': bench.name, 'method': bench.method, 'records': size,
+            'ops_per_sec': round(1 / seconds), 'us_per_op': round(seconds * 1e6, 3),
+            **{key: round(value, 1) for key, value in alloc.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--models', default=','.join(b.name for b in BENCHMARKS),
+                        help='Comma-separated subset of: ' + ', '.join(b.name for b in BENCHMARKS))
+    parser.add_argument('--sizes', default='1,1000,1000000', help='Comma-separated record counts')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--pool', type=int, default=100000, help='Distinct records; larger sizes cycle through them')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds each timed run lasts at least')
+    parser.add_argument('--alloc-sample', type=int, default=10000, help='Records traced for allocations')
+    parser.add_argument('--json', help='Also write the results here')
+    args = parser.parse_args()
+
+    names = args.models.split(',')
+    unknown = set(names) - {b.name for b in BENCHMARKS}
+    if unknown:
+        sys.exit(f'unknown models: {", ".join(sorted(unknown))}')
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'method':<38}{'records':>10}{'ops/s':>12}{'us/op':>10}{'B/op':>9}{'blocks/op':>11}{'temp B':>9}")
+    results = []
+    for bench in BENCHMARKS:
+        if bench.name not in names:
+            continue
+        for size in sizes:
+            row = run(bench, size, args)
+            results.append(row)
+            print(f"{row['method']:<38}{size:>10,}{row['ops_per_sec']:>12,}{row['us_per_op']:>10.2f}"
+                  f"{row['bytes_per_op']:>9.0f}{row['blocks_per_op']:>11.1f}{row['temp_bytes']:>9,.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'seed': args.seed, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
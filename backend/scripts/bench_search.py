@@ -0,0 +1,69 @@
+"""
+Benchmark lead full-text search latency.
+
+Seeds one large tenant plus background tenants and reports p50/p95/max
+latency of core.search.search_lead_ids for a mix of queries.
+
+    python scripts/bench_search.py --leads 200000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from bench_utils import setup_django
+
+FIRST = ['John', 'Maria', 'Aisha', 'Wei', 'Carlos', 'Priya', 'Olga', 'Kenji', 'Fatima', 'Liam']
+LAST = ['Smith', 'Garcia', 'Khan', 'Chen', 'Silva', 'Patel', 'Ivanova', 'Sato', 'Haddad', 'Murphy']
+DESTINATIONS = ['Bali', 'Paris', 'Hawaii', 'Maldives', 'Kyoto', 'Cape Town', 'Lisbon', 'Cancun']
+NOTES = ['honeymoon', 'family trip', 'beach resort', 'budget flexible', 'needs visa help', 'anniversary']
+QUERIES = ['john', 'garcia', 'bali', 'honey', 'maria kyoto', 'lead123', '+1555001', 'visa', 'cape town beach']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--leads', type=int, default=200000, help='leads in the searched tenant')
+    parser.add_argument('--other-tenants', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from core.models import Tenant, Lead
+    from core.search import search_lead_ids
+
+    rng = random.Random(11)
+    tenants = [Tenant.objects.create(name=f'T{i}', domain=f't{i}.travelcrm.io', subscription_tier='pro')
+               for i in range(args.other_tenants + 1)]
+
+    for tenant_index, tenant in enumerate(tenants):
+        count = args.leads if tenant_index == 0 else args.leads // 4
+        batch = []
+        for i in range(count):
+            first, last = rng.choice(FIRST), rng.choice(LAST)
+            batch.append(Lead(
+                tenant=tenant, first_name=first, last_name=last,
+                email=f'{first.lower()}.{last.lower()}.lead{i}@example.com', phone=f'+1555{i:07d}',
+                destination=rng.choice(DESTINATIONS), notes=' '.join(rng.sample(NOTES, 2)),
+            ))
+            if len(batch) == 5000:
+                Lead.objects.bulk_create(batch)
+                batch = []
+        Lead.objects.bulk_create(batch)
+
+    target = tenants[0].id
+    print(f'searched tenant: {args.leads:,} leads, {Lead.objects.count():,} leads in total')
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ids = search_lead_ids(target, query, limit=20)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f'{query!r:>20}: {len(ids):>2} hits  p50 {statistics.median(timings):7.2f}ms  '
+              f'p95 {p95:7.2f}ms  max {timings[-1]:7.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark TenantMiddleware host resolution.
+
+Compares the previous `domain__icontains` scan with the cached
+exact/subdomain resolver against a few thousand tenants.
+
+    python scripts/bench_tenant_middleware.py --tenants 5000 --requests 20000
+"""
+import argparse
+import random
+
+from bench_utils import setup_django, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tenants', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--hosts', type=int, default=200, help='distinct hosts in the request mix')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection, reset_queries
+    from django.test import RequestFactory, override_settings
+    from core.middleware import TenantMiddleware
+    from core.models import Tenant
+    from core.tenant_cache import tenant_resolver
+
+    Tenant.objects.bulk_create(
+        [Tenant(name=f'Agency {i}', domain=f'agency{i}.travelcrm.io', subscription_tier='starter')
+         for i in range(args.tenants)],
+        batch_size=1000,
+    )
+
+    rng = random.Random(42)
+    hosts = [f'agency{rng.randrange(args.tenants)}.travelcrm.io' for _ in range(args.hosts)]
+    # a share of traffic arrives on per-user subdomains
+    hosts += [f'app.{h}' for h in hosts[: args.hosts // 4]]
+    factory = RequestFactory()
+    requests = [factory.get('/api/leads/', HTTP_HOST=rng.choice(hosts)) for _ in range(1000)]
+
+    def legacy():
+        for request in requests:
+            host = request.get_host().split(':')[0]
+            Tenant.objects.filter(domain__icontains=host).first()
+
+    middleware = TenantMiddleware(lambda request: None)
+
+    def cached():
+        for request in requests:
+            middleware.process_request(request)
+
+    rounds = max(1, args.requests // len(requests))
+    with override_settings(ALLOWED_HOSTS=['*']):
+        legacy_elapsed, _ = measure(legacy, max(1, rounds // 10))
+        legacy_rps = len(requests) * max(1, rounds // 10) / legacy_elapsed
+
+        tenant_resolver.invalidate()
+        with override_settings(DEBUG=True):
+            reset_queries()
+            cached_elapsed, _ = measure(cached, rounds)
+            queries = len(connection.queries)
+        cached_rps = len(requests) * rounds / cached_elapsed
+
+        # steady state: everything is warm now
+        with override_settings(DEBUG=True):
+            reset_queries()
+            measure(cached, 1)
+            steady_queries = len(connection.queries)
+
+    print(f'tenants:            {args.tenants}')
+    print(f'distinct hosts:     {len(set(hosts))}')
+    print(f'icontains scan:     {legacy_rps:,.0f} req/s')
+    print(f'cached resolver:    {cached_rps:,.0f} req/s ({cached_rps / legacy_rps:.1f}x)')
+    print(f'queries (cold run): {queries}')
+    print(f'queries (steady):   {steady_queries}')
+    print(f'resolver hits/miss: {tenant_resolver.hits}/{tenant_resolver.misses}')
+
+
+if __name__ == '__main__':
+    main()
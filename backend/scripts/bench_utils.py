@@ -0,0 +1,48 @@
+"""
+Shared bootstrap for the benchmark scripts in this directory.
+
+Benchmarks run against a throwaway SQLite database so they never touch
+db.sqlite3. Import this module before any Django model imports.
+"""
+import os
+import sys
+import tempfile
+import time
+
+# ensure backend package is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm.settings')
+
+
+def setup_django(db_name=None, options=None):
+    """
+    Point the default database at a scratch SQLite file and migrate it.
+    `options` defaults to the SQLite OPTIONS of crm.settings (WAL etc.).
+    """
+    import django
+    from django.conf import settings
+
+    if db_name is None:
+        db_name = os.path.join(tempfile.mkdtemp(prefix='crm-bench-'), 'bench.sqlite3')
+    if options is None:
+        default = settings.DATABASES['default']
+        options = default.get('OPTIONS', {}) if default['ENGINE'].endswith('sqlite3') else {}
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': db_name,
+        'OPTIONS': options,
+    }
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_name
+
+
+def measure(fn, iterations):
+    """Run fn `iterations` times, return (elapsed seconds, ops/sec)"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return elapsed, iterations / elapsed if elapsed else float('inf')
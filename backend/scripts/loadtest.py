@@ -0,0 +1,366 @@
+"""
+End-to-end HTTP load test against a running server.
+
+Logs in through /api/auth/token/ as the admins of the synthetic tenants
+(seed_demo --scale), then has concurrent clients replay a weighted mix of
+CRUD, dashboard, ML and integration requests. Integration connects go to a
+stub agent this script serves. Reports p50/p95/p99 latency and requests/s
+per endpoint and compares them with a baseline file; a regression beyond
+--tolerance exits non-zero.
+
+    python manage.py seed_demo --scale --tenants 10 --until 2026-10-01
+    python scripts/loadtest.py --serve --duration 60
+    python scripts/loadtest.py --base-url http://127.0.0.1:8000 --concurrency 16
+    python scripts/loadtest.py --serve --save-baseline
+
+Requests carry the tenant's domain as Host, so a server started separately
+needs ALLOWED_HOSTS to include it (e.g. ALLOWED_HOSTS=.travelcrm.io,127.0.0.1).
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadtest_baseline.json')
+
+
+class Scenario(NamedTuple):
+    name: str
+    weight: int
+    method: str
+    # formatted with the tenant's fixture ids (see TenantSession.params)
+    path: str
+    body: Optional[Callable[['TenantSession', random.Random], dict]] = None
+
+
+def _new_lead(tenant, rng):
+    n = rng.randrange(10 ** 9)
+    return {'tenant': tenant.tenant_id, 'first_name': 'Load', 'last_name': f'Test{n}',
+            'email': f'load{n}@example.com', 'source': 'website', 'destination': 'Bali', 'budget': 2500}
+
+
+def _connect_agent(tenant, rng):
+    return {'integration_type': rng.choice(['whatsapp', 'meta_ads']),
+            'credentials': {'api_url': tenant.stub_url, 'api_key': 'load-test', 'ad_account_id': 'act_load'}}
+
+
+# Weighted like production traffic: list and detail reads dominate
+SCENARIOS: List[Scenario] = [
+    Scenario('lead-list', 16, 'GET', '/api/leads/'),
+    Scenario('lead-detail', 10, 'GET', '/api/leads/{lead}/'),
+    Scenario('lead-search', 6, 'GET', '/api/leads/search/?q={last_name}'),
+    Scenario('lead-create', 4, 'POST', '/api/leads/', _new_lead),
+    Scenario('lead-update', 3, 'PATCH', '/api/leads/{lead}/', lambda t, rng: {'status': rng.choice(['contacted', 'qualified'])}),
+    Scenario('customer-list', 6, 'GET', '/api/customers/'),
+    Scenario('customer-detail', 4, 'GET', '/api/customers/{customer}/'),
+    Scenario('deal-list', 5, 'GET', '/api/deals/'),
+    Scenario('deal-pipeline', 3, 'GET', '/api/deals/pipeline/'),
+    Scenario('booking-list', 5, 'GET', '/api/bookings/'),
+    Scenario('travelpackage-list', 3, 'GET', '/api/packages/'),
+    Scenario('dashboard-summary', 5, 'GET', '/api/dashboard/summary/?days=30'),
+    Scenario('dashboard-leads', 2, 'GET', '/api/dashboard/leads/?days=90'),
+    Scenario('ml:score-lead', 4, 'POST', '/api/ml/score-lead/', lambda t, rng: {'lead_id': rng.choice(t.leads)}),
+    Scenario('ml:predict-churn', 3, 'POST', '/api/ml/predict-churn/', lambda t, rng: {'customer_id': rng.choice(t.customers)}),
+    Scenario('ml:recommend-price', 2, 'POST', '/api/ml/recommend-price/', lambda t, rng: {'package_id': rng.choice(t.packages)}),
+    Scenario('ml:analyze-sentiment', 2, 'POST', '/api/ml/analyze-sentiment/',
+             lambda t, rng: {'text': rng.choice(['Loved the trip, amazing hotel!', 'The transfer was late and rude.'])}),
+    Scenario('ml:forecast-revenue', 2, 'GET', '/api/ml/forecast-revenue/'),
+    Scenario('ml:insights', 2, 'GET', '/api/ml/insights/'),
+    Scenario('integration-list', 2, 'GET', '/api/integrations/'),
+    Scenario('meta-ads-campaigns', 2, 'GET', '/api/meta-ads/campaigns/'),
+    Scenario('integration-connect', 1, 'POST', '/api/integrations/connect/', _connect_agent),
+]
+
+
+# --- stub agent ----------------------------------------------------------------
+
+class StubAgentHandler(BaseHTTPRequestHandler):
+    """Answers every WhatsApp / Meta Ads agent call with a small JSON body after `latency` seconds"""
+    latency = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.latency)
+        body = json.dumps({'status': 'ok', 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_agent(port: int, latency_ms: float) -> ThreadingHTTPServer:
+    handler = type('Handler', (StubAgentHandler,), {'latency': latency_ms / 1000})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- server under test ----------------------------------------------------------
+
+def start_server(port: int) -> subprocess.Popen:
+    """runserver on the current database settings; fine for comparisons, not for absolute numbers"""
+    env = dict(os.environ)
+    env.setdefault('DEBUG', '0')
+    env['ALLOWED_HOSTS'] = env.get('ALLOWED_HOSTS', 'localhost,127.0.0.1') + ',.travelcrm.io'
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload', '--skip-checks'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}/api/test/'
+    for _ in range(100):
+        if process.poll() is not None:
+            sys.exit('server exited during startup')
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    sys.exit('server did not come up')
+
+
+# --- tenants -------------------------------------------------------------------------
+
+class TenantSession:
+    """A logged-in synthetic tenant and the ids its requests use"""
+
+    def __init__(self, base_url: str, domain: str, email: str, password: str, stub_url: str):
+        self.base_url = base_url
+        self.domain = domain
+        self.stub_url = stub_url
+        response = requests.post(f'{base_url}/api/auth/token/', json={'email': email, 'password': password},
+                                 headers={'Host': domain}, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f'login as {email} failed: HTTP {response.status_code} {response.text[:200]}')
+        self.token = response.json()['access']
+        payload = self.token.split('.')[1]
+        self.tenant_id = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))['tenant_id']
+        self.headers = {'Authorization': f'Bearer {self.token}', 'Host': domain}
+        self.leads = self._ids('/api/leads/?page_size=200&fields=id,last_name', keep='last_name')
+        self.customers = self._ids('/api/customers/?page_size=200&fields=id')
+        self.packages = self._ids('/api/packages/?page_size=200&fields=id')
+        if not (self.leads and self.customers and self.packages):
+            raise RuntimeError(f'{domain} has no leads, customers or packages; seed it with seed_demo --scale')
+
+    def _ids(self, path: str, keep: Optional[str] = None) -> List[int]:
+        response = requests.get(f'{self.base_url}{path}', headers=self.headers, timeout=60)
+        response.raise_for_status()
+        rows = response.json()['results']
+        if keep:
+            self.last_names = sorted({row[keep] for row in rows if row.get(keep)}) or ['Garcia']
+        return [row['id'] for row in rows]
+
+    def params(self, rng: random.Random) -> Dict[str, object]:
+        return {'lead': rng.choice(self.leads), 'customer': rng.choice(self.customers),
+                'package': rng.choice(self.packages), 'last_name': rng.choice(self.last_names)}
+
+
+def login_tenants(args, stub_url: str) -> List[TenantSession]:
+    tenants = []
+    for index in range(args.tenants):
+        domain = f'synthetic-{args.seed}-{index}.travelcrm.io'
+        tenants.append(TenantSession(args.base_url, domain, f'admin@{domain}', args.password, stub_url))
+    return tenants
+
+
+# --- load ------------------------------------------------------------------------------
+
+def run_load(args, tenants: List[TenantSession]) -> Dict[str, dict]:
+    # bigger tenants get more traffic, as seed_demo --scale sizes them (1 / (i + 1) ** skew)
+    tenant_weights = [(i + 1) ** -args.skew for i in range(len(tenants))]
+    scenario_weights = [s.weight for s in SCENARIOS]
+    results: Dict[str, List[float]] = {s.name: [] for s in SCENARIOS}
+    errors: Dict[str, int] = {s.name: 0 for s in SCENARIOS}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+
+    def client(index: int):
+        rng = random.Random(f'{args.seed}:{index}')
+        session = requests.Session()
+        latencies: Dict[str, List[float]] = {s.name: [] for s in SCENARIOS}
+        failures: Dict[str, int] = {s.name: 0 for s in SCENARIOS}
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            tenant = rng.choices(tenants, tenant_weights)[0]
+            scenario = rng.choices(SCENARIOS, scenario_weights)[0]
+            url = args.base_url + scenario.path.format(**tenant.params(rng))
+            body = scenario.body(tenant, rng) if scenario.body else None
+            began = time.perf_counter()
+            try:
+                response = session.request(scenario.method, url, json=body, headers=tenant.headers, timeout=60)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - began
+            if began >= measure_from:
+                latencies[scenario.name].append(elapsed)
+                if not ok:
+                    failures[scenario.name] += 1
+        with lock:
+            for name in results:
+                results[name].extend(latencies[name])
+                errors[name] += failures[name]
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {name: summarize(latencies, errors[name], args.duration) for name, latencies in results.items()}
+    report['total'] = summarize([x for xs in results.values() for x in xs], sum(errors.values()), args.duration)
+    return report
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'rps': round(len(ordered) / duration, 2),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+# --- baseline ---------------------------------------------------------------------
+
+def compare(report: Dict[str, dict], baseline: Dict[str, dict], tolerance: float, min_ms: float,
+            min_requests: int) -> List[str]:
+    """
+    Regressions against the baseline: p95 more than `tolerance` slower (and
+    at least `min_ms`, so small absolute changes do not count), a higher error
+    rate, or total requests/s more than `tolerance` lower. Endpoints with
+    fewer than `min_requests` samples in either run are too noisy to judge;
+    per-endpoint requests/s follows the random mix, so only the total counts.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = report.get(name)
+        if current is None or min(current['requests'], base['requests']) < min_requests:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance) and current['p95_ms'] - base['p95_ms'] >= min_ms:
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms vs {base['p95_ms']}ms")
+        if current['errors'] / current['requests'] > base['errors'] / base['requests'] + 0.01:
+            regressions.append(f"{name}: {current['errors']} errors in {current['requests']} requests")
+    if 'total' in baseline and report['total']['rps'] < baseline['total']['rps'] * (1 - tolerance):
+        regressions.append(f"total: {report['total']['rps']} req/s vs {baseline['total']['rps']}")
+    return regressions
+
+
+def print_report(report: Dict[str, dict], baseline: Optional[Dict[str, dict]]):
+    print(f"{'endpoint':<24}{'reqs':>7}{'errs':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  p95 vs base")
+    for name, row in report.items():
+        base = (baseline or {}).get(name)
+        delta = f"{(row['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%" if base and base['p95_ms'] else ''
+        print(f"{name:<24}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}  {delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--serve', action='store_true', help='Start manage.py runserver for the run')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --serve')
+    parser.add_argument('--tenants', type=int, default=10, help='Synthetic tenants to log in to')
+    parser.add_argument('--seed', type=int, default=42, help='seed_demo --scale seed of those tenants')
+    parser.add_argument('--skew', type=float, default=1.0, help='Traffic share per tenant, as seed_demo --skew')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds of load before measuring')
+    parser.add_argument('--stub-port', type=int, default=8766)
+    parser.add_argument('--stub-latency-ms', type=float, default=50, help='Stub agent response time')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    parser.add_argument('--min-ms', type=float, default=5, help='p95 increases smaller than this never count')
+    parser.add_argument('--min-requests', type=int, default=100, help='Skip endpoints with fewer samples')
+    parser.add_argument('--output', help='Also write the report as JSON here')
+    args = parser.parse_args()
+
+    server = None
+    if args.serve:
+        server = start_server(args.port)
+        args.base_url = f'http://127.0.0.1:{args.port}'
+    stub = start_stub_agent(args.stub_port, args.stub_latency_ms)
+    try:
+        tenants = login_tenants(args, f'http://127.0.0.1:{args.stub_port}')
+        print(f'{len(tenants)} tenants logged in; {args.concurrency} clients, '
+              f'{args.warmup:.0f}s warmup + {args.duration:.0f}s against {args.base_url}')
+        report = run_load(args, tenants)
+    finally:
+        stub.shutdown()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['endpoints']
+    print_report(report, baseline)
+
+    result = {
+        'meta': {
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'tenants': args.tenants, 'seed': args.seed, 'concurrency': args.concurrency,
+            'duration': args.duration, 'stub_latency_ms': args.stub_latency_ms, 'served_by_script': args.serve,
+        },
+        'endpoints': report,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+            f.write('\n')
+        print(f'baseline written to {args.baseline}')
+        return
+    if baseline is None:
+        print('no baseline to compare with; record one with --save-baseline')
+        return
+    regressions = compare(report, baseline, args.tolerance, args.min_ms, args.min_requests)
+    if regressions:
+        print('REGRESSIONS:\n  ' + '\n  '.join(regressions))
+        sys.exit(1)
+    print(f'within {args.tolerance:.0%} of the baseline')
+
+
+if __name__ == '__main__':
+    main()
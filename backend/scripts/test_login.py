@@ -5,7 +5,7 @@ import django
 # ensure backend package is importable
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm.settings')
-os.environ.setdefault('USE_SQLITE', '1')
+os.environ.setdefault('DB_ENGINE', 'sqlite')
 django.setup()
 
 from django.test import Client